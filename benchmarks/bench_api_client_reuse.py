@@ -0,0 +1,78 @@
+# -*- coding:utf-8 -*-
+"""
+对比每条用例新建 ApiClient 与会话级复用 ApiClient 的单用例耗时。
+
+用本地 HTTP 服务模拟接口，运行：
+    python benchmarks/bench_api_client_reuse.py [用例数]
+"""
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.api.api_client import ApiClient
+from src.core.api.session_manager import SessionManager
+from src.core.api.factory import create_request_data_processor, ApiClientRegistry
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体合并写出，避免 keep-alive 下触发 Nagle/延迟 ACK
+    wbufsize = 64 * 1024
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        body = json.dumps({"success": True, "data": {"token": "abc"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _case(url):
+    return [
+        "bench", "bench", "bench", "reuse", None, "post", url, None, "application/json",
+        '{"account":"${my_account}"}', None, '{"token":"$.data.token"}', None, '{"$.success":true}', None
+    ]
+
+
+def _run(label, get_client, url, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        get_client().send_case(_case(url))
+    cost = time.perf_counter() - start
+    print(f"{label:<28} 总耗时 {cost:.3f}s  单用例 {cost / n * 1000:.2f}ms")
+    return cost
+
+
+def main(n=300):
+    import logging
+    logging.disable(logging.INFO)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/bench"
+
+    try:
+        # 优化前：每条用例重建 RequestDataProcessor 与 session
+        before = _run("每用例新建 ApiClient", lambda: ApiClient(create_request_data_processor(), SessionManager()), url, n)
+        # 优化后：会话级注册表复用
+        after = _run("会话级复用 ApiClient", ApiClientRegistry.get, url, n)
+        print(f"提升: {before / after:.2f}x")
+    finally:
+        ApiClientRegistry.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,52 @@
+# -*- coding:utf-8 -*-
+"""
+用例解析缓存：冷启动（逐个 read_excel + 换行清理）与缓存命中时读取全部 API 用例工作簿的耗时对比。
+缓存写入临时目录，不影响 data/cache_file 中已有的缓存，运行：
+    python benchmarks/bench_case_cache.py --loops 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from config.settings import ProjectPaths
+from src.utils.read_test_cases import CaseCache, GenericCaseReader, process_api_row
+
+
+def read_all(workbooks, cache):
+    return sum(1 for path in workbooks for _ in GenericCaseReader(path, process_api_row, cache=cache).read())
+
+
+def main(loops: int = 5):
+    workbooks = sorted(ProjectPaths.API_AUTO_DIR.rglob("*.xlsx"))
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CaseCache(tmp)
+        timings = {}
+        for label, use_cache in (("无缓存", None), ("缓存命中", cache)):
+            read_all(workbooks, use_cache)  # 预热 / 写入缓存
+            start = time.perf_counter()
+            for _ in range(loops):
+                rows = read_all(workbooks, use_cache)
+            timings[label] = (time.perf_counter() - start) / loops * 1000
+        # 模拟 CI 重新检出：内容不变、mtime 变化，需要比较内容摘要
+        for path in workbooks:
+            os.utime(path)
+        start = time.perf_counter()
+        read_all(workbooks, cache)
+        timings["mtime 变化"] = (time.perf_counter() - start) * 1000
+
+        print(f"{len(workbooks)} 个工作簿, {rows} 条用例")
+        for label, ms in timings.items():
+            print(f"{label:<10} {ms:8.1f}ms")
+        print(cache.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loops", type=int, default=5)
+    args = parser.parse_args()
+    main(args.loops)
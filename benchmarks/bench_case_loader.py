@@ -0,0 +1,60 @@
+# -*- coding:utf-8 -*-
+"""
+用例目录加载：串行与进程池并行解析多个工作簿的耗时对比（不使用解析缓存）。
+生成 --files 个、每个 --rows 行、--sheets 个工作表的合成 API 用例工作簿，运行：
+    python benchmarks/bench_case_loader.py --files 16 --rows 3000 --sheets 2 --workers 8
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.bench_case_reader import HEADER
+from src.utils.case_catalog import CaseCatalog
+
+
+def build_workbooks(root: Path, files: int, rows: int, sheets: int):
+    import openpyxl
+    for f in range(files):
+        workbook = openpyxl.Workbook(write_only=True)
+        for s in range(sheets):
+            sheet = workbook.create_sheet(f"Sheet{s + 1}")
+            sheet.append(HEADER)
+            for i in range(rows):
+                sheet.append([f"模块{f}", f"子模块{s}", f"用例{i // 20}", f"标题{i}", None, "post",
+                              f"/api/item/{i}", None, "application/json", f'{{"id": {i}}}', None,
+                              None, None, '{"$.success": true}', None])
+        workbook.save(root / f"module_{f:02d}.xlsx")
+
+
+def main(files: int = 16, rows: int = 3000, sheets: int = 2, workers: int = 0):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_workbooks(root, files, rows, sheets)
+        roots = [("api", root)]
+        results = {}
+        for count in sorted({1, workers or os.cpu_count() or 1}):
+            start = time.perf_counter()
+            catalog = CaseCatalog.load(roots, workers=count, min_parallel=1, use_cache=False)
+            results[count] = (time.perf_counter() - start, catalog)
+        baseline = results[1][1].entries
+        print(f"{files} 个工作簿 × {sheets} 个工作表 × {rows} 行")
+        for count, (elapsed, catalog) in results.items():
+            assert catalog.entries == baseline, "并行加载结果与串行不一致"
+            print(f"进程数 {count:>2}: {len(catalog)} 条用例, {elapsed:6.2f}s, "
+                  f"{results[1][0] / elapsed:4.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--sheets", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=0, help="并行进程数，默认 CPU 核数")
+    args = parser.parse_args()
+    main(args.files, args.rows, args.sheets, args.workers)
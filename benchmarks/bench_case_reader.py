@@ -0,0 +1,89 @@
+# -*- coding:utf-8 -*-
+"""
+Excel 用例读取方式对比：pandas（整表读入）与 openpyxl 只读流式读取。
+生成 --rows 行的合成 API 用例工作簿（15 列，含 JSON 与多行文本单元格），每种读取方式在独立子进程中读取一遍，
+输出首行耗时、总耗时与进程峰值 RSS。
+两种方式都不使用解析缓存：openpyxl 后端本身不写缓存，与实际运行一致；pandas 为缓存未命中时的解析。运行：
+    python benchmarks/bench_case_reader.py --rows 100000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+HEADER = ["case_module", "case_submodule", "case_name", "case_title", "skip", "method", "path", "header",
+          "parametric_type", "data", "file_path", "extra", "sql", "expect", "wait"]
+
+
+def build_workbook(path: str, rows: int):
+    import openpyxl
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADER)
+    for i in range(rows):
+        sheet.append([
+            f"模块{i // 5000}", f"子模块{i // 500}", f"用例{i // 50}", f"标题{i}", None, "post",
+            f"/api/forex-user/v2/item/{i}", '{"token": "${token}"}', "application/json",
+            json.dumps({"id": i, "account": "${my_account}", "amount": i * 0.01}),
+            None, '{"order_id": "$.data.id"}', f"SELECT status\nFROM orders\nWHERE id = {i}",
+            '{"$.success": true}', 1 if i % 10 == 0 else None,
+        ])
+    workbook.save(path)
+
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 为 KB，macOS 为字节
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def worker(path: str, backend: str):
+    """子进程：读取一遍并输出 JSON 结果"""
+    import pandas  # noqa: F401  两种方式的基线都包含 pandas / openpyxl 的导入
+    import openpyxl  # noqa: F401
+    from src.utils.read_test_cases import GenericCaseReader, process_api_row
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    first_row, count = None, 0
+    for _ in GenericCaseReader(path, process_api_row, cache=None, backend=backend).read():
+        if first_row is None:
+            first_row = time.perf_counter() - start
+        count += 1
+    total = time.perf_counter() - start
+    print(json.dumps({"backend": backend, "rows": count, "first_row": first_row, "total": total,
+                      "baseline_mb": baseline, "peak_mb": peak_rss_mb()}))
+
+
+def main(rows: int = 100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic_cases.xlsx")
+        start = time.perf_counter()
+        build_workbook(path, rows)
+        print(f"生成 {rows} 行工作簿 {os.path.getsize(path) / 2 ** 20:.1f}MiB，耗时 {time.perf_counter() - start:.1f}s")
+        for backend in ("pandas", "openpyxl"):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", backend, path],
+                capture_output=True, text=True, check=True, cwd=PROJECT_ROOT
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(output)
+            print(f"{r['backend']:<9} {r['rows']} 行  首行 {r['first_row'] * 1000:9.1f}ms  总耗时 {r['total']:6.2f}s  "
+                  f"峰值 RSS {r['peak_mb']:7.1f}MiB（读取前 {r['baseline_mb']:.1f}MiB）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker[1], args.worker[0])
+    else:
+        main(args.rows)
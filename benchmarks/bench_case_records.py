@@ -0,0 +1,85 @@
+# -*- coding:utf-8 -*-
+"""
+行 list 与 ApiCase 记录的内存占用、渲染耗时对比。
+
+生成 --rows 条数据驱动用例（模块、请求头、extra、expect 相同，data 各不相同），
+每个单元格都是独立的字符串对象，与 Excel 解析结果一致；分别以行 list 和 ApiCase 保存，
+用 tracemalloc 统计常驻内存，再对 header / data / expect 各渲染一次统计耗时：
+    python benchmarks/bench_case_records.py --rows 50000
+"""
+import os
+import sys
+import gc
+import time
+import argparse
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.utils.case_records import ApiCase
+from src.utils.platform_utils import render_json
+
+POOL = {"token": "eyJhbGciOiJIUzI1NiJ9", "USDT_coinId": 2, "uid": 10086}
+
+
+def fresh(text: str) -> str:
+    """复制出新的字符串对象，模拟解析器为每个单元格各创建一个字符串"""
+    return "".join(list(text))
+
+
+def build_rows(count: int) -> list:
+    return [[
+        fresh("H5_充值"), fresh("链上充值"), fresh("充值金额边界"), fresh(f"金额 {i}"), None, fresh("post"),
+        fresh("/api/v1/deposit/create"),
+        fresh('{"Authorization": "Bearer ${token}", "Accept-Language": "zh-CN"}'),
+        fresh("application/json"),
+        fresh(f'{{"coinId": "${{USDT_coinId}}", "amount": {i}, "remark": "case-{i}", "uid": "${{uid}}"}}'),
+        None, fresh('{"orderNo": "$.data.orderNo"}'), None,
+        fresh('{"$.code": 0, "$.msg": "success"}'), None,
+    ] for i in range(count)]
+
+
+def measure(factory):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = factory()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def render_all(cases, columns) -> float:
+    start = time.perf_counter()
+    for case in cases:
+        for cell in columns(case):
+            render_json(cell, POOL)
+    return time.perf_counter() - start
+
+
+def main(rows: int = 50000):
+    # 两种方式都从解析结果开始统计，只计算构建完成后仍然常驻的内存
+    lists, list_bytes, _ = measure(lambda: build_rows(rows))
+    records, record_bytes, _ = measure(lambda: [ApiCase.from_row(row, i) for i, row in enumerate(build_rows(rows), 1)])
+    start = time.perf_counter()
+    for i, row in enumerate(lists, 1):
+        ApiCase.from_row(row, i)
+    load_time = time.perf_counter() - start
+    print(f"{rows} 条用例")
+    print(f"  行 list   常驻 {list_bytes / 1024 / 1024:8.2f}MiB  每条 {list_bytes / rows:7.0f}B")
+    print(f"  ApiCase   常驻 {record_bytes / 1024 / 1024:8.2f}MiB  每条 {record_bytes / rows:7.0f}B  "
+          f"构建耗时 {load_time:.2f}s（含 JSON 解析与校验）")
+    text_time = render_all(lists, lambda c: (c[7], c[9], c[13]))
+    record_time = render_all(records, lambda c: (c.header, c.data, c.expect))
+    print(f"  渲染 header/data/expect  文本 {text_time:.2f}s  预解析 {record_time:.2f}s  "
+          f"{text_time / record_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+    main(args.rows)
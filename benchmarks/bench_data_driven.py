@@ -0,0 +1,168 @@
+# -*- coding:utf-8 -*-
+"""
+数据驱动用例：一次性展开与按索引延迟展开的内存、耗时对比。
+
+生成 --records 条记录的 .jsonl / .csv 数据文件，一行用例的 data 列指向该文件：
+- 一次性展开：读出全部记录，每条构建完整的 ApiCase（与 parametrize 传入完整用例列表相同）
+- 延迟展开：DataDrivenCase 只建立偏移索引，变体 CaseVariant 只保存 (用例, 序号)，执行时再读取记录
+用 tracemalloc 统计收集阶段常驻内存与峰值，再抽样读取变体统计单条加载耗时：
+    python benchmarks/bench_data_driven.py --records 100000
+上面只统计用例与索引本身。--collect 再以子进程执行真实的 pytest 收集（-p conftest 加载 tests/conftest.py，
+经过 pytest_collection_modifyitems -> expand_items），对比 max_items=0（每条记录一个测试项）与
+[data_driven] max_items 的测试项数、收集耗时与进程峰值 RSS：
+    python benchmarks/bench_data_driven.py --records 100000 --collect
+"""
+import os
+import sys
+import gc
+import csv
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.utils.case_records import ApiCase
+import src.utils.data_driven as data_driven
+from src.utils.data_driven import DataDrivenCase, PARSED_FILES, _resolve
+from src.utils.platform_utils import JsonCell
+
+
+def build_files(folder: str, count: int) -> dict:
+    records = [{"coinId": "${USDT_coinId}", "amount": i, "remark": f"sweep-{i}", "_title": f"金额 {i}"}
+               for i in range(count)]
+    jsonl = os.path.join(folder, "sweep.jsonl")
+    with open(jsonl, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    csv_path = os.path.join(folder, "sweep.csv")
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+    return {"jsonl": jsonl, "csv": csv_path}
+
+
+def row_for(path: str) -> list:
+    return ["H5_充值", "链上充值", "金额遍历", "金额", None, "post", "/api/v1/deposit/create",
+            '{"Authorization": "Bearer ${token}"}', "application/json", path, None, None, None,
+            '{"$.code": 0}', None]
+
+
+def eager(path: str) -> list:
+    """原有方式：全部记录解析为完整用例"""
+    row = row_for(path)
+    cases = []
+    with open(path, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f] if path.endswith(".jsonl") else list(csv.DictReader(f))
+    for record in rows:
+        cells = list(row)
+        cells[3] = f"{row[3]}-{record.pop('_title')}"
+        cells[9] = JsonCell.from_value(record)
+        cases.append(ApiCase(*cells))
+    return cases
+
+
+def lazy(path: str) -> list:
+    _resolve.cache_clear()
+    PARSED_FILES.clear()
+    return list(DataDrivenCase(*row_for(path)).variants())
+
+
+def measure(factory, path: str):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = factory(path)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main(count: int = 100000, samples: int = 2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        files = build_files(tmp, count)
+        print(f"{count} 条记录")
+        for kind, path in files.items():
+            for label, factory in (("一次性展开", eager), ("延迟展开", lazy)):
+                result, current, peak, elapsed = measure(factory, path)
+                line = (f"  {kind:<5} {label}  耗时 {elapsed:6.2f}s  常驻 {current / 1024 / 1024:7.2f}MiB  "
+                        f"峰值 {peak / 1024 / 1024:7.2f}MiB")
+                if label == "延迟展开":
+                    picks = random.Random(1).sample(result, min(samples, len(result)))
+                    start = time.perf_counter()
+                    for variant in picks:
+                        variant.load().data.render({"USDT_coinId": 2})
+                    line += f"  单条加载 {(time.perf_counter() - start) / len(picks) * 1e6:.0f}µs"
+                print(line)
+                del result
+
+
+TEST_MODULE = """
+import sys, json, atexit, resource
+import pytest
+import src.utils.data_driven as data_driven
+from src.utils.data_driven import DataDrivenCase
+
+data_driven.MAX_ITEMS = {max_items}
+ROW = {row!r}
+
+
+def _report():
+    # Linux 的 ru_maxrss 会继承父进程的峰值，优先读取本进程的 VmHWM
+    try:
+        with open("/proc/self/status") as f:
+            peak_mb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+    print("RESULT " + json.dumps({{"peak_mb": peak_mb}}), file=sys.stderr)
+
+
+atexit.register(_report)
+
+
+@pytest.mark.parametrize("case", [DataDrivenCase(*ROW)])
+def test_sweep(case):
+    pass
+"""
+
+
+def collect(count: int):
+    """真实 pytest 收集路径下的测试项数、耗时与峰值 RSS"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_files(tmp, count)["jsonl"]
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([PROJECT_ROOT, os.path.join(PROJECT_ROOT, "tests")]))
+        print(f"{count} 条记录，pytest --collect-only（tests/conftest.py 钩子）")
+        for max_items in (0, data_driven.MAX_ITEMS):
+            module = os.path.join(tmp, f"test_sweep_{max_items}.py")
+            with open(module, "w", encoding="utf-8") as f:
+                f.write(TEST_MODULE.format(max_items=max_items, row=row_for(path)))
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-m", "pytest", "-p", "conftest", "--collect-only", "-q", "-p", "no:cacheprovider",
+                 "--rootdir", tmp, module], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+            )
+            elapsed = time.perf_counter() - start
+            result = json.loads(next(line[7:] for line in proc.stderr.splitlines() if line.startswith("RESULT ")))
+            # 汇总行的数量是展开前的，按 -q 输出的测试项行计数
+            items = sum(1 for line in proc.stdout.splitlines() if "::" in line)
+            label = "每条记录一个测试项" if not max_items else f"max_items={max_items}"
+            print(f"  {label:<18} 测试项 {items:>7}  耗时 {elapsed:6.2f}s  峰值 RSS {result['peak_mb']:7.1f}MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--collect", action="store_true", help="同时测量真实 pytest 收集路径")
+    args = parser.parse_args()
+    main(args.records, args.samples)
+    if args.collect:
+        collect(args.records)
@@ -0,0 +1,138 @@
+# -*- coding:utf-8 -*-
+"""
+启动耗时：用 python -X importtime 统计入口与测试模块的导入耗时，并作为冷启动预算的守卫。
+
+每个目标在新的解释器中执行 --repeat 次，取最小值（排除解释器自身启动导入的模块）：
+- cli：导入 src.main（main.py 解析参数前）
+- api：main.py -t api 在收集用例前的导入：入口、api runner（含 pytest）与 tests/conftest.py
+- collect：pytest --collect-only tests/test_api.py（含用例读取，受用例缓存影响，只统计不检查）
+输出各目标的导入耗时、进程耗时和最慢的模块：
+    python benchmarks/bench_import_time.py --top 15
+--check 时 api 超过 [startup] budget_ms，或 cli / api 导入了 lazy_modules 中的模块，以退出码 1 失败，
+并打印该模块是经由哪条导入链被加载的：
+    python benchmarks/bench_import_time.py --check
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.utils.read_test_cases import read_conf
+
+STARTUP_CONF = read_conf.get_dict("startup") if read_conf.config.has_section("startup") else {}
+DEFAULT_LAZY_MODULES = "pandas, numpy, cv2, redis, pyotp, appium, playwright, openpyxl"
+
+TARGETS = {
+    "cli": ["-c", "import src.main"],
+    "api": ["-c", "import sys; import src.main, src.runners.api_runner; "
+                  "sys.path.insert(0, 'tests'); import conftest"],
+    "collect": ["-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", "tests/test_api.py"],
+}
+# 参与 --check 的目标；budget_ms 只约束 api
+CHECKED = ("cli", "api")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_importtime(args: list) -> tuple:
+    """新解释器执行一次，返回 (进程耗时秒, [(层级, 模块名, 自身µs, 累计µs), ...])"""
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=PROJECT_ROOT, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, encoding="utf-8",
+                          errors="replace")
+    elapsed = time.perf_counter() - start
+    records = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            records.append(((len(indent) - 1) // 2, name, int(own), int(cumulative)))
+    return elapsed, records
+
+
+def import_total(records: list, baseline: set) -> int:
+    """顶层导入的累计耗时之和（µs），解释器启动时就会导入的模块不计"""
+    return sum(cumulative for depth, name, _, cumulative in records if depth == 0 and name not in baseline)
+
+
+def import_chain(records: list, index: int) -> list:
+    """importtime 按“子模块先于父模块”输出，向后找层级递减的行即为导入链"""
+    depth, name = records[index][:2]
+    chain = [name]
+    for later_depth, later_name, _, _ in records[index + 1:]:
+        if later_depth < depth:
+            chain.append(later_name)
+            depth = later_depth
+            if depth == 0:
+                break
+    return chain[::-1]
+
+
+def lazy_violations(records: list, lazy_modules: set) -> dict:
+    """lazy_modules 中被导入的顶层包 -> 第一次导入它的导入链"""
+    found = {}
+    for i, (_, name, _, _) in enumerate(records):
+        top = name.split(".", 1)[0]
+        if top in lazy_modules and top not in found:
+            # 只保留到第一次进入该包为止
+            chain = import_chain(records, i)
+            found[top] = chain[:next(n for n, module in enumerate(chain) if module.split(".", 1)[0] == top) + 1]
+    return found
+
+
+def measure(name: str, repeat: int, baseline: set) -> dict:
+    best = None
+    for _ in range(repeat):
+        elapsed, records = run_importtime(TARGETS[name])
+        total = import_total(records, baseline)
+        if best is None or total < best["import_us"]:
+            best = {"import_us": total, "elapsed": elapsed, "records": records}
+    return best
+
+
+def main(targets: list, repeat: int = 5, top: int = 10, check: bool = False) -> int:
+    budget_ms = float(STARTUP_CONF.get("budget_ms") or 0)
+    lazy_modules = {m.strip() for m in (STARTUP_CONF.get("lazy_modules") or DEFAULT_LAZY_MODULES).split(",")
+                    if m.strip()}
+    baseline = {name for _, name, _, _ in run_importtime(["-c", "pass"])[1]}
+    failures = []
+    for name in targets:
+        result = measure(name, repeat, baseline)
+        records = result["records"]
+        print(f"{name:<8} 导入 {result['import_us'] / 1000:8.1f}ms  进程 {result['elapsed'] * 1000:8.1f}ms  "
+              f"模块 {sum(1 for r in records if r[1] not in baseline)} 个")
+        slowest = sorted((r for r in records if r[1] not in baseline), key=lambda r: r[2], reverse=True)[:top]
+        for _, module, own, cumulative in slowest:
+            print(f"    {own / 1000:7.1f}ms  (累计 {cumulative / 1000:7.1f}ms)  {module}")
+        if not check or name not in CHECKED:
+            continue
+        for module, chain in lazy_violations(records, lazy_modules).items():
+            failures.append(f"{name}: 启动时导入了 {module}（{' -> '.join(chain)}）")
+        if name == "api" and budget_ms and result["import_us"] / 1000 > budget_ms:
+            failures.append(f"{name}: 导入耗时 {result['import_us'] / 1000:.1f}ms 超过预算 {budget_ms:.0f}ms")
+    if check:
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print("启动耗时检查未通过" if failures else "启动耗时检查通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("targets", nargs="*", metavar="target",
+                        help=f"{' / '.join(TARGETS)}，默认全部（--check 时为 {' '.join(CHECKED)}）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="超出 [startup] 预算或导入了延迟加载的模块时返回 1")
+    args = parser.parse_args()
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"未知的目标: {', '.join(sorted(unknown))}")
+    selected = args.targets or (list(CHECKED) if args.check else list(TARGETS))
+    sys.exit(main(selected, args.repeat, args.top, args.check))
@@ -0,0 +1,56 @@
+# -*- coding:utf-8 -*-
+"""
+jsonpath 库与 extractor（编译缓存 + 简单路径直取）的提取耗时对比。
+
+响应体模拟余额/列表接口，按列表长度 10 / 500 / 5000 分别测试，运行：
+    python benchmarks/bench_jsonpath.py
+"""
+import os
+import sys
+import timeit
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from jsonpath import jsonpath
+from src.utils.platform_utils import extractor
+
+EXPRESSIONS = {
+    "简单路径": "$.data.token",
+    "下标路径": "$.data.cryptoList[0].totalBalance",
+    "过滤表达式": "$.data.cryptoList[?(@.coinSymbol == 'USDT')].totalBalance",
+}
+
+
+def build_response(size: int) -> dict:
+    coins = ["USDT", "USDC", "TRX", "PHT"]
+    return {
+        "success": True,
+        "errorCode": None,
+        "data": {
+            "token": "eyJhbGciOiJIUzI1NiJ9.bench",
+            "cryptoList": [
+                {
+                    "id": i, "coinSymbol": coins[i % len(coins)] if i else "USDT",
+                    "totalBalance": f"{i * 1.5:.2f}", "frozenBalance": "0.00", "accuracy": 6,
+                }
+                for i in range(size)
+            ],
+        },
+    }
+
+
+def main(number: int = 2000):
+    for size in (10, 500, 5000):
+        response = build_response(size)
+        loops = max(20, number // max(1, size // 100))
+        print(f"--- 列表长度 {size}，每项 {loops} 次 ---")
+        for label, expr in EXPRESSIONS.items():
+            assert extractor(response, expr) == (lambda m: m[0] if len(m) == 1 else m)(jsonpath(response, expr))
+            lib = timeit.timeit(lambda: jsonpath(response, expr), number=loops) / loops * 1e6
+            ours = timeit.timeit(lambda: extractor(response, expr), number=loops) / loops * 1e6
+            print(f"{label:<8} jsonpath {lib:10.1f}us  extractor {ours:10.1f}us  {lib / ours:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
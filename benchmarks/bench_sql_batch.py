@@ -0,0 +1,87 @@
+# -*- coding:utf-8 -*-
+"""
+sql 列多条语句：逐条执行与批量执行（一次往返）的耗时对比。
+
+以本地 SQLite 代替 MySQL：RoundTripSQLiteHandler 在每次与“服务端”交互时等待 --rtt 毫秒，
+逐条执行每条语句一次往返，批量执行全部语句一次往返，与 MySQL 多语句的行为一致。
+查询经过 RequestDataProcessor.execute_select_fetchone / execute_sql_from_case 的完整路径，运行：
+    python benchmarks/bench_sql_batch.py --rtt 1.0
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import sqlite3
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.api.request_data_processor import RequestDataProcessor
+from src.utils.sql_handler import SQLHandlerFactory, SQLiteHandler
+
+
+class RoundTripSQLiteHandler(SQLiteHandler):
+    """每次调用模拟一次网络往返"""
+    rtt = 0.001
+
+    def execute_query(self, sql, params=None):
+        time.sleep(self.rtt)
+        return super().execute_query(sql, params)
+
+    def fetchone(self, sql):
+        time.sleep(self.rtt)
+        return super().fetchone(sql)
+
+    def execute_batch(self, statements):
+        time.sleep(self.rtt)
+        return super().execute_batch(statements)
+
+
+def build_db(path: str):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE coin (id INTEGER PRIMARY KEY, symbol TEXT, accuracy INTEGER, fee REAL)")
+    conn.executemany("INSERT INTO coin VALUES (?, ?, ?, ?)",
+                     [(i, f"C{i}", i % 8, i * 0.001) for i in range(1, 5001)])
+    conn.commit()
+    conn.close()
+
+
+def build_sql(count: int) -> str:
+    return ";\n".join(f"SELECT accuracy, fee FROM coin WHERE id = {i * 37 % 5000 + 1}" for i in range(count))
+
+
+def main(rtt_ms: float = 1.0, loops: int = 50):
+    RoundTripSQLiteHandler.rtt = rtt_ms / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        build_db(path=db_path)
+        pool = SQLHandlerFactory.get_pool({"type": "sqlite", "path": db_path})
+        handler = RoundTripSQLiteHandler(db_path, pool=pool)
+
+        processor = RequestDataProcessor(header_key={}, host_key={})
+        processor._get_db_handler = lambda db_key="mysql_db": handler
+
+        print(f"模拟往返 {rtt_ms}ms，每项 {loops} 次")
+        for count in (1, 3, 10, 30):
+            sql = build_sql(count)
+            timings = {}
+            for label, batch in (("逐条", False), ("批量", True)):
+                processor.sql_batch = batch
+                expected = processor.execute_select_fetchone(sql, None)
+                start = time.perf_counter()
+                for _ in range(loops):
+                    assert processor.execute_select_fetchone(sql, None) == expected
+                    processor.execute_sql_from_case(sql, None)
+                timings[label] = (time.perf_counter() - start) / loops * 1000
+            print(f"{count:>3} 条语句  逐条 {timings['逐条']:8.2f}ms  批量 {timings['批量']:8.2f}ms  "
+                  f"{timings['逐条'] / timings['批量']:5.1f}x")
+        SQLHandlerFactory.close_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt", type=float, default=1.0, help="模拟的单次往返耗时（毫秒），0 表示纯本地 SQLite")
+    parser.add_argument("--loops", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rtt, args.loops)
@@ -0,0 +1,74 @@
+# -*- coding:utf-8 -*-
+"""
+大结果集对账查询：全部读取（execute_query）与流式聚合（@count / @sum / @limit(N)）的耗时与内存峰值对比。
+以本地 SQLite 账本表代替 MySQL，count / sum 经过 RequestDataProcessor.execute_select_fetchone 的完整路径，运行：
+    python benchmarks/bench_sql_stream.py --rows 300000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import sqlite3
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.core.api.request_data_processor import RequestDataProcessor
+from src.utils.sql_handler import SQLHandlerFactory, Aggregation
+
+
+def build_db(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE ledger (id INTEGER PRIMARY KEY, account TEXT, amount REAL, memo TEXT)")
+    conn.executemany("INSERT INTO ledger VALUES (?, ?, ?, ?)",
+                     ((i, f"A{i % 97}", i % 1000 * 0.01, f"transfer #{i}") for i in range(1, rows + 1)))
+    conn.commit()
+    conn.close()
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(rows: int = 300000, chunk_size: int = 1000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        build_db(db_path, rows)
+        handler = SQLHandlerFactory.create({"type": "sqlite", "path": db_path})
+
+        processor = RequestDataProcessor(header_key={}, host_key={}, sql_conf={"stream_chunk_size": chunk_size})
+        processor._get_db_handler = lambda db_key="mysql_db": handler
+
+        query = "SELECT id, account, amount, memo FROM ledger"
+        cases = (
+            ("count", lambda: len(handler.execute_query(query)),
+             lambda: processor.execute_select_fetchone(f"@count {query}", None)[0]),
+            ("sum", lambda: round(sum(r[2] for r in handler.execute_query(query)), 2),
+             lambda: round(processor.execute_select_fetchone(f"@sum(2) {query}", None)[0], 2)),
+            ("limit(10)", lambda: handler.execute_query(query)[:10],
+             lambda: handler.aggregate(query, Aggregation("limit", 10), chunk_size=chunk_size)),
+        )
+        print(f"{rows} 行，每批 {chunk_size} 行")
+        for label, full, stream in cases:
+            full_result, full_time, full_peak = measure(full)
+            stream_result, stream_time, stream_peak = measure(stream)
+            assert full_result == stream_result, (label, full_result, stream_result)
+            print(f"{label:<10} 全部读取 {full_time * 1000:8.1f}ms {full_peak / 2 ** 20:8.1f}MiB   "
+                  f"流式聚合 {stream_time * 1000:8.1f}ms {stream_peak / 2 ** 20:8.2f}MiB")
+        SQLHandlerFactory.close_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.rows, args.chunk_size)
@@ -59,5 +59,7 @@ class ProjectPaths:
     card = API_AUTO_DIR / "uu_api" / "card.xlsx"
     agent = API_AUTO_DIR / "uu_api" / "agent.xlsx"
     corporate = API_AUTO_DIR / "uu_api" / "corporate.xlsx"
+    # tests/test_api.py 按此顺序执行的工作簿
+    API_MODULES = [register, login, userinfo, security, deposit, withdraw, converter, card, agent, corporate]
 
 
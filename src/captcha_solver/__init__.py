@@ -1,5 +1,18 @@
-from .request_builder import build_slider_request
-from .image_processing import detect_split_position
-from .service import solve_captcha
+# 子模块按需导入：image_processing 依赖 cv2 / numpy，只在第一次求解验证码时加载
+import importlib
 
-__all__ = ["build_slider_request", "detect_split_position", "solve_captcha"]
\ No newline at end of file
+_EXPORTS = {
+    "build_slider_request": "request_builder",
+    "detect_split_position": "image_processing",
+    "solve_captcha": "service",
+}
+
+__all__ = ["build_slider_request", "detect_split_position", "solve_captcha"]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
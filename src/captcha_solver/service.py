@@ -1,24 +1,49 @@
 # -*- coding:utf-8 -*-
 import time
+from functools import lru_cache
+from typing import NamedTuple
 import requests
 from src.utils.logger import LOGGER
 from src.utils.read_test_cases import read_conf
-from src.captcha_solver.request_builder import build_slider_request
 from src.utils.redis_utils import clear_cache
 from config.settings import ProjectPaths
 
 bg_annotated = ProjectPaths.IMG_DIR / f"bg_annotated.jpg"
-HOST = read_conf.get_dict('host')['url']
-GEN_URL = f"{HOST}/api/forex-user/v2/user/captcha/gen"
-CHECK_URL = f"{HOST}/api/forex-user/v2/user/captcha/check"
-HEADERS = read_conf.get_dict("header")
+
+
+class CaptchaEndpoints(NamedTuple):
+    host: str
+    gen_url: str
+    check_url: str
+    headers: dict
+
+
+@lru_cache(maxsize=None)
+def endpoints() -> CaptchaEndpoints:
+    """验证码接口地址与请求头，第一次调用时才读取 [host] / [header] 配置"""
+    host = read_conf.get_dict('host')['url']
+    return CaptchaEndpoints(
+        host,
+        f"{host}/api/forex-user/v2/user/captcha/gen",
+        f"{host}/api/forex-user/v2/user/captcha/check",
+        read_conf.get_dict("header"),
+    )
+
+
+def __getattr__(name: str):
+    # 兼容原模块级常量 HOST / GEN_URL / CHECK_URL / HEADERS
+    field = {"HOST": "host", "GEN_URL": "gen_url", "CHECK_URL": "check_url", "HEADERS": "headers"}.get(name)
+    if field is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(endpoints(), field)
 
 
 def gen_captcha(max_retries=15):
     """调用 /gen 获取验证码，失败时仅在返回失败时清理 Redis 缓存"""
+    api = endpoints()
     for attempt in range(max_retries):
         try:
-            resp = requests.post(GEN_URL, headers=HEADERS, json={"type": "SLIDER"}).json()
+            resp = requests.post(api.gen_url, headers=api.headers, json={"type": "SLIDER"}).json()
         except Exception as e:
             LOGGER.error(f"[Gen] 请求异常: {e}, 第 {attempt+1} 次重试")
             time.sleep(0.5)
@@ -42,7 +67,8 @@ def gen_captcha(max_retries=15):
 
 def check_captcha(payload: dict):
     """调用 /check 校验验证码"""
-    resp = requests.post(CHECK_URL, headers=HEADERS, json=payload).json()
+    api = endpoints()
+    resp = requests.post(api.check_url, headers=api.headers, json=payload).json()
     if resp.get("errorCode", {}):
         clear_cache("captcha*")
     return resp
@@ -50,6 +76,8 @@ def check_captcha(payload: dict):
 
 def solve_captcha():
     """完整流程：生成 → 分析图片 → 轨迹 → 校验"""
+    # 图像分析依赖 cv2 / numpy，求解时才导入
+    from src.captcha_solver.request_builder import build_slider_request
     while True:
         r = gen_captcha()
         captcha_id = r["data"]["id"]
@@ -1,21 +1,35 @@
 # coding: utf-8
 import requests
-from requests.exceptions import JSONDecodeError, ChunkedEncodingError
+from requests.exceptions import ChunkedEncodingError, ConnectionError as RequestsConnectionError, ReadTimeout
 from src.utils.allure_utils import (
     set_allure_project, set_allure_module, set_allure_case, set_allure_title,
-    set_allure_description, add_allure_step, set_allure_link
+    set_allure_description, add_allure_step, add_allure_body_step, set_allure_link,
+    flush_pending_allure_steps, discard_pending_allure_steps
 )
+from src.core.api.session_manager import SessionManager
+from src.core.api.response_handler import ResponsePolicy, read_response, preview
+from src.core.api.retry_policy import RetryPolicies, RetryPolicy, RetryStats, ModuleDeadline
+from src.core.api.wait_condition import WaitCondition, WaitStats, WaitTimeout, poll, wait_before_request
+from src.utils.sql_metrics import CURRENT_CASE
+from src.utils.case_records import ApiCase
 from src.utils.logger import LOGGER
 import time
 
 
 class ApiClient:
-    _sessions = {}
-    _default_session = None
+    # 未注入 session_manager 时所有 ApiClient 共用的默认管理器
+    _shared_session_manager = None
 
-    def __init__(self, request_data_processor):
-        self.session = requests.Session()
+    def __init__(self, request_data_processor, session_manager: SessionManager = None,
+                 response_policy: ResponsePolicy = None, retry_policies: RetryPolicies = None):
         self.processor = request_data_processor
+        self.session_manager = session_manager or self._get_shared_session_manager()
+        self.response_policy = response_policy or ResponsePolicy()
+        self.retry_policies = retry_policies or RetryPolicies()
+        self.retry_stats = RetryStats()
+        self.wait_stats = WaitStats()
+        self.deadline = None
+        self._last_status = None
         # 保存上一次的层级
         self.last_module = None
         self.last_submodule = None
@@ -37,6 +51,8 @@ class ApiClient:
             self.last_module = case_module
             self.last_submodule = None
             self.last_case_name = None
+            # 每个模块重新计算时间预算
+            self.deadline = ModuleDeadline(case_module, self.retry_policies.module_deadline)
 
         # 子模块计数
         if case_submodule != self.last_submodule:
@@ -63,26 +79,27 @@ class ApiClient:
 
         return numbered_module, numbered_submodule, numbered_case_name, numbered_case_title
 
+    @classmethod
+    def _get_shared_session_manager(cls) -> SessionManager:
+        if cls._shared_session_manager is None:
+            cls._shared_session_manager = SessionManager()
+        return cls._shared_session_manager
+
+    @property
+    def session(self) -> requests.Session:
+        return self.session_manager.get_session()
+
     def get_session(self, token: str = None) -> requests.Session:
-        if token:
-            if token not in self._sessions:
-                session = requests.Session()
-                if "Authorization" in token:
-                    session.headers.update({"Authorization": f"Bearer {token}"})
-                else:
-                    session.headers.update({"token": token})
-                self._sessions[token] = session
-            return self._sessions[token]
-        else:
-            if self._default_session is None:
-                self._default_session = requests.Session()
-            return self._default_session
+        return self.session_manager.get_session(token)
 
-    def send_case(self, case: list) -> object:
+    def send_case(self, case: ApiCase) -> object:
+        # header / data / extra / expect 为加载时已解析的 JsonCell，旧的行 list 在这里转换
+        # 可选第 16 列 retry：JSON 覆盖本条用例的超时/重试策略，如 {"read_timeout": 60, "retries": 0}
+        case = ApiCase.of(case)
         (
             case_module, case_submodule, case_name, case_title, skip, method, path, header,
-            parametric_type, data, file_path, extra, sql, expect, wait
-        ) = case
+            parametric_type, data, file_path, extra, sql, expect, wait, case_retry
+        ) = case.cells()
 
         numbered_module, numbered_submodule, numbered_case_name, numbered_case_title = self._add_case_numbering(
             case_module, case_submodule, case_name, case_title)
@@ -92,48 +109,135 @@ class ApiClient:
             f"Path: {path}\nData: {data}\nExtra: {extra}\nSQL: {sql}\nExpected: {expect}\nfile_path: {file_path}"
         )
 
-        if wait is not None:
-            time.sleep(float(wait))
-
         set_allure_project(numbered_module)
         set_allure_module(numbered_submodule)
         set_allure_case(numbered_case_name)
         set_allure_title(numbered_case_title)
         set_allure_description(description=f"{case_title}")
 
-        url = self.processor.handler_path(path_str=path)
-        header = self.processor.handler_header(header, data, sql)
-        data = self.processor.handler_data(data, sql, extra)
-        file = self.processor.handler_files(file_path)
-        set_allure_link(url)
-        add_allure_step(f'Request Time (s): {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())}')
-        add_allure_step('Header', header)
-        add_allure_step('Request', data)
-
-        response = self._send_api_with_retry(
-            url, method, parametric_type, header, data, file
-        )
+        # SQL 耗时统计按用例归属
+        case_token = CURRENT_CASE.set(f"{numbered_case_name}/{numbered_case_title}")
+        try:
+            condition = WaitCondition.parse(wait)
+            if condition is not None and condition.before_request:
+                self._wait(condition, lambda timeout: wait_before_request(condition, self.processor, timeout))
+            url = self.processor.handler_path(path_str=path)
+            header = self.processor.handler_header(header, data, sql)
+            data = self.processor.handler_data(data, sql, extra)
+            file = self.processor.handler_files(file_path)
+            set_allure_link(url)
+            add_allure_step(f'Request Time (s): {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())}')
+            add_allure_body_step('Header', header)
+            add_allure_body_step('Request', data)
+
+            policy = self.retry_policies.for_request(url, case_retry)
+            if condition is not None and not condition.before_request:
+                response = self._poll_request(condition, url, method, parametric_type, header, data, file, policy)
+            else:
+                response = self._send_api_with_retry(
+                    url, method, parametric_type, header, data, file, policy=policy
+                )
 
-        self.processor.handler_extra(extra, response)
-        self.processor.assert_result(response, expect)
+            self.processor.handler_extra(extra, response)
+            self.processor.assert_result(response, expect)
+        except BaseException:
+            # lean 模式下只有失败用例才附带请求/响应详情
+            flush_pending_allure_steps()
+            raise
+        finally:
+            discard_pending_allure_steps()
+            CURRENT_CASE.reset(case_token)
 
         return response, sql
 
+    def _wait(self, condition: WaitCondition, waiter):
+        """执行等待并记录实际等待时长，超时时间受模块时间预算约束"""
+        remaining = self.deadline.remaining() if self.deadline else None
+        timeout = condition.timeout if remaining is None else min(condition.timeout, max(remaining, 0))
+        start = time.monotonic()
+        try:
+            result = waiter(timeout)
+        except WaitTimeout:
+            self.wait_stats.record(condition.kind, time.monotonic() - start, timed_out=True)
+            raise
+        waited, attempts = result[-2:]
+        self.wait_stats.record(condition.kind, waited)
+        LOGGER.info(f"等待完成 {condition.describe()}: 耗时 {waited:.2f}s, 轮询 {attempts} 次")
+        add_allure_step(f"Wait ({condition.kind}): {waited:.2f}s, 轮询 {attempts} 次")
+        return result[0] if len(result) > 2 else None
+
+    def _poll_request(self, condition: WaitCondition, url, method, parametric_type, header, data, file,
+                      policy: RetryPolicy):
+        """重复发送请求，直到响应满足 until 条件"""
+        def check():
+            self._rewind_files(file)
+            response = self._send_api_with_retry(url, method, parametric_type, header, data, file, policy=policy)
+            return condition.matches(response, self.processor.extra_pool), response
+
+        return self._wait(condition, lambda timeout: poll(check, condition, timeout))
+
     def _send_api_with_retry(
         self, url: str, method: str, parametric_type: str,
-        header=None, data=None, file=None, retries=3, delay=2
+        header=None, data=None, file=None, policy: RetryPolicy = None
     ) -> dict:
-        for attempt in range(retries):
+        """
+        按策略发送请求：连接错误、连接超时、分块传输中断以及 retry_statuses 中的状态码会重试，
+        重试前按指数退避加随机抖动等待；读取超时仅在 retry_read_timeout 开启时重试。
+        所有等待和超时都受当前模块剩余时间预算约束。
+        """
+        policy = policy or self.retry_policies.default
+        deadline = self.deadline or ModuleDeadline("", 0)
+        self.retry_stats.requests += 1
+        retried, retry_spent = 0, 0.0
+
+        for attempt in range(policy.retries + 1):
+            remaining = deadline.check()
+            start = time.monotonic()
+            last_attempt = attempt >= policy.retries
             try:
-                return self._send_api(url, method, parametric_type, header, data, file)
-            except ChunkedEncodingError as e:
-                LOGGER.warning(f'ChunkedEncodingError: {e}. Retrying {attempt + 1}/{retries}...')
-                time.sleep(delay)
-        raise ChunkedEncodingError('超过 ChunkedEncodingError 的最大重试次数')
+                response = self._send_api(url, method, parametric_type, header, data, file,
+                                          timeout=policy.timeout(remaining))
+                if self._last_status not in policy.retry_statuses or last_attempt:
+                    break
+                reason = f"HTTP {self._last_status}"
+            except (RequestsConnectionError, ChunkedEncodingError, ReadTimeout) as e:
+                retryable = not isinstance(e, ReadTimeout) or policy.retry_read_timeout
+                if not retryable or last_attempt:
+                    self._log_retry_summary(url, retried, retry_spent)
+                    raise
+                reason = type(e).__name__
+
+            pause = policy.backoff(attempt)
+            remaining = deadline.remaining()
+            if remaining is not None:
+                pause = min(pause, max(remaining, 0))
+            LOGGER.warning(f'{reason}: {url}. {pause:.2f}s 后重试 {attempt + 1}/{policy.retries}...')
+            time.sleep(pause)
+            self._rewind_files(file)
+            spent = time.monotonic() - start
+            self.retry_stats.record(reason, spent)
+            retried += 1
+            retry_spent += spent
+
+        self._log_retry_summary(url, retried, retry_spent)
+        return response
+
+    @staticmethod
+    def _rewind_files(file) -> None:
+        """重试前把已上传过的文件指针移回开头"""
+        for value in (file or {}).values():
+            if isinstance(value, tuple) and len(value) > 1 and hasattr(value[1], "seek"):
+                value[1].seek(0)
+
+    @staticmethod
+    def _log_retry_summary(url: str, retried: int, spent: float) -> None:
+        if retried:
+            LOGGER.info(f"请求重试 {retried} 次，重试耗时 {spent:.2f}s: {url}")
+            add_allure_step(f"Retries: {retried}, Retry Time (s): {spent:.2f}")
 
     def _send_api(
         self, url: str, method: str, parametric_type: str,
-        header=None, data=None, file=None
+        header=None, data=None, file=None, timeout=None
     ) -> dict:
         # 检查 token 或 authorization 是否存在，并获取有效的 session
         token = header.get('token') or header.get('Authorization')
@@ -158,22 +262,20 @@ class ApiClient:
                 'application/x-www-form-urlencoded, application/json, multipart/form-data'
             )
 
-        res = session.request(**request_kwargs)
-
-        try:
-            response = res.json()
-            LOGGER.debug(f'JSON Response: {response}')
-        except JSONDecodeError:
-            response = res.text
-            LOGGER.debug(f'Text Response: {response}')
+        sent = time.monotonic()
+        res = session.request(stream=True, timeout=timeout, **request_kwargs)
+        self._last_status = res.status_code
+        response = read_response(res, self.response_policy)
+        self.retry_stats.request_time += time.monotonic() - sent
 
+        limit = self.response_policy.preview_chars
         LOGGER.info(
             'Request Details:\n'
-            f'URL: {res.url}\nMethod: {method}\nHeaders: {header}\n'
-            f'Data: {data}\nFiles: {file}\nResponse: {response}'
+            f'URL: {res.url}\nMethod: {method}\nHeaders: {preview(header, limit)}\n'
+            f'Data: {preview(data, limit)}\nFiles: {file}\nResponse: {preview(response, limit)}'
         )
 
         add_allure_step(f'Response Time (s): {res.elapsed.total_seconds()}')
-        add_allure_step('Response', response)
+        add_allure_body_step('Response', response)
 
         return response
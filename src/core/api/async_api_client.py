@@ -0,0 +1,243 @@
+# coding: utf-8
+import time
+import asyncio
+from typing import Any, Iterable, List, NamedTuple, Optional, Set
+import httpx
+from src.core.api.response_handler import ResponsePolicy, ResponseBodyReader, preview
+from src.core.api.case_dependency import consumed_vars, produced_vars
+from src.core.api.wait_condition import WaitCondition, WaitTimeout, wait_before_request
+from src.utils.sql_metrics import CURRENT_CASE
+from src.utils.case_records import ApiCase
+from src.utils.data_driven import expand_cases
+from src.utils.logger import LOGGER, ERROR_LOGGER
+
+
+class AsyncCaseResult(NamedTuple):
+    """单条用例的异步执行结果"""
+    index: int
+    case: list
+    response: Any = None
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None
+
+
+def split_independent_batches(cases: List[list]) -> List[List[int]]:
+    """
+    按顺序把用例切分成批次，同一批次内的用例互不依赖，可并发执行：
+    - 引用了当前批次中其他用例产出的变量 → 开启新批次
+    - 带 wait 的用例视为屏障（通常在等待后台处理）→ 开启新批次
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    produced: Set[str] = set()
+    for index, case in enumerate(cases):
+        wait = case[14] if len(case) > 14 else None
+        if current and (wait is not None or consumed_vars(case) & produced):
+            batches.append(current)
+            current, produced = [], set()
+        current.append(index)
+        produced |= produced_vars(case)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class AsyncApiClient:
+    """
+    基于 httpx.AsyncClient 的异步用例执行器。
+    ${var} 替换、function: 调用、extra 提取和断言全部复用 RequestDataProcessor，
+    同一模块内互不依赖的用例在并发上限内同时发送；sequential_modules 中的模块（依赖服务端处理顺序）逐条执行。
+    请求构建、extra 提取与断言会读写共用的参数池，由参数池锁串行执行，只有请求本身并发。
+    """
+
+    def __init__(self, request_data_processor, concurrency: int = 10, timeout: Optional[float] = None,
+                 max_connections: int = 100, max_keepalive_connections: int = 20,
+                 response_policy: ResponsePolicy = None, sequential_modules: Iterable[str] = ()):
+        self.processor = request_data_processor
+        self.sequential_modules = {str(m).strip() for m in sequential_modules if str(m).strip()}
+        self.response_policy = response_policy or ResponsePolicy()
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _pool_lock(self) -> asyncio.Lock:
+        """参数池锁，按事件循环创建（run 每次使用新的事件循环）"""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    # ---------------------------------------------------
+    # 1. 单用例执行
+    # ---------------------------------------------------
+    def _prepare(self, path, header, data, sql, extra, file_path):
+        """构建请求（可能执行 SQL/函数并写入参数池，在线程中持有参数池锁运行）"""
+        url = self.processor.handler_path(path_str=path)
+        header = self.processor.handler_header(header, data, sql)
+        data = self.processor.handler_data(data, sql, extra)
+        file = self.processor.handler_files(file_path)
+        return url, header, data, file
+
+    async def send_case(self, case: ApiCase) -> Any:
+        case = ApiCase.of(case)
+        (
+            case_module, case_submodule, case_name, case_title, skip, method, path, header,
+            parametric_type, data, file_path, extra, sql, expect, wait, case_retry
+        ) = case.cells()
+
+        LOGGER.info(
+            f"AsyncTestCase: {case_module} - {case_submodule} - {case_name} - {case_title}\n"
+            f"Path: {path}\nData: {data}\nExtra: {extra}\nSQL: {sql}\nExpected: {expect}\nfile_path: {file_path}"
+        )
+        # 每个用例运行在各自的任务中，上下文互不影响
+        CURRENT_CASE.set(f"{case_name}/{case_title}")
+
+        condition = WaitCondition.parse(wait)
+        if condition is not None and condition.kind == WaitCondition.SLEEP:
+            await asyncio.sleep(condition.seconds)
+        elif condition is not None and condition.before_request:
+            # 轮询期间只读取参数池，不持有锁，避免阻塞其他用例
+            await asyncio.to_thread(wait_before_request, condition, self.processor)
+
+        async with self._pool_lock():
+            url, header, data, file = await asyncio.to_thread(
+                self._prepare, path, header, data, sql, extra, file_path
+            )
+        if condition is not None and not condition.before_request:
+            response = await self._poll_request(condition, url, method, parametric_type, header, data, file)
+        else:
+            response = await self._send_api(url, method, parametric_type, header, data, file)
+
+        async with self._pool_lock():
+            self.processor.handler_extra(extra, response)
+            self.processor.assert_result(response, expect)
+        return response
+
+    async def _poll_request(self, condition: WaitCondition, *args) -> Any:
+        """重复发送请求直到响应满足 until 条件，轮询间隔不占用事件循环"""
+        start = time.monotonic()
+        delays = condition.delays()
+        attempts = 0
+        while True:
+            attempts += 1
+            response = await self._send_api(*args)
+            async with self._pool_lock():
+                matched = condition.matches(response, self.processor.extra_pool)
+            if matched:
+                LOGGER.info(f"等待完成 {condition.describe()}: 耗时 {time.monotonic() - start:.2f}s, 轮询 {attempts} 次")
+                return response
+            delay = next(delays, None)
+            if delay is None:
+                raise WaitTimeout(f"等待条件超时({time.monotonic() - start:.2f}s, 轮询 {attempts} 次): "
+                                  f"{condition.describe()} | 最后结果: {response}")
+            await asyncio.sleep(delay)
+
+    async def _send_api(self, url: str, method: str, parametric_type: str, header=None, data=None, file=None):
+        await self.open()
+        request_kwargs = {"headers": header or {}}
+
+        if parametric_type == 'application/x-www-form-urlencoded':
+            request_kwargs["params"] = data
+        elif parametric_type == 'multipart/form-data':
+            request_kwargs["data"] = data
+            request_kwargs["files"] = file
+        elif parametric_type == 'application/json':
+            # 与 requests 一致：带文件时按 multipart 发送，json 被忽略
+            if file:
+                request_kwargs["files"] = file
+            else:
+                request_kwargs["json"] = data
+        else:
+            raise ValueError(
+                'Unsupported parametric_type. Choose from: '
+                'application/x-www-form-urlencoded, application/json, multipart/form-data'
+            )
+
+        async with self._client.stream(method.upper(), url, **request_kwargs) as res:
+            reader = ResponseBodyReader(self.response_policy, res.headers, res.encoding)
+            try:
+                async for chunk in res.aiter_bytes(self.response_policy.chunk_size):
+                    reader.feed(chunk)
+                response = reader.finish()
+            finally:
+                reader.abort()
+
+        limit = self.response_policy.preview_chars
+        LOGGER.info(
+            'Async Request Details:\n'
+            f'URL: {res.url}\nMethod: {method}\nHeaders: {preview(header, limit)}\n'
+            f'Data: {preview(data, limit)}\nFiles: {file}\nResponse: {preview(response, limit)}'
+        )
+        return response
+
+    # ---------------------------------------------------
+    # 2. 模块级并发执行
+    # ---------------------------------------------------
+    async def _run_one(self, index: int, case: list, semaphore: asyncio.Semaphore) -> AsyncCaseResult:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self.send_case(case)
+                return AsyncCaseResult(index, case, response=response, elapsed=time.perf_counter() - start)
+            except Exception as e:
+                ERROR_LOGGER.error(f"异步用例执行失败 [{index}] {case[3] if len(case) > 3 else ''}: {e}")
+                return AsyncCaseResult(index, case, error=e, elapsed=time.perf_counter() - start)
+
+    def _is_sequential(self, cases: List[list]) -> bool:
+        return bool(self.sequential_modules) and any(
+            len(case) > 0 and str(case[0]).strip() in self.sequential_modules for case in cases
+        )
+
+    async def run_cases(self, cases: List[list], concurrency: Optional[int] = None,
+                        sequential: Optional[bool] = None) -> List[AsyncCaseResult]:
+        """
+        执行一个模块的用例：批次之间按顺序执行，批次内并发执行。
+        sequential 为 True（未指定时模块在 sequential_modules 中）时每条用例单独成批，按顺序执行。
+        返回结果按原始用例顺序排列；数据驱动用例先按记录展开。
+        """
+        cases = list(expand_cases(cases))
+        if sequential is None:
+            sequential = self._is_sequential(cases)
+        batches = [[i] for i in range(len(cases))] if sequential else split_independent_batches(cases)
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        results: List[Optional[AsyncCaseResult]] = [None] * len(cases)
+        start = time.perf_counter()
+        async with self:
+            for batch in batches:
+                batch_results = await asyncio.gather(*(self._run_one(i, cases[i], semaphore) for i in batch))
+                for result in batch_results:
+                    results[result.index] = result
+        failed = sum(1 for r in results if not r.passed)
+        LOGGER.info(f"异步执行完成: 共 {len(cases)} 条，失败 {failed} 条，耗时 {time.perf_counter() - start:.3f}s")
+        return results
+
+    def run(self, cases: List[list], concurrency: Optional[int] = None,
+            sequential: Optional[bool] = None) -> List[AsyncCaseResult]:
+        """同步入口，供 pytest 或脚本直接调用"""
+        return asyncio.run(self.run_cases(cases, concurrency, sequential))
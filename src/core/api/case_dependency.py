@@ -0,0 +1,267 @@
+# coding: utf-8
+import re
+import json
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from config.settings import ProjectPaths
+from src.utils.case_catalog import CaseCatalog
+from src.core.api.request_data_processor import SQL_OPTION_KEYS
+from src.utils.logger import LOGGER
+
+VAR_PATTERN = re.compile(r'\$\{(.*?)}')
+FUNC_PATTERN = re.compile(r'function:\s*(\w+)')
+
+# 引用 ${var} 的列：path / header / data / file_path / sql / expect / wait
+CONSUME_COLUMNS = (6, 7, 9, 10, 12, 13, 14)
+# 只生成随机值、不读取参数池/数据库的函数，不会引入隐式依赖
+PURE_FUNCTIONS = {
+    "generate_account", "generate_num", "generate_email", "generate_email_d",
+    "generate_phone", "get_timestamp",
+}
+CASE_SUFFIXES = (".xlsx", ".xls", ".csv")
+
+NodeId = Tuple[str, int]  # (workbook 相对路径, Excel 行号)
+
+
+def _extra_dict(case: list) -> Optional[dict]:
+    extra = case[11] if len(case) > 11 else None
+    if not isinstance(extra, str) or not extra.strip():
+        return None
+    try:
+        extra_dict = json.loads(extra)
+    except Exception:
+        return {}
+    return extra_dict if isinstance(extra_dict, dict) else {}
+
+
+def consumed_vars(case: list) -> Set[str]:
+    """用例读取的 ${var}：CONSUME_COLUMNS、extra 列与数据驱动数据文件中的引用（依赖图与异步批次共用）"""
+    names = set()
+    for idx in CONSUME_COLUMNS + (11,):
+        cell = case[idx] if len(case) > idx else None
+        if isinstance(cell, str):
+            names.update(VAR_PATTERN.findall(cell))
+    names.update(getattr(case, "variables", ()))
+    return names
+
+
+def produced_vars(case: list) -> Set[str]:
+    """用例通过 extra 写入参数池的变量"""
+    return {k for k in _extra_dict(case) or {} if k not in SQL_OPTION_KEYS}
+
+
+class CaseNode:
+    """DAG 中的一条用例"""
+
+    def __init__(self, workbook: str, row: int, case: list, order: int, path: Path = None):
+        self.workbook = workbook
+        self.path = path
+        self.row = row
+        self.case = case
+        self.order = order
+        self.consumes: Set[str] = set()
+        self.produces: Set[str] = set()
+        self.implicit = False  # 依赖同一工作簿上一行的隐式状态（wait / sql / 非纯函数）
+        self.cost = 1.0
+        self._parse()
+
+    @property
+    def id(self) -> NodeId:
+        return self.workbook, self.row
+
+    @property
+    def title(self) -> str:
+        return str(self.case[3]) if len(self.case) > 3 else ""
+
+    def _cell(self, idx):
+        return self.case[idx] if len(self.case) > idx else None
+
+    def _parse(self):
+        self.consumes = consumed_vars(self.case)
+        self.produces = produced_vars(self.case)
+
+        wait = self._cell(14)
+        if wait is not None:
+            try:
+                self.cost += float(wait)
+            except (TypeError, ValueError):
+                pass
+            self.implicit = True
+        if self._cell(12):
+            self.implicit = True
+        for idx in (7, 9, 13):
+            cell = self._cell(idx)
+            if isinstance(cell, str) and set(FUNC_PATTERN.findall(cell)) - PURE_FUNCTIONS:
+                self.implicit = True
+
+
+class CaseDependencyGraph:
+    """
+    用例生产/消费依赖图：
+    - extra 列写入参数池视为“生产”，其他列中的 ${var} 视为“消费”
+    - 消费者依赖执行顺序上最近一次的生产者（读后写、写后写同样保序）
+    - wait / sql / 非纯函数行依赖同一工作簿的上一行
+    """
+
+    def __init__(self):
+        self.nodes: Dict[NodeId, CaseNode] = {}
+        self.edges: Dict[NodeId, Set[NodeId]] = defaultdict(set)      # 前驱 → 后继
+        self.parents: Dict[NodeId, Set[NodeId]] = defaultdict(set)    # 后继 → 前驱
+        self.external: Set[str] = set()  # 没有生产者的变量（默认参数或配置）
+        self.catalog: Optional[CaseCatalog] = None
+
+    # ---------------------------------------------------
+    # 1. 构建
+    # ---------------------------------------------------
+    @staticmethod
+    def discover(root=None, order: Optional[Iterable] = None) -> List[Path]:
+        """发现 root 下全部用例工作簿；order 中的文件排在前面并保持给定顺序"""
+        root = Path(root or ProjectPaths.API_AUTO_DIR)
+        found = sorted(p.resolve() for p in root.rglob("*") if p.suffix.lower() in CASE_SUFFIXES
+                       and not p.name.startswith("~$"))
+        ordered = [Path(p).resolve() for p in (order or [])]
+        return ordered + [p for p in found if p not in ordered]
+
+    @classmethod
+    def build(cls, root=None, order: Optional[Iterable] = None, catalog: CaseCatalog = None,
+              files: Optional[Iterable] = None) -> "CaseDependencyGraph":
+        """
+        catalog 为已加载的用例目录；未传入时并行加载 root 下的工作簿与工作表。
+        files 给定时只加载并链接这些工作簿（按给定顺序），不执行的工作簿不进入依赖图。
+        """
+        graph = cls()
+        root = Path(root or ProjectPaths.API_AUTO_DIR)
+        paths = [Path(p).resolve() for p in files] if files is not None else cls.discover(root, order)
+        graph.catalog = catalog or CaseCatalog.load(roots=[("api", root)],
+                                                    files=paths if files is not None else None)
+        position = 0
+        for path in paths:
+            try:
+                workbook = str(path.relative_to(root.resolve()))
+            except ValueError:
+                workbook = str(path)
+            for entry in graph.catalog.workbook(path):
+                # 第一个工作表沿用原节点标识，其余工作表带上表名
+                name = workbook if entry.sheet_index == 0 else f"{workbook}#{entry.sheet}"
+                graph._add(CaseNode(name, entry.row, entry.case, position, path))
+                position += 1
+        graph._link()
+        LOGGER.info(f"用例依赖图构建完成: {len(graph.nodes)} 条用例, {sum(map(len, graph.edges.values()))} 条依赖")
+        return graph
+
+    def _add(self, node: CaseNode):
+        self.nodes[node.id] = node
+
+    def _add_edge(self, src: NodeId, dst: NodeId):
+        if src != dst:
+            self.edges[src].add(dst)
+            self.parents[dst].add(src)
+
+    def _link(self):
+        last_writer: Dict[str, NodeId] = {}
+        readers_since_write: Dict[str, List[NodeId]] = defaultdict(list)
+        previous_in_workbook: Dict[str, NodeId] = {}
+
+        for node in sorted(self.nodes.values(), key=lambda n: n.order):
+            for var in node.consumes:
+                if var in last_writer:
+                    self._add_edge(last_writer[var], node.id)
+                else:
+                    self.external.add(var)
+                readers_since_write[var].append(node.id)
+            for var in node.produces:
+                if var in last_writer:
+                    self._add_edge(last_writer[var], node.id)
+                for reader in readers_since_write.pop(var, []):
+                    self._add_edge(reader, node.id)
+                last_writer[var] = node.id
+            prev = previous_in_workbook.get(node.workbook)
+            if node.implicit and prev is not None:
+                self._add_edge(prev, node.id)
+            previous_in_workbook[node.workbook] = node.id
+
+    # ---------------------------------------------------
+    # 2. 分析
+    # ---------------------------------------------------
+    def topological_order(self) -> List[NodeId]:
+        # 所有边都从执行顺序靠前的用例指向靠后的用例，原始顺序即一个拓扑序
+        return [n.id for n in sorted(self.nodes.values(), key=lambda n: n.order)]
+
+    def critical_path(self) -> Tuple[float, List[NodeId]]:
+        """按用例耗时估算（1 + wait 秒）求最长路径"""
+        best: Dict[NodeId, float] = {}
+        prev: Dict[NodeId, Optional[NodeId]] = {}
+        for node_id in self.topological_order():
+            parent = max(self.parents.get(node_id, ()), key=lambda p: best[p], default=None)
+            best[node_id] = self.nodes[node_id].cost + (best[parent] if parent else 0.0)
+            prev[node_id] = parent
+        if not best:
+            return 0.0, []
+        end = max(best, key=best.get)
+        path = [end]
+        while prev[path[-1]] is not None:
+            path.append(prev[path[-1]])
+        return best[end], path[::-1]
+
+    def groups(self) -> List[List[NodeId]]:
+        """弱连通分量：不同分量之间没有任何依赖，可以分配到不同 worker"""
+        seen: Set[NodeId] = set()
+        result = []
+        for node_id in self.topological_order():
+            if node_id in seen:
+                continue
+            component, stack = [], [node_id]
+            seen.add(node_id)
+            while stack:
+                current = stack.pop()
+                component.append(current)
+                for neighbor in self.edges.get(current, set()) | self.parents.get(current, set()):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        stack.append(neighbor)
+            result.append(sorted(component, key=lambda n: self.nodes[n].order))
+        return result
+
+    def group_names(self) -> Dict[NodeId, str]:
+        names = {}
+        for index, component in enumerate(self.groups(), start=1):
+            head = self.nodes[component[0]]
+            name = f"g{index:03d}_{Path(head.workbook).stem}"
+            for node_id in component:
+                names[node_id] = name
+        return names
+
+    def xdist_params(self, workbook) -> list:
+        """
+        返回某个工作簿的 pytest 参数列表，每条用例带上 xdist_group 标记，
+        配合 `pytest -n auto --dist loadgroup` 使用
+        """
+        import pytest
+        names = self.group_names()
+        workbook = Path(workbook).resolve()
+        params = []
+        for node in sorted(self.nodes.values(), key=lambda n: n.order):
+            if node.path == workbook:
+                params.append(pytest.param(node.case, marks=pytest.mark.xdist_group(name=names[node.id])))
+        return params
+
+    def report(self) -> dict:
+        cost, path = self.critical_path()
+        groups = self.groups()
+        total = sum(n.cost for n in self.nodes.values())
+        return {
+            "cases": len(self.nodes),
+            "edges": sum(map(len, self.edges.values())),
+            "groups": len(groups),
+            "largest_group": max((len(g) for g in groups), default=0),
+            "serial_cost": total,
+            "critical_path_cost": cost,
+            "critical_path": [f"{w}:{r} {self.nodes[(w, r)].title}" for w, r in path],
+            "external_vars": sorted(self.external),
+        }
+
+
+if __name__ == "__main__":
+    graph = CaseDependencyGraph.build()
+    print(json.dumps(graph.report(), ensure_ascii=False, indent=4))
@@ -1,18 +1,107 @@
+import threading
+import httpx
 from src.core.api.request_data_processor import RequestDataProcessor
 from src.core.api.api_client import ApiClient
+from src.core.api.async_api_client import AsyncApiClient
+from src.core.api.session_manager import SessionManager
+from src.core.api.response_handler import ResponsePolicy, cleanup_downloads
+from src.core.api.retry_policy import RetryPolicies
 from src.utils.read_test_cases import read_conf
+from src.utils.sql_handler import SQLHandlerFactory
+from src.utils.async_sql_handler import AsyncSQLHandlerFactory
+from src.utils.logger import LOGGER
+
+_session_manager = None
+
 
 def create_request_data_processor():
     return RequestDataProcessor(
         header_key=read_conf.get_dict("header"),
         host_key=read_conf.get_dict("host"),
         default_parameters=read_conf.get_dict("default_parameters"),
-        ed=read_conf.get_dict("encryption_decryption")
+        ed=read_conf.get_dict("encryption_decryption"),
+        sql_conf=read_conf.get_dict("sql") if read_conf.config.has_section("sql") else {}
     )
 
+def get_session_manager():
+    """
+    进程内共用一个 SessionManager，配置读取自 [http_session] / [http_session_hosts]
+    """
+    global _session_manager
+    if _session_manager is None:
+        conf = read_conf.get_dict("http_session") if read_conf.config.has_section("http_session") else {}
+        hosts = read_conf.get_dict("http_session_hosts") if read_conf.config.has_section("http_session_hosts") else {}
+        _session_manager = SessionManager.from_conf(conf, hosts)
+    return _session_manager
+
+def create_response_policy():
+    conf = read_conf.get_dict("response") if read_conf.config.has_section("response") else {}
+    return ResponsePolicy.from_conf(conf)
+
+def create_retry_policies():
+    """
+    超时/重试策略读取自 [retry] 与 [retry:域名]
+    """
+    return RetryPolicies.from_conf(read_conf)
+
 def create_api_client():
     """
     将 RequestDataProcessor 注入 ApiClient
     """
     processor = create_request_data_processor()
-    return ApiClient(processor)
\ No newline at end of file
+    return ApiClient(processor, session_manager=get_session_manager(), response_policy=create_response_policy(),
+                     retry_policies=create_retry_policies())
+
+def create_async_api_client():
+    """
+    将 RequestDataProcessor 注入 AsyncApiClient，并发上限读取自 [async_client]
+    """
+    conf = read_conf.get_dict("async_client") if read_conf.config.has_section("async_client") else {}
+    processor = create_request_data_processor()
+    retry = create_retry_policies().default
+    return AsyncApiClient(
+        processor,
+        response_policy=create_response_policy(),
+        timeout=httpx.Timeout(retry.read_timeout, connect=retry.connect_timeout),
+        concurrency=int(conf.get("concurrency") or 10),
+        max_connections=int(conf.get("max_connections") or 100),
+        max_keepalive_connections=int(conf.get("max_keepalive_connections") or 20),
+        sequential_modules=(conf.get("sequential_modules") or "").split(","),
+    )
+
+
+class ApiClientRegistry:
+    """
+    测试会话级 ApiClient 注册表：
+    同名客户端只创建一次，连接、配置、参数池和用例编号在所有行/模块间保持
+    """
+    _clients = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str = "default") -> ApiClient:
+        with cls._lock:
+            if name not in cls._clients:
+                cls._clients[name] = create_api_client()
+                LOGGER.info(f"创建会话级 ApiClient: {name}")
+            return cls._clients[name]
+
+    @classmethod
+    def close(cls) -> None:
+        """清空注册表，关闭共用的 session 与数据库连接池，删除落盘的响应体文件"""
+        global _session_manager
+        with cls._lock:
+            for client in cls._clients.values():
+                client.retry_stats.log()
+                client.wait_stats.log()
+            cls._clients.clear()
+            if _session_manager is not None:
+                _session_manager.close_all()
+                _session_manager = None
+        SQLHandlerFactory.close_pools()
+        AsyncSQLHandlerFactory.close_pools()
+        cleanup_downloads()
+
+
+def get_api_client(name: str = "default") -> ApiClient:
+    return ApiClientRegistry.get(name)
@@ -114,6 +114,8 @@ class FileParameter:
         file_list = ["a.png", "b.xlsx"] → 支持多个文件
         file_list = [{"key": "file1", "path": "a.png"}] → 自定义 key
         """
+        if not file_list:
+            return None
         file_list = [list_path.strip() for list_path in file_list.split(";")]
         if not file_list:
             ERROR_LOGGER.info(f"文件列表为空: {file_list}")
@@ -1,14 +1,15 @@
 
 from typing import Any, List
 from src.core.api.file_parameter import FileParameter
-from src.utils.platform_utils import rep_expr, extractor, convert_json
+from src.utils.platform_utils import rep_expr, render_json, extractor, convert_json, json_value, JsonCell
 from src.utils.function_executor import exec_func
-from src.utils.sql_handler import SQLHandlerFactory
+from src.utils.sql_handler import SQLHandlerFactory, Aggregation, split_statements, STREAM_CHUNK_SIZE
 from src.utils.read_test_cases import read_conf
 from src.utils.logger import LOGGER, ERROR_LOGGER
-from src.utils.allure_utils import add_allure_step
-import json
+from src.utils.allure_utils import add_allure_step, add_allure_body_step, pool_diff, ATTACHMENT_SETTINGS
 
+# extra 列中的 SQL 选项，不作为提取规则写入参数池
+SQL_OPTION_KEYS = ("db", "sql_batch", "sql_cache")
 
 
 class RequestDataProcessor:
@@ -22,15 +23,22 @@ class RequestDataProcessor:
     - 文件上传处理
     """
 
-    def __init__(self, header_key, host_key, ed=None, default_parameters=None):
+    def __init__(self, header_key, host_key, ed=None, default_parameters=None, sql_conf=None):
         """
         初始化所需的处理器和配置字典。
+        sql_conf: [sql] 配置，batch_statements = true 时 sql 列的多条语句一次发送；
+                  cache_ttl 为 extra 中 "sql_cache": true 时的默认缓存秒数；
+                  stream_chunk_size 为 @count / @sum / @limit(N) 流式聚合每批读取的行数
         """
         self.extra_pool = default_parameters or {}
         self.file_parameter = FileParameter(extra_pool=self.extra_pool)
         self.encryption_decryption = rep_expr(ed, self.extra_pool) if isinstance(ed, str) else ed or {}
         self.base_header = rep_expr(header_key, self.extra_pool) if isinstance(header_key, str) else header_key or {}
         self.base_url = rep_expr(host_key, self.extra_pool) if isinstance(host_key, str) else host_key or {}
+        self._pool_snapshot = None
+        self.sql_batch = str((sql_conf or {}).get("batch_statements", "false")).strip().lower() == "true"
+        self.sql_cache_ttl = float((sql_conf or {}).get("cache_ttl") or 300)
+        self.sql_chunk_size = int((sql_conf or {}).get("stream_chunk_size") or STREAM_CHUNK_SIZE)
 
     def handler_path(self, path_str: str) -> str:
         """
@@ -63,8 +71,7 @@ class RequestDataProcessor:
             return {}
 
         try:
-            variable = rep_expr(variable, self.extra_pool)
-            data_obj = convert_json(variable)
+            data_obj = render_json(variable, self.extra_pool)
         except Exception:
             return {}
 
@@ -105,8 +112,11 @@ class RequestDataProcessor:
         """
         if not extra_str:
             return
-        extra_dict = convert_json(extra_str)
+        # 加载时已解析的 extra 直接取解析结果（只读）
+        extra_dict = extra_str.value if isinstance(extra_str, JsonCell) else convert_json(extra_str)
         for k, v in extra_dict.items():
+            if k in SQL_OPTION_KEYS:
+                continue
             if isinstance(v, str) and v.startswith("function:"):
                 self.extra_pool[k] = exec_func(v)
             extracted_value = extractor(response, v)
@@ -118,9 +128,8 @@ class RequestDataProcessor:
         断言响应与预期是否一致
         """
         function_amount_assert = ["function:assert_amount_increase", "function:assert_amount_deduction"]
-        add_allure_step("当前可用参数池", self.extra_pool)
-        expect_str = rep_expr(expect_str, self.extra_pool)
-        expect_dict = convert_json(expect_str)
+        self._attach_extra_pool()
+        expect_dict = render_json(expect_str, self.extra_pool)
         for k, v in expect_dict.items():
             actual = extractor(response, k)
             if isinstance(v, str) and v.startswith("function:"):
@@ -131,43 +140,137 @@ class RequestDataProcessor:
             assert actual == v, f"断言失败: 实际值 {actual} != 预期值 {v}"
             add_allure_step("断言", f"实际值：{actual} == 预期值：{v}")
 
+    def _attach_extra_pool(self) -> None:
+        """附加参数池：diff 模式只附带相对上一条用例的变化"""
+        if ATTACHMENT_SETTINGS.pool_mode == "diff":
+            add_allure_body_step("参数池变化", pool_diff(self._pool_snapshot, self.extra_pool))
+            # 浅拷贝即可：extra / sql 结果都是整键替换写入参数池，pool_diff 按值比较
+            self._pool_snapshot = dict(self.extra_pool)
+        else:
+            add_allure_body_step("当前可用参数池", self.extra_pool)
+
     def execute_select_fetchone(self, sql: str, extra_str: str):
         """
         执行查询语句（支持多条），返回每条SQL的第一行结果。
         如果只需要第一条SQL的结果，可取 [0]。
+        ${var} 编译为驱动占位符，取值从参数池绑定（无法参数化的语句退回文本替换）。
+        带 @count / @sum / @limit(N) 前缀的语句流式执行，取聚合结果。
         """
         if not sql:
             return []
 
         results = []
-        sql = rep_expr(sql, self.extra_pool)
-        for sql_statement in sql.split(";"):
-            sql_statement = sql_statement.strip()
-            if not sql_statement:
-                continue
-            db_handler = self._get_db_handler_from_extra(extra_str)
-            result = db_handler.fetchone(sql_statement)
+        # 同一用例的多条语句共用一个 Handler，连接从 db_key 对应的连接池借出
+        db_handler = self._get_db_handler_from_extra(extra_str)
+        if not db_handler:
+            ERROR_LOGGER.warning("未获取到数据库连接，跳过 SQL 查询")
+            return results
+        aggregations, templates = self._split_aggregations(sql)
+        prepared = [db_handler.prepare(stmt, self.extra_pool) for stmt in templates]
+        statements = [stmt for stmt, _ in prepared]
+        params = [args for _, args in prepared]
+        ttl = self._cache_ttl(extra_str)
+        # 退回文本替换的 ${var} 不参与批量发送：取值中的 ; 会被当作下一条语句执行
+        substituted = any("${" in template and args is None for template, args in zip(templates, params))
+        if substituted and len(statements) > 1:
+            LOGGER.debug("SQL 中存在无法参数化的 ${var}，改为逐条执行")
+        if self._use_batch(extra_str) and len(statements) > 1 and not any(aggregations) and not substituted:
+            for rows in self._execute_batch(db_handler, statements, ttl, params):
+                if rows:
+                    first = rows[0]
+                    results.append(first[0] if isinstance(first, (list, tuple)) else first)
+            return results
+
+        for (sql_statement, args), aggregation in zip(prepared, aggregations):
+            if aggregation:
+                rows = db_handler.aggregate(sql_statement, aggregation, args, self.sql_chunk_size)
+                result = rows[0] if rows else None
+            elif ttl:
+                rows = db_handler.cached_query(sql_statement, ttl, args)
+                result = rows[0] if rows else None
+            else:
+                result = db_handler.fetchone(sql_statement, args)
             if result:
                 results.append(result[0] if isinstance(result, (list, tuple)) else result)
 
         return results
 
+    @staticmethod
+    def _split_aggregations(sql: str) -> tuple:
+        """拆分 sql 列并识别聚合前缀，返回 (每条语句的聚合或 None, 去掉前缀的语句)"""
+        parsed = [Aggregation.parse(stmt) for stmt in split_statements(sql)]
+        return [agg for agg, _ in parsed], [stmt for _, stmt in parsed]
+
+    @staticmethod
+    def _sql_options(extra_str: str) -> dict:
+        if not extra_str:
+            return {}
+        try:
+            extra_dict = json_value(extra_str)
+        except Exception:
+            return {}
+        return extra_dict if isinstance(extra_dict, dict) else {}
+
+    def _use_batch(self, extra_str: str) -> bool:
+        """extra 中的 sql_batch 优先，其次为 [sql] batch_statements"""
+        option = self._sql_options(extra_str).get("sql_batch")
+        return self.sql_batch if option is None else bool(option)
+
+    def _cache_ttl(self, extra_str: str) -> float:
+        """
+        extra 中 "sql_cache": true 使用默认 TTL，数字为 TTL 秒数；未开启返回 0。
+        适用于币种精度、手续费配置等变化很少的参考数据。
+        """
+        option = self._sql_options(extra_str).get("sql_cache")
+        if option is None or option is False:
+            return 0.0
+        if option is True:
+            return self.sql_cache_ttl
+        try:
+            return max(float(option), 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _execute_batch(db_handler, statements: List[str], ttl: float = 0.0, params: list = None) -> list:
+        """批量执行失败时退回逐条执行，保证与原有行为一致"""
+        params = params or [None] * len(statements)
+        try:
+            if ttl:
+                return db_handler.cached_batch(statements, ttl, params)
+            return db_handler.execute_batch(statements, params)
+        except Exception as e:
+            ERROR_LOGGER.warning(f"SQL 批量执行失败，改为逐条执行: {e}")
+            return [db_handler.execute_query(stmt, args) for stmt, args in zip(statements, params)]
+
     def _get_db_handler_from_extra(self, extra_str: str):
         """从 extra 字段获取 db_key 并创建数据库连接，默认使用 mysql_db"""
         try:
             db_key = "mysql_db"  # 默认数据库 key
 
             if extra_str:
-                extra_dict = json.loads(extra_str)
+                extra_dict = json_value(extra_str)
                 db_key = extra_dict.get("db", db_key)
 
-            db_conf = read_conf.get_dict(db_key)
-            return SQLHandlerFactory.create(db_conf)
+            return self._get_db_handler(db_key)
 
         except Exception as e:
             ERROR_LOGGER.error(f"获取数据库连接失败: {e}")
             return None
 
+    @staticmethod
+    def _get_db_handler(db_key: str = "mysql_db"):
+        return SQLHandlerFactory.create(read_conf.get_dict(db_key), db_key=db_key)
+
+    def fetch_rows(self, sql: str, db_key: str = "mysql_db") -> list:
+        """绑定 ${var} 后执行单条查询，返回 [[列值, ...], ...]，供 wait 条件轮询"""
+        db_handler = self._get_db_handler(db_key)
+        try:
+            rows = db_handler.execute_query(*db_handler.prepare(sql, self.extra_pool))
+            return [list(row) if isinstance(row, (list, tuple)) else row for row in rows]
+        finally:
+            db_handler.close()
+
     def execute_sql_from_case(self, sql: str, extra_str: str):
         """执行 SQL 并更新参数池"""
         db_handler = self._get_db_handler_from_extra(extra_str)
@@ -175,13 +278,22 @@ class RequestDataProcessor:
             ERROR_LOGGER.warning("未获取到数据库连接，跳过 SQL 执行")
             return
         try:
-            index = 0
-            for statement in sql.split(";"):
-                stmt = statement.strip()
-                if not stmt:
-                    continue
-                index += 1
-                result = db_handler.execute_query(stmt)
+            aggregations, statements = self._split_aggregations(sql)
+            ttl = self._cache_ttl(extra_str)
+            if any(aggregations):
+                # 聚合语句流式执行，sql_query_results_N 只保存聚合结果
+                batch_results = (
+                    db_handler.aggregate(stmt, agg, chunk_size=self.sql_chunk_size) if agg
+                    else db_handler.execute_query(stmt)
+                    for stmt, agg in zip(statements, aggregations)
+                )
+            elif self._use_batch(extra_str) and len(statements) > 1:
+                batch_results = self._execute_batch(db_handler, statements, ttl)
+            elif ttl:
+                batch_results = (db_handler.cached_query(stmt, ttl) for stmt in statements)
+            else:
+                batch_results = (db_handler.execute_query(stmt) for stmt in statements)
+            for index, result in enumerate(batch_results, start=1):
                 if result:
                     self.extra_pool[f"sql_query_results_{index}"] = result
             LOGGER.info(f"SQL 执行完成，更新参数池: {self.extra_pool}")
@@ -0,0 +1,188 @@
+# coding: utf-8
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from requests.exceptions import ConnectionError as RequestsConnectionError, ReadTimeout
+from urllib3.exceptions import ReadTimeoutError
+from config.settings import ProjectPaths
+from src.utils.logger import LOGGER
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时退回标准库
+    orjson = None
+
+TEXT_CONTENT_TYPES = ("json", "text/", "xml", "javascript", "x-www-form-urlencoded")
+# 本次会话落盘的响应体文件，会话结束时由 cleanup_downloads 删除
+_SPILLED: List[str] = []
+_SPILLED_LOCK = threading.Lock()
+
+
+def loads_json(data: bytes) -> Any:
+    """优先使用 orjson 解析"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def preview(content: Any, limit: int = 2000) -> str:
+    """日志预览：超过 limit 的内容只保留前 limit 个字符"""
+    text = content if isinstance(content, str) else str(content)
+    if limit and len(text) > limit:
+        return f"{text[:limit]}...(已截断，共 {len(text)} 字符)"
+    return text
+
+
+class ResponsePolicy:
+    """
+    响应体处理策略：
+    - max_body_bytes: 内存中最多保留的响应体大小，超出部分连同已读内容一起落盘
+    - preview_chars: 日志中请求/响应内容的最大预览长度
+    - chunk_size: 流式读取的块大小
+    - download_dir: 二进制/超大响应的落盘目录
+    - keep_downloads: 会话结束后是否保留落盘文件（默认删除）
+    """
+
+    def __init__(self, max_body_bytes: int = 10 * 1024 * 1024, preview_chars: int = 2000,
+                 chunk_size: int = 64 * 1024, download_dir=None, keep_downloads: bool = False):
+        self.max_body_bytes = int(max_body_bytes)
+        self.preview_chars = int(preview_chars)
+        self.chunk_size = int(chunk_size)
+        self.download_dir = Path(download_dir or ProjectPaths.CACHE_FILE / "downloads")
+        self.keep_downloads = keep_downloads
+
+    @classmethod
+    def from_conf(cls, conf: Optional[Dict[str, str]]) -> "ResponsePolicy":
+        conf = conf or {}
+        return cls(
+            max_body_bytes=int(conf.get("max_body_bytes") or 10 * 1024 * 1024),
+            preview_chars=int(conf.get("preview_chars") or 2000),
+            chunk_size=int(conf.get("chunk_size") or 64 * 1024),
+            download_dir=conf.get("download_dir") or None,
+            keep_downloads=str(conf.get("keep_downloads", "")).strip().lower() in ("true", "1", "yes", "on"),
+        )
+
+    @staticmethod
+    def is_download(headers) -> bool:
+        """二进制类型或 Content-Disposition: attachment 视为下载"""
+        content_type = (headers.get("Content-Type") or "").lower()
+        disposition = (headers.get("Content-Disposition") or "").lower()
+        if "attachment" in disposition:
+            return True
+        return bool(content_type) and not any(t in content_type for t in TEXT_CONTENT_TYPES)
+
+
+class ResponseBodyReader:
+    """
+    分块接收响应体：
+    文本/JSON 在上限内保存在内存中；二进制或超出上限时写入磁盘，并同步计算 sha256。
+    落盘时返回 {"file_path", "size", "sha256", "content_type", "oversize"}，断言可直接取 $.size / $.sha256。
+    """
+
+    def __init__(self, policy: ResponsePolicy, headers, encoding: Optional[str] = None):
+        self.policy = policy
+        self.content_type = headers.get("Content-Type") or ""
+        self.encoding = encoding or "utf-8"
+        self.size = 0
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._file_path = None
+        self._oversize = False
+        if policy.is_download(headers):
+            self._spill()
+
+    def _spill(self):
+        self.policy.download_dir.mkdir(parents=True, exist_ok=True)
+        fd, self._file_path = tempfile.mkstemp(
+            prefix=time.strftime("%Y%m%d%H%M%S_"), suffix=".bin", dir=self.policy.download_dir
+        )
+        self._file = os.fdopen(fd, "wb")
+        if not self.policy.keep_downloads:
+            with _SPILLED_LOCK:
+                _SPILLED.append(self._file_path)
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.size += len(chunk)
+        self._hash.update(chunk)
+        if self._file is None and self.size > self.policy.max_body_bytes:
+            # 文本/JSON 超限后返回的是落盘信息而不是解析后的内容，依赖响应字段的提取与断言会取不到值
+            LOGGER.warning(
+                f"响应体（{self.content_type or '未知类型'}）超过 max_body_bytes={self.policy.max_body_bytes} 字节，"
+                f"转存到磁盘，返回 {{file_path, size, sha256, content_type, oversize: true}} 而不是解析后的内容"
+            )
+            self._oversize = True
+            self._spill()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer.extend(chunk)
+
+    def finish(self) -> Any:
+        if self._file is not None:
+            self._file.close()
+            return {
+                "file_path": self._file_path,
+                "size": self.size,
+                "sha256": self._hash.hexdigest(),
+                "content_type": self.content_type,
+                "oversize": self._oversize,
+            }
+        body = bytes(self._buffer)
+        try:
+            return loads_json(body)
+        except ValueError:
+            return body.decode(self.encoding, errors="replace")
+
+    def abort(self) -> None:
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+
+def cleanup_downloads() -> int:
+    """删除本次会话落盘的响应体文件（keep_downloads 为 true 的策略不登记），返回删除的文件数"""
+    with _SPILLED_LOCK:
+        paths = list(_SPILLED)
+        _SPILLED.clear()
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        LOGGER.info(f"已删除 {removed} 个落盘的响应体文件")
+    return removed
+
+
+def read_response(res, policy: ResponsePolicy) -> Any:
+    """
+    读取以 stream=True 发送的 requests 响应。
+    接收响应体时的读取超时由 iter_content 包装为 ConnectionError(ReadTimeoutError) 抛出，这里还原为 ReadTimeout，
+    使 retry_read_timeout 同样约束响应体阶段的超时（避免重发非幂等请求）；
+    SSL 错误、连接被重置等其他 ConnectionError 原样抛出，按连接错误重试。
+    """
+    reader = ResponseBodyReader(policy, res.headers, res.encoding)
+    try:
+        try:
+            for chunk in res.iter_content(chunk_size=policy.chunk_size):
+                reader.feed(chunk)
+        except RequestsConnectionError as e:
+            if not (e.args and isinstance(e.args[0], ReadTimeoutError)):
+                raise
+            raise ReadTimeout(f"读取响应体超时: {e}", request=res.request, response=res) from e
+        return reader.finish()
+    finally:
+        reader.abort()
+        res.close()
@@ -0,0 +1,145 @@
+# coding: utf-8
+import json
+import time
+import random
+from urllib.parse import urlparse
+from typing import Any, Dict, Optional, Tuple
+from src.utils.logger import LOGGER, ERROR_LOGGER
+
+
+def _to_bool(value: Any) -> bool:
+    return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+
+def _to_statuses(value: Any) -> frozenset:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(int(v) for v in value)
+    return frozenset(int(v) for v in str(value).split(",") if str(v).strip())
+
+
+class RetryPolicy:
+    """
+    单次请求的超时与重试策略：
+    - connect_timeout / read_timeout: 连接、读取超时（秒）
+    - retries: 最多重试次数（不含首次请求）
+    - backoff_base / backoff_max: 指数退避基数与上限，实际等待为 [0, min(max, base * 2^n)] 的随机值
+    - retry_statuses: 需要重试的响应状态码
+    - retry_read_timeout: 读取超时是否重试（非幂等接口默认不重试，避免重复下单）
+    """
+    FIELDS = ("connect_timeout", "read_timeout", "retries", "backoff_base", "backoff_max",
+              "retry_statuses", "retry_read_timeout")
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 30.0, retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, retry_statuses=(502, 503, 504),
+                 retry_read_timeout: bool = False):
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self.retries = max(0, int(retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.retry_statuses = _to_statuses(retry_statuses)
+        self.retry_read_timeout = _to_bool(retry_read_timeout)
+
+    def merged(self, overrides: Optional[Dict[str, Any]]) -> "RetryPolicy":
+        """返回叠加了 overrides 的新策略，未知键忽略"""
+        values = {field: getattr(self, field) for field in self.FIELDS}
+        for key, value in (overrides or {}).items():
+            if key in values and value not in (None, ""):
+                values[key] = value
+        return RetryPolicy(**values)
+
+    def timeout(self, remaining: Optional[float] = None) -> Tuple[float, float]:
+        """(connect, read) 超时，受模块剩余时间预算约束"""
+        if remaining is None:
+            return self.connect_timeout, self.read_timeout
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（full jitter）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class RetryPolicies:
+    """
+    策略查找：默认策略 [retry] → 按域名 [retry:host] → 用例 retry 列（JSON）
+    """
+
+    def __init__(self, default: RetryPolicy = None, hosts: Optional[Dict[str, Dict[str, Any]]] = None,
+                 module_deadline: float = 0):
+        self.default = default or RetryPolicy()
+        self.hosts = {host: self.default.merged(conf) for host, conf in (hosts or {}).items()}
+        self.module_deadline = float(module_deadline or 0)
+
+    @classmethod
+    def from_conf(cls, conf) -> "RetryPolicies":
+        """conf 为 ReadConf，读取 [retry] 与所有 [retry:域名] 配置"""
+        parser = conf.config
+        default_conf = dict(parser.items("retry")) if parser.has_section("retry") else {}
+        module_deadline = default_conf.pop("module_deadline", 0)
+        hosts = {
+            section.split(":", 1)[1].strip(): dict(parser.items(section))
+            for section in parser.sections() if section.startswith("retry:")
+        }
+        return cls(RetryPolicy().merged(default_conf), hosts, module_deadline)
+
+    def for_request(self, url: str, case_retry: Any = None) -> RetryPolicy:
+        policy = self.hosts.get(urlparse(url).hostname or "", self.default)
+        if case_retry:
+            try:
+                overrides = json.loads(case_retry) if isinstance(case_retry, str) else case_retry
+                policy = policy.merged(overrides)
+            except Exception as e:
+                ERROR_LOGGER.error(f"用例 retry 列解析失败，使用默认策略: {e} | {case_retry}")
+        return policy
+
+
+class DeadlineExceeded(Exception):
+    """模块时间预算耗尽"""
+
+
+class ModuleDeadline:
+    """按模块计算总耗时预算，budget <= 0 表示不限制"""
+
+    def __init__(self, module: str, budget: float):
+        self.module = module
+        self.budget = budget
+        self.start = time.monotonic()
+
+    def remaining(self) -> Optional[float]:
+        if self.budget <= 0:
+            return None
+        return self.budget - (time.monotonic() - self.start)
+
+    def check(self) -> Optional[float]:
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"模块 {self.module} 超出时间预算 {self.budget}s")
+        return remaining
+
+
+class RetryStats:
+    """重试统计：请求数、重试次数、重试耗费时间（失败请求 + 退避等待），按原因计数；request_time 为成功收到响应的请求耗时"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.retry_time = 0.0
+        self.request_time = 0.0
+        self.reasons: Dict[str, int] = {}
+
+    def record(self, reason: str, spent: float) -> None:
+        self.retries += 1
+        self.retry_time += spent
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "retry_time": round(self.retry_time, 3),
+            "request_time": round(self.request_time, 3),
+            "reasons": dict(self.reasons),
+        }
+
+    def log(self) -> None:
+        LOGGER.info(f"请求重试统计: {self.summary()}")
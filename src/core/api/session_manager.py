@@ -0,0 +1,158 @@
+# coding: utf-8
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from src.utils.logger import LOGGER, ERROR_LOGGER
+
+
+class SessionManager:
+    """
+    requests.Session 管理器：
+    - 按 token 复用 session，超过上限时按 LRU 淘汰，并显式关闭被淘汰的 session
+    - 统一配置连接池大小，可按域名单独指定
+    - 统计命中、未命中、淘汰次数以及当前打开的 socket 数
+    """
+
+    def __init__(self, max_sessions: int = 50, pool_connections: int = 10, pool_maxsize: int = 10,
+                 keep_alive: bool = True, host_pool_maxsize: Optional[Dict[str, int]] = None):
+        """
+        max_sessions: 最多保留的 token session 数量（不含默认 session）
+        pool_connections: 每个 session 缓存的连接池（host）数量
+        pool_maxsize: 每个连接池的最大连接数
+        keep_alive: 是否显式发送 Connection: keep-alive
+        host_pool_maxsize: 按域名指定连接池大小，例如 {"web.innotech-stage.com": 20}
+        """
+        self.max_sessions = max(1, int(max_sessions))
+        self.pool_connections = int(pool_connections)
+        self.pool_maxsize = int(pool_maxsize)
+        self.keep_alive = keep_alive
+        self.host_pool_maxsize = host_pool_maxsize or {}
+
+        self._sessions: "OrderedDict[str, requests.Session]" = OrderedDict()
+        self._default_session = None
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_conf(cls, conf: Dict[str, str], hosts_conf: Optional[Dict[str, str]] = None) -> "SessionManager":
+        """根据 object_conf.ini 中 [http_session] / [http_session_hosts] 配置创建"""
+        conf = conf or {}
+        return cls(
+            max_sessions=int(conf.get("max_sessions") or 50),
+            pool_connections=int(conf.get("pool_connections") or 10),
+            pool_maxsize=int(conf.get("pool_maxsize") or 10),
+            keep_alive=str(conf.get("keep_alive", "true")).strip().lower() not in ("false", "0", "no", "off"),
+            host_pool_maxsize={host: int(size) for host, size in (hosts_conf or {}).items() if size},
+        )
+
+    # ---------------------------------------------------
+    # 1. session 创建
+    # ---------------------------------------------------
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # 按域名单独挂载 adapter，requests 会优先匹配最长前缀
+        for host, size in self.host_pool_maxsize.items():
+            host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            session.mount(f"http://{host}", host_adapter)
+            session.mount(f"https://{host}", host_adapter)
+        if self.keep_alive:
+            session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    @staticmethod
+    def _apply_token(session: requests.Session, token: str) -> None:
+        if "Authorization" in token:
+            session.headers.update({"Authorization": f"Bearer {token}"})
+        else:
+            session.headers.update({"token": token})
+
+    # ---------------------------------------------------
+    # 2. 获取 session
+    # ---------------------------------------------------
+    def get_session(self, token: str = None) -> requests.Session:
+        with self._lock:
+            if not token:
+                if self._default_session is None:
+                    self.misses += 1
+                    self._default_session = self._new_session()
+                else:
+                    self.hits += 1
+                return self._default_session
+
+            session = self._sessions.get(token)
+            if session is not None:
+                self.hits += 1
+                self._sessions.move_to_end(token)
+                return session
+
+            self.misses += 1
+            session = self._new_session()
+            self._apply_token(session, token)
+            self._sessions[token] = session
+            while len(self._sessions) > self.max_sessions:
+                self._evict_oldest()
+            return session
+
+    def _evict_oldest(self) -> None:
+        token, session = self._sessions.popitem(last=False)
+        self.evictions += 1
+        try:
+            session.close()
+        except Exception as e:
+            ERROR_LOGGER.error(f"关闭被淘汰的 session 失败: {e}")
+        LOGGER.debug(f"淘汰 session，当前 session 数: {len(self._sessions)}")
+
+    # ---------------------------------------------------
+    # 3. 统计与关闭
+    # ---------------------------------------------------
+    @staticmethod
+    def _count_open_sockets(session: requests.Session) -> int:
+        """统计 session 中连接池里仍保持打开的 socket 数"""
+        count = 0
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            pool_manager = getattr(adapter, "poolmanager", None)
+            if pool_manager is None:
+                continue
+            for key in list(pool_manager.pools.keys()):
+                pool = pool_manager.pools.get(key)
+                queue = getattr(getattr(pool, "pool", None), "queue", None) or []
+                count += sum(1 for conn in list(queue) if conn is not None and getattr(conn, "sock", None) is not None)
+        return count
+
+    def open_sockets(self) -> int:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            if self._default_session is not None:
+                sessions.append(self._default_session)
+        return sum(self._count_open_sockets(s) for s in sessions)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._sessions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "open_sockets": self.open_sockets(),
+        }
+
+    def close_all(self) -> None:
+        with self._lock:
+            LOGGER.info(f"关闭全部 session，统计: {self.stats()}")
+            sessions = list(self._sessions.values())
+            if self._default_session is not None:
+                sessions.append(self._default_session)
+            self._sessions.clear()
+            self._default_session = None
+        for session in sessions:
+            try:
+                session.close()
+            except Exception as e:
+                ERROR_LOGGER.error(f"关闭 session 失败: {e}")
@@ -0,0 +1,175 @@
+# coding: utf-8
+import json
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from src.utils.platform_utils import rep_expr, render_json, extractor
+from src.utils.logger import LOGGER
+
+
+class WaitTimeout(AssertionError):
+    """等待条件在超时时间内未满足"""
+
+
+class WaitCondition:
+    """
+    wait 列的等待条件：
+    - 数字（如 2 / "2.0"）：固定等待，兼容原有写法
+    - {"sql": "SELECT status FROM t WHERE id = '${id}'", "db": "mysql_db", "until": {"$[0][0]": 2}}
+      轮询 SQL，直到有结果行（配置了 until 时按 JSONPath 校验结果行）
+    - {"redis": "deposit:${order_id}"}：轮询直到 Redis key 出现，支持 * 通配
+    - {"until": {"$.data.status": "SUCCESS"}}：重复发送本条请求，直到响应满足条件
+    公共参数：timeout（默认 60s）、interval（首次间隔 0.5s）、backoff（间隔倍数 1.5）、max_interval（最大间隔 5s）
+    """
+    SLEEP, SQL, REDIS, REQUEST = "sleep", "sql", "redis", "request"
+
+    def __init__(self, kind: str, seconds: float = 0.0, sql: str = None, db: str = "mysql_db",
+                 redis_key: str = None, until: Optional[Dict[str, Any]] = None, timeout: float = 60,
+                 interval: float = 0.5, backoff: float = 1.5, max_interval: float = 5):
+        self.kind = kind
+        self.seconds = float(seconds)
+        self.sql = sql
+        self.db = db
+        self.redis_key = redis_key
+        self.until = until or {}
+        self.timeout = float(timeout)
+        self.interval = float(interval)
+        self.backoff = max(1.0, float(backoff))
+        self.max_interval = float(max_interval)
+
+    @classmethod
+    def parse(cls, wait: Any) -> Optional["WaitCondition"]:
+        if wait is None or (isinstance(wait, str) and not wait.strip()):
+            return None
+        if isinstance(wait, (int, float)):
+            return cls(cls.SLEEP, seconds=wait)
+        try:
+            return cls(cls.SLEEP, seconds=float(wait))
+        except (TypeError, ValueError):
+            pass
+
+        # 非 JSON 对象、取值类型错误（如 "timeout": null）统一按无法识别的 wait 条件报错
+        try:
+            conf = json.loads(wait) if isinstance(wait, str) else dict(wait)
+            if not isinstance(conf, dict):
+                raise ValueError(f"应为数字或 JSON 对象: {type(conf).__name__}")
+            options = {k: conf[k] for k in ("timeout", "interval", "backoff", "max_interval") if k in conf}
+            until = conf.get("until")
+            if conf.get("sql"):
+                return cls(cls.SQL, sql=conf["sql"], db=conf.get("db", "mysql_db"), until=until, **options)
+            if conf.get("redis"):
+                return cls(cls.REDIS, redis_key=conf["redis"], **options)
+            if until:
+                return cls(cls.REQUEST, until=until, **options)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"无法识别的 wait 条件: {wait} ({e})") from e
+        raise ValueError(f"无法识别的 wait 条件: {wait}")
+
+    @property
+    def before_request(self) -> bool:
+        """固定等待、SQL、Redis 在发送请求前等待；重复请求类条件在发送时轮询"""
+        return self.kind != self.REQUEST
+
+    def delays(self, timeout: Optional[float] = None) -> Iterator[float]:
+        """按退避策略依次给出下一次轮询前的等待时间，总时长不超过 timeout"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        interval = self.interval
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            yield min(interval, remaining)
+            interval = min(self.max_interval, interval * self.backoff)
+
+    def matches(self, data: Any, pool: dict) -> bool:
+        """until 中的所有 JSONPath 都与期望值相等"""
+        if not self.until:
+            return bool(data)
+        expected = render_json(json.dumps(self.until, ensure_ascii=False), pool)
+        return all(extractor(data, path) == value for path, value in expected.items())
+
+    def describe(self) -> str:
+        if self.kind == self.SLEEP:
+            return f"sleep {self.seconds}s"
+        if self.kind == self.SQL:
+            return f"sql[{self.db}] {self.sql}"
+        if self.kind == self.REDIS:
+            return f"redis {self.redis_key}"
+        return f"request until {self.until}"
+
+
+def poll(check: Callable[[], Tuple[bool, Any]], condition: WaitCondition,
+         timeout: Optional[float] = None) -> Tuple[Any, float, int]:
+    """
+    立即执行一次 check，未满足时按 condition.delays 退避后重试。
+    返回 (最后一次结果, 实际等待秒数, 轮询次数)；超时抛出 WaitTimeout。
+    """
+    start = time.monotonic()
+    attempts = 1
+    ok, result = check()
+    if ok:
+        return result, time.monotonic() - start, attempts
+    for delay in condition.delays(timeout):
+        time.sleep(delay)
+        attempts += 1
+        ok, result = check()
+        if ok:
+            return result, time.monotonic() - start, attempts
+    raise WaitTimeout(
+        f"等待条件超时({time.monotonic() - start:.2f}s, 轮询 {attempts} 次): {condition.describe()} | 最后结果: {result}"
+    )
+
+
+class WaitStats:
+    """等待统计：条件等待次数、实际等待总时长、超时次数，按类型汇总"""
+
+    def __init__(self):
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.by_kind: Dict[str, float] = {}
+
+    def record(self, kind: str, waited: float, timed_out: bool = False) -> None:
+        self.waits += 1
+        self.timeouts += int(timed_out)
+        self.wait_time += waited
+        self.by_kind[kind] = round(self.by_kind.get(kind, 0.0) + waited, 3)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "wait_time": round(self.wait_time, 3),
+            "by_kind": dict(self.by_kind),
+        }
+
+    def log(self) -> None:
+        LOGGER.info(f"条件等待统计: {self.summary()}")
+
+
+def wait_before_request(condition: WaitCondition, processor, timeout: Optional[float] = None) -> Tuple[float, int]:
+    """
+    执行请求前的等待（固定等待 / SQL / Redis），返回 (实际等待秒数, 轮询次数)
+    """
+    if condition.kind == WaitCondition.SLEEP:
+        seconds = condition.seconds if timeout is None else min(condition.seconds, max(timeout, 0))
+        time.sleep(seconds)
+        return seconds, 1
+
+    if condition.kind == WaitCondition.SQL:
+        def check():
+            rows = processor.fetch_rows(condition.sql, condition.db)
+            return condition.matches(rows, processor.extra_pool), rows
+        _, waited, attempts = poll(check, condition, timeout)
+        return waited, attempts
+
+    if condition.kind == WaitCondition.REDIS:
+        from src.utils.redis_utils import redis_connect, key_exists
+        client = redis_connect()
+        key = rep_expr(condition.redis_key, processor.extra_pool)
+        try:
+            _, waited, attempts = poll(lambda: (key_exists(key, client), key), condition, timeout)
+        finally:
+            client.close()
+        return waited, attempts
+
+    return 0.0, 0
@@ -13,11 +13,12 @@ class ValueResolver:
         retrieve = step.get("retrieve")
 
         if isinstance(retrieve, str) and retrieve.startswith("sql:"):
-            retrieve = self.db.fetchone(retrieve[4:])
+            # ${var} 编译为占位符，从缓存池绑定取值
+            retrieve = self.db.fetchone(*self.db.prepare(retrieve[4:], self.cache))
 
         param = self.cache.get(retrieve, "") if retrieve else ""
 
         if isinstance(raw, str) and raw.startswith("function:"):
             return exec_func(raw, param)
 
-        return rep_expr(raw, self.cache.all())
+        return rep_expr(raw, self.cache)
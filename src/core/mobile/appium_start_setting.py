@@ -1,7 +1,5 @@
 # -*- coding:utf-8 -*-
 # Create on
-from appium import webdriver
-from appium.options.android import UiAutomator2Options
 from src.utils.logger import LOGGER, ERROR_LOGGER
 
 
@@ -14,6 +12,9 @@ class App:
     def start(self, restart=False, implicit_wait=5):
         try:
             if self._driver is None or restart:
+                # appium 在第一次创建会话时才导入
+                from appium import webdriver
+                from appium.options.android import UiAutomator2Options
                 options = UiAutomator2Options().load_capabilities(self._config)
                 if restart:
                     options.set_capability("dontStopAppOnReset", "true")
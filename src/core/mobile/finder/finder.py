@@ -1,5 +1,4 @@
 # -*- coding:utf-8 -*-
-from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -8,28 +7,33 @@ from src.utils.logger import LOGGER, ERROR_LOGGER
 
 
 class _AppiumBy:
-    LOCATORS = {
-        "id": AppiumBy.ID,
-        "xpath": AppiumBy.XPATH,
-        "image": AppiumBy.IMAGE,
-        "accessibility_id": AppiumBy.ACCESSIBILITY_ID,
-        "android_uiautomator": AppiumBy.ANDROID_UIAUTOMATOR,
-        "android_viewtag": AppiumBy.ANDROID_VIEWTAG,
-        "android_data_matcher": AppiumBy.ANDROID_DATA_MATCHER,
-        "android_view_matcher": AppiumBy.ANDROID_VIEW_MATCHER,
-        "ios_predicate": AppiumBy.IOS_PREDICATE,
-        "ios_class_chain": AppiumBy.IOS_CLASS_CHAIN,
-        "class_name": AppiumBy.CLASS_NAME,
-        "link_text": AppiumBy.LINK_TEXT,
-        "css_selector": AppiumBy.CSS_SELECTOR,
-        "name": AppiumBy.NAME,
+    # 定位策略名 -> AppiumBy 属性名；appium 在第一次定位时才导入
+    LOCATOR_NAMES = {
+        "id": "ID",
+        "xpath": "XPATH",
+        "image": "IMAGE",
+        "accessibility_id": "ACCESSIBILITY_ID",
+        "android_uiautomator": "ANDROID_UIAUTOMATOR",
+        "android_viewtag": "ANDROID_VIEWTAG",
+        "android_data_matcher": "ANDROID_DATA_MATCHER",
+        "android_view_matcher": "ANDROID_VIEW_MATCHER",
+        "ios_predicate": "IOS_PREDICATE",
+        "ios_class_chain": "IOS_CLASS_CHAIN",
+        "class_name": "CLASS_NAME",
+        "link_text": "LINK_TEXT",
+        "css_selector": "CSS_SELECTOR",
+        "name": "NAME",
     }
+    LOCATORS = None
 
     @classmethod
     def by(cls, by, value):
         by = by.lower()
-        if by not in cls.LOCATORS:
+        if by not in cls.LOCATOR_NAMES:
             raise ValueError(f"无效的定位策略 '{by}'")
+        if cls.LOCATORS is None:
+            from appium.webdriver.common.appiumby import AppiumBy
+            cls.LOCATORS = {name: getattr(AppiumBy, attr) for name, attr in cls.LOCATOR_NAMES.items()}
         return cls.LOCATORS[by], value
 
 
@@ -92,7 +92,7 @@ class AppManager:
             # 如果 db_conf 不是 None 且是字典，则尝试连接数据库
             if self.db_conf and isinstance(self.db_conf, dict):
                 if self.identifier not in self.db_connections:
-                    self.db_connections[self.identifier] = SQLHandlerFactory.create(self.db_conf)
+                    self.db_connections[self.identifier] = SQLHandlerFactory.create(self.db_conf, db_key="mysql_db")
                 db_connection = self.db_connections[self.identifier]
             # 创建 AppAction 实例时传递数据库连接（如果有）
             self.apps[self.identifier] = AppAction(driver, db_connection)
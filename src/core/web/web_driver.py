@@ -1,9 +1,6 @@
-from playwright.sync_api import sync_playwright
 from src.utils.logger import LOGGER
 from src.utils.read_test_cases import read_conf
 
-c = read_conf.get_dict("wei_ui_headless")
-
 class UIDriver:
     _instance = None
 
@@ -17,9 +14,11 @@ class UIDriver:
         return cls._instance
 
     def start(self):
+        # playwright 与浏览器配置在启动浏览器时才加载
+        from playwright.sync_api import sync_playwright
         LOGGER.info("启动 Playwright 浏览器")
         self.playwright = sync_playwright().start()
-        headless = c.get("ui.headless", False)
+        headless = read_conf.get_dict("wei_ui_headless").get("ui.headless", False)
 
         self.browser = self.playwright.chromium.launch(headless=headless)
         self.context = self.browser.new_context()
@@ -1,28 +1,36 @@
 # -*- coding:utf-8 -*-
 import argparse
+import importlib
 import sys
 import os
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
-# 各测试类型的 Runner（策略）
-from src.runners import (
-    api_runner,
-    web_ui_runner,
-    mobile_runner,
-    load_runner,
-)
-
 
+def list_cases(expressions) -> int:
+    """按用例索引列出匹配的用例（索引过期的工作簿先增量刷新）"""
+    from src.utils.case_index import CASE_INDEX
+    CASE_INDEX.refresh()
+    rows = CASE_INDEX.select(expressions)
+    for row in rows:
+        tags = f"  @{' @'.join(row.tags)}" if row.tags else ""
+        print(f"{row.workbook}:{row.row}  {row.module}/{row.submodule}/{row.case_name}/{row.title}{tags}")
+    print(f"共 {len(rows)} 条用例")
+    return 0
 
 
+# 各测试类型的 Runner（策略）：只导入本次选中的 runner，pytest 及各类型的依赖在此之前不加载
 TEST_TYPE_MAP = {
-    "api": api_runner.run,
-    "web": web_ui_runner.run,
-    "mobile": mobile_runner.run,
-    "load": load_runner.run,
+    "api": "src.runners.api_runner",
+    "web": "src.runners.web_ui_runner",
+    "mobile": "src.runners.mobile_runner",
+    "load": "src.runners.load_runner",
 }
 
+
+def get_runner(test_type: str):
+    return importlib.import_module(TEST_TYPE_MAP[test_type]).run
+
 def main():
     parser = argparse.ArgumentParser(description="自动化测试平台入口")
     parser.add_argument(
@@ -35,12 +43,25 @@ def main():
     )
     parser.add_argument("--extra", nargs="*", default=[])
     parser.add_argument("--alluredir", default=None, help="Allure report 输出目录")
+    parser.add_argument(
+        "-s", "--select", action="append", default=[],
+        help="只加载匹配的用例，可多次指定：模块/子模块/用例名/标题（支持 * ? 通配）、@标签、file:工作簿，"
+             "例如 --select 登录/登录正常账号 --select @smoke"
+    )
+    parser.add_argument("--list", action="store_true", help="只列出 --select 匹配的用例，不执行")
 
     args = parser.parse_args()
 
-    runner_func = TEST_TYPE_MAP[args.type]
+    if args.list:
+        return list_cases(args.select or ["*"])
+
+    from src.runners import prepare_run
+    prepare_run()
+    runner_func = get_runner(args.type)
+    # --select 透传给 pytest，由 conftest 在收集前按用例索引确定要解析的行
+    extra_args = args.extra + [f"--select={expression}" for expression in args.select]
     # 由具体 runner 决定如何组织/补全参数
-    return runner_func(case=args.case, extra_args=args.extra, alluredir=args.alluredir)
+    return runner_func(case=args.case, extra_args=extra_args, alluredir=args.alluredir)
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -1,6 +1,13 @@
 from config.settings import ProjectPaths
-from src.utils.platform_utils import clear_log_files, clear_directory
 
-clear_log_files(ProjectPaths.LOG_DIR)
-# clear_directory(ProjectPaths.CACHE_FILE)
-clear_directory(ProjectPaths.REPORT_DIR)
\ No newline at end of file
+
+def prepare_run():
+    """
+    执行前清空日志与报告目录。
+    由 main 在确定要执行测试后调用，导入 runner（或 --list、基准脚本导入入口模块）不会再清理文件。
+    """
+    from src.utils.platform_utils import clear_log_files, clear_directory
+
+    clear_log_files(ProjectPaths.LOG_DIR)
+    # clear_directory(ProjectPaths.CACHE_FILE)
+    clear_directory(ProjectPaths.REPORT_DIR)
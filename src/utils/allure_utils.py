@@ -7,9 +7,44 @@ Allure 报告工具集
 """
 
 import allure
+import allure_commons
 import json
+import queue
+import threading
 import pytest
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.logger import LOGGER, ERROR_LOGGER
+
+
+class AttachmentSettings:
+    """
+    附件策略：
+    - level: full 所有用例都附带请求/响应/参数池；lean 只有失败用例附带
+    - max_chars: 单个附件最大字符数，超出截断并以文本附加
+    - pool_mode: full 每次附带整个参数池；diff（默认）只附带相对上一条用例的变化
+    """
+
+    def __init__(self, level: str = "full", max_chars: int = 20000, pool_mode: str = "diff"):
+        self.level = level
+        self.max_chars = int(max_chars)
+        self.pool_mode = pool_mode
+
+    @property
+    def lean(self) -> bool:
+        return self.level == "lean"
+
+
+ATTACHMENT_SETTINGS = AttachmentSettings()
+_pending = threading.local()
+
+
+def configure_allure_attachments(conf: Optional[Dict[str, str]]) -> AttachmentSettings:
+    """根据 object_conf.ini 的 [allure] 配置更新附件策略"""
+    conf = conf or {}
+    ATTACHMENT_SETTINGS.level = (conf.get("level") or "full").strip().lower()
+    ATTACHMENT_SETTINGS.max_chars = int(conf.get("max_attachment_chars") or 20000)
+    ATTACHMENT_SETTINGS.pool_mode = (conf.get("pool_mode") or "diff").strip().lower()
+    return ATTACHMENT_SETTINGS
 
 
 def set_allure_project(project: str) -> None:
@@ -44,6 +79,15 @@ def set_allure_link(url: str) -> None:
     """设置 Allure 展示测试用例链接"""
     allure.dynamic.link(url)
 
+def _dump_attachment(content: Any) -> Tuple[str, Any]:
+    """序列化附件内容，超过上限时截断并改为文本类型"""
+    body = json.dumps(content, ensure_ascii=False, indent=4, default=str)
+    limit = ATTACHMENT_SETTINGS.max_chars
+    if limit and len(body) > limit:
+        return f"{body[:limit]}\n...(已截断，共 {len(body)} 字符)", allure.attachment_type.TEXT
+    return body, allure.attachment_type.JSON
+
+
 def add_allure_step(step_name: str, content: Optional[Any] = None) -> None:
     """
     添加带附件的 Allure 测试步骤
@@ -54,11 +98,154 @@ def add_allure_step(step_name: str, content: Optional[Any] = None) -> None:
     """
     with allure.step(step_name):
         if content is not None:
-            allure.attach(
-                json.dumps(content, ensure_ascii=False, indent=4),
-                step_name,
-                allure.attachment_type.JSON
-            )
+            body, attachment_type = _dump_attachment(content)
+            allure.attach(body, step_name, attachment_type)
+
+
+def add_allure_body_step(step_name: str, content: Optional[Any] = None) -> None:
+    """
+    添加请求/响应等大体积内容的步骤。
+    lean 模式下只记录步骤名，内容暂存，用例失败时由 flush_pending_allure_steps 补充附加
+    """
+    if not ATTACHMENT_SETTINGS.lean:
+        add_allure_step(step_name, content)
+        return
+    with allure.step(step_name):
+        pass
+    if content is not None:
+        if not hasattr(_pending, "steps"):
+            _pending.steps = []
+        _pending.steps.append((step_name, content))
+
+
+def flush_pending_allure_steps() -> None:
+    """用例失败时附加 lean 模式下暂存的内容"""
+    steps: List[Tuple[str, Any]] = getattr(_pending, "steps", [])
+    _pending.steps = []
+    if not steps:
+        return
+    with allure.step("失败用例详情"):
+        for step_name, content in steps:
+            add_allure_step(step_name, content)
+
+
+def discard_pending_allure_steps() -> None:
+    _pending.steps = []
+
+
+def pool_diff(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """参数池相对上一次快照的变化：新增/修改的键与被删除的键"""
+    previous = previous or {}
+    changed = {k: v for k, v in current.items() if k not in previous or previous[k] != v}
+    removed = [k for k in previous if k not in current]
+    diff = {"changed": changed}
+    if removed:
+        diff["removed"] = removed
+    return diff
+
+
+# =========================================================
+# 后台附件写入：把 allure 的附件落盘从用例线程移到后台线程批量执行
+# =========================================================
+class _BufferedFileLogger:
+    """
+    替代 AllureFileLogger 注册到 allure 插件管理器：附件数据交给后台线程写入，
+    结果、容器、文件附件等其他钩子仍同步交给原 AllureFileLogger
+    """
+
+    def __init__(self, logger, writer: "BufferedAttachmentWriter"):
+        self._logger = logger
+        self._writer = writer
+
+    @allure_commons.hookimpl
+    def report_result(self, result):
+        self._logger.report_result(result)
+
+    @allure_commons.hookimpl
+    def report_container(self, container):
+        self._logger.report_container(container)
+
+    @allure_commons.hookimpl
+    def report_attached_file(self, source, file_name):
+        self._logger.report_attached_file(source, file_name)
+
+    @allure_commons.hookimpl
+    def report_attached_data(self, body, file_name):
+        self._writer.enqueue(body, file_name)
+
+    @allure_commons.hookimpl
+    def report_globals(self, globals_item):
+        self._logger.report_globals(globals_item)
+
+
+class BufferedAttachmentWriter:
+    """
+    接管 AllureFileLogger 的附件写入：install() 用 _BufferedFileLogger 替换已注册的 AllureFileLogger
+    （插件管理器的 unregister / register），用例线程只负责入队，后台线程批量写文件；
+    会话结束时 close() 刷盘并换回原插件
+    """
+
+    def __init__(self, batch_size: int = 64):
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._logger = None
+        self._logger_name = None
+        self._proxy = None
+        self.written = 0
+
+    def install(self) -> bool:
+        from allure_commons.logger import AllureFileLogger
+        manager = allure_commons.plugin_manager
+        for name, plugin in manager.list_name_plugin():
+            if isinstance(plugin, AllureFileLogger):
+                self._logger, self._logger_name = plugin, name
+                self._proxy = _BufferedFileLogger(plugin, self)
+                manager.unregister(plugin)
+                manager.register(self._proxy)
+                self._thread = threading.Thread(target=self._run, name="allure-writer", daemon=True)
+                self._thread.start()
+                LOGGER.info("Allure 附件改为后台线程批量写入")
+                return True
+        return False
+
+    def enqueue(self, body, file_name):
+        self._queue.put((body, file_name))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for entry in batch:
+                if entry is None:
+                    stop = True
+                    continue
+                try:
+                    self._logger.report_attached_data(body=entry[0], file_name=entry[1])
+                    self.written += 1
+                except Exception as e:
+                    ERROR_LOGGER.error(f"Allure 附件写入失败 {entry[1]}: {e}")
+            if stop:
+                return
+
+    def close(self) -> None:
+        """写完队列中剩余附件并换回原 AllureFileLogger（allure-pytest 结束时按原对象注销）"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        manager = allure_commons.plugin_manager
+        manager.unregister(self._proxy)
+        manager.register(self._logger, name=self._logger_name)
+        self._proxy = None
+        LOGGER.info(f"Allure 后台写入完成，共 {self.written} 个附件")
 
 
 def add_allure_attachment(name: str, content: Any, attachment_type: allure.attachment_type = None) -> None:
@@ -0,0 +1,513 @@
+import time
+import asyncio
+import weakref
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+from src.utils.sql_handler import (
+    Aggregation, BaseSQLHandler, ConnectionPool, QUERY_CACHE, STREAM_CHUNK_SIZE
+)
+from src.utils.sql_metrics import SQL_METRICS, CURRENT_CASE
+from src.utils.logger import LOGGER, ERROR_LOGGER
+
+try:
+    import aiosqlite
+except ImportError:  # 可选依赖，未安装时不支持异步 SQLite
+    aiosqlite = None
+
+try:
+    import aiomysql
+except ImportError:  # 可选依赖，未安装时不支持异步 MySQL
+    aiomysql = None
+
+
+# =========================================================
+# 异步连接池
+# =========================================================
+class AsyncConnectionPool:
+    """
+    ConnectionPool 的 asyncio 版本，配置项与指标一致（pool_size / pool_idle_timeout /
+    pool_checkout_timeout / pool_ping_idle）。连接绑定创建它的事件循环。
+    """
+
+    def __init__(self, name: str, connect: Callable[[], Awaitable[Any]], ping: Callable[[Any], Awaitable[None]],
+                 close: Callable[[Any], Awaitable[None]], max_size: int = 5, idle_timeout: float = 300,
+                 checkout_timeout: float = 10, ping_idle: float = 5):
+        self.name = name
+        self._connect = connect
+        self._ping = ping
+        self._close = close
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = float(idle_timeout)
+        self.checkout_timeout = float(checkout_timeout)
+        self.ping_idle = float(ping_idle)
+
+        self._idle = deque()   # (conn, last_used)
+        self._size = 0
+        self._in_use = 0
+        self._cond = asyncio.Condition()
+
+        self.created = 0
+        self.checkouts = 0
+        self.evicted = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @classmethod
+    def from_conf(cls, name: str, db_conf: Dict[str, Any], connect, ping, close) -> "AsyncConnectionPool":
+        conf = ConnectionPool.from_conf(name, db_conf, None, None)
+        return cls(name, connect, ping, close, max_size=conf.max_size, idle_timeout=conf.idle_timeout,
+                   checkout_timeout=conf.checkout_timeout, ping_idle=conf.ping_idle)
+
+    async def _close_quietly(self, conn) -> None:
+        try:
+            await self._close(conn)
+        except Exception:
+            pass
+
+    async def acquire(self):
+        start = time.perf_counter()
+        deadline = start + self.checkout_timeout
+        async with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                    conn, _ = self._idle.popleft()
+                    await self._close_quietly(conn)
+                    self._size -= 1
+                    self.evicted += 1
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise TimeoutError(f"异步连接池 {self.name} 已满({self.max_size})，等待 {self.checkout_timeout}s 超时")
+                try:
+                    await asyncio.wait_for(self._cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self._in_use += 1
+
+        try:
+            if conn is not None and time.monotonic() - last_used > self.ping_idle:
+                try:
+                    await self._ping(conn)
+                except Exception as e:
+                    LOGGER.warning(f"异步连接池 {self.name} 健康检查失败，重建连接: {e}")
+                    self.ping_failures += 1
+                    await self._close_quietly(conn)
+                    conn = None
+            if conn is None:
+                conn = await self._connect()
+                self.created += 1
+        except Exception:
+            async with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.perf_counter() - start
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return conn
+
+    async def release(self, conn, broken: bool = False) -> None:
+        if not broken:
+            try:
+                await conn.rollback()
+            except Exception:
+                broken = True
+        if broken:
+            await self._close_quietly(conn)
+        async with self._cond:
+            self._in_use -= 1
+            if broken:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    async def close(self) -> None:
+        async with self._cond:
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                await self._close_quietly(conn)
+                self._size -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "max_size": self.max_size,
+            "created": self.created,
+            "checkouts": self.checkouts,
+            "evicted": self.evicted,
+            "ping_failures": self.ping_failures,
+            "timeouts": self.timeouts,
+            "wait_total": round(self.wait_total, 4),
+            "wait_max": round(self.wait_max, 4),
+            "avg_wait": round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+        }
+
+
+# =========================================================
+# 异步 Handler
+# =========================================================
+class AsyncBaseSQLHandler:
+    """
+    异步 SQL Handler 基类，方法与 BaseSQLHandler 一一对应（均为协程）：
+    execute_query / fetchone / fetchall / execute_batch / close，prepare 与同步版相同。
+    连接池按事件循环懒加载，同一个 Handler 可以在不同事件循环中使用。
+    """
+    name = ""
+    db_key = ""
+    paramstyle = "format"
+    _pools = weakref.WeakKeyDictionary()   # 事件循环 -> {name: AsyncConnectionPool}
+
+    def __init__(self, db_conf: Dict[str, Any]):
+        self.db_conf = db_conf
+
+    def _timed(self, sql: str, op: str):
+        return SQL_METRICS.timer(self.db_key or self.name, sql, op)
+
+    # 子类实现 --------------------------------------------
+    async def _connect(self):
+        raise NotImplementedError
+
+    async def _ping(self, conn) -> None:
+        raise NotImplementedError
+
+    async def _close_conn(self, conn) -> None:
+        raise NotImplementedError
+
+    async def _run(self, conn, sql: str, params: Optional[tuple], one: bool = False):
+        raise NotImplementedError
+
+    def _stream(self, conn, sql: str, params: Optional[tuple], chunk_size: int) -> AsyncIterator[List[tuple]]:
+        raise NotImplementedError
+
+    # 连接池 ----------------------------------------------
+    def _pool(self) -> AsyncConnectionPool:
+        pools = self._pools.setdefault(asyncio.get_running_loop(), {})
+        if self.name not in pools:
+            pools[self.name] = AsyncConnectionPool.from_conf(
+                self.name, self.db_conf, self._connect, self._ping, self._close_conn
+            )
+            LOGGER.info(f"创建异步数据库连接池: {self.name}")
+        return pools[self.name]
+
+    @asynccontextmanager
+    async def _connection(self):
+        pool = self._pool()
+        conn = await pool.acquire()
+        broken = False
+        try:
+            yield conn
+        except (OSError, ConnectionError):
+            broken = True
+            raise
+        finally:
+            await pool.release(conn, broken=broken)
+
+    # 对外接口 --------------------------------------------
+    def prepare(self, template: str, extra_pool: Dict[str, Any]):
+        return BaseSQLHandler.prepare(self, template, extra_pool)
+
+    async def execute_query(self, sql: str, params: Optional[tuple] = None) -> List[tuple]:
+        try:
+            with self._timed(sql, "execute_query"):
+                async with self._connection() as conn:
+                    results = await self._run(conn, sql, params)
+            QUERY_CACHE.invalidate(self.name, sql)
+            LOGGER.debug(f"{self.name} 执行 SQL 成功: {sql}, 返回 {len(results)} 条数据")
+            return results
+        except Exception as e:
+            ERROR_LOGGER.error(f"{self.name} 执行 SQL 失败: {e} | SQL: {sql}")
+            return []
+
+    async def fetchone(self, sql: str, params: Optional[tuple] = None) -> Any:
+        try:
+            with self._timed(sql, "fetchone"):
+                async with self._connection() as conn:
+                    result = await self._run(conn, sql, params, one=True)
+            QUERY_CACHE.invalidate(self.name, sql)
+            LOGGER.debug(f"{self.name} fetchone 成功: {sql}, 结果: {result}")
+            return result
+        except Exception as e:
+            ERROR_LOGGER.error(f"{self.name} fetchone 失败: {e} | SQL: {sql}")
+            return None
+
+    async def fetchall(self, sql: str) -> List[Any]:
+        return await self.execute_query(sql)
+
+    async def execute_batch(self, statements: List[str], params: Optional[List[Optional[tuple]]] = None) -> List[List[tuple]]:
+        """全部语句只借出一次连接，依次执行"""
+        params = params or [None] * len(statements)
+        results = []
+        with self._timed(";\n".join(statements), "execute_batch"):
+            async with self._connection() as conn:
+                for stmt, args in zip(statements, params):
+                    results.append(await self._run(conn, stmt, args))
+                    QUERY_CACHE.invalidate(self.name, stmt)
+        return results
+
+    async def iter_chunks(self, sql: str, params: Optional[tuple] = None,
+                          chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[tuple]]:
+        """按 chunk_size 分批产出结果行，迭代期间占用一个连接"""
+        async with self._connection() as conn:
+            async for chunk in self._stream(conn, sql, params, chunk_size):
+                yield chunk
+
+    async def aggregate(self, sql: str, aggregation: Aggregation, params: Optional[tuple] = None,
+                        chunk_size: int = STREAM_CHUNK_SIZE) -> List[tuple]:
+        sql = aggregation.statement(sql)
+        chunks = self.iter_chunks(sql, params, aggregation.chunk_size(chunk_size))
+        try:
+            with self._timed(sql, f"aggregate {aggregation}"):
+                acc = aggregation.initial()
+                async for chunk in chunks:
+                    acc, done = aggregation.step(acc, chunk)
+                    if done:
+                        break
+            return aggregation.finish(acc)
+        except Exception as e:
+            ERROR_LOGGER.error(f"{self.name} 流式聚合 {aggregation} 失败: {e} | SQL: {sql}")
+            return []
+        finally:
+            await chunks.aclose()
+
+    async def close(self) -> None:
+        """关闭当前事件循环中的连接池"""
+        pools = self._pools.get(asyncio.get_running_loop(), {})
+        pool = pools.pop(self.name, None)
+        if pool is not None:
+            LOGGER.info(f"异步数据库连接池统计: {pool.stats()}")
+            await pool.close()
+
+
+class AsyncSQLiteHandler(AsyncBaseSQLHandler):
+    """基于 aiosqlite 的 SQLite 异步处理"""
+    paramstyle = "qmark"
+
+    def __init__(self, db_conf: Dict[str, Any]):
+        if aiosqlite is None:
+            raise ImportError("异步 SQLite 需要安装 aiosqlite")
+        super().__init__(db_conf)
+        self.name = f"sqlite:{db_conf['path']}"
+
+    async def _connect(self):
+        return await aiosqlite.connect(self.db_conf["path"], timeout=5)
+
+    async def _ping(self, conn) -> None:
+        await conn.execute("SELECT 1")
+
+    async def _close_conn(self, conn) -> None:
+        await conn.close()
+
+    async def _run(self, conn, sql: str, params: Optional[tuple], one: bool = False):
+        async with conn.execute(sql, params or ()) as cursor:
+            return await cursor.fetchone() if one else await cursor.fetchall()
+
+    async def _stream(self, conn, sql: str, params: Optional[tuple], chunk_size: int):
+        async with conn.execute(sql, params or ()) as cursor:
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+
+class AsyncMySQLHandler(AsyncBaseSQLHandler):
+    """基于 aiomysql 的 MySQL 异步处理"""
+    paramstyle = "format"
+
+    def __init__(self, db_conf: Dict[str, Any]):
+        if aiomysql is None:
+            raise ImportError("异步 MySQL 需要安装 aiomysql")
+        super().__init__(db_conf)
+        self.name = f"mysql:{db_conf['host']}:{db_conf['port']}/{db_conf['database']}"
+
+    async def _connect(self):
+        return await aiomysql.connect(
+            host=self.db_conf["host"],
+            port=int(self.db_conf["port"]),
+            user=self.db_conf["user"],
+            password=self.db_conf["password"],
+            db=self.db_conf["database"],
+            charset="utf8mb4",
+            connect_timeout=5
+        )
+
+    async def _ping(self, conn) -> None:
+        await conn.ping(reconnect=False)
+
+    async def _close_conn(self, conn) -> None:
+        conn.close()
+
+    async def _run(self, conn, sql: str, params: Optional[tuple], one: bool = False):
+        async with conn.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchone() if one else await cursor.fetchall()
+
+    async def _stream(self, conn, sql: str, params: Optional[tuple], chunk_size: int):
+        # 非缓冲游标，结果逐批从服务端读取
+        async with conn.cursor(aiomysql.SSCursor) as cursor:
+            await cursor.execute(sql, params)
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+
+class AsyncSQLHandlerFactory:
+    """根据配置创建异步 Handler，配置格式与 SQLHandlerFactory 相同"""
+
+    @staticmethod
+    def create(db_conf: Dict[str, Any], db_key: str = None) -> AsyncBaseSQLHandler:
+        db_type = db_conf.get("type", "").lower()
+        if db_type == "sqlite":
+            handler = AsyncSQLiteHandler(db_conf)
+        elif db_type == "mysql":
+            handler = AsyncMySQLHandler(db_conf)
+        else:
+            raise ValueError(f"不支持的数据库类型: {db_type}")
+        if db_key:
+            handler.db_key = db_key
+        return handler
+
+    @staticmethod
+    def create_sync(db_conf: Dict[str, Any], db_key: str = None) -> "SyncSQLHandler":
+        return SyncSQLHandler(AsyncSQLHandlerFactory.create(db_conf, db_key))
+
+    @staticmethod
+    def close_pools() -> None:
+        """关闭同步门面（后台事件循环）中的全部异步连接池"""
+        if _LoopThread._loop is None:
+            return
+
+        async def _close():
+            pools = AsyncBaseSQLHandler._pools.pop(asyncio.get_running_loop(), {})
+            for pool in pools.values():
+                LOGGER.info(f"异步数据库连接池统计: {pool.stats()}")
+                await pool.close()
+
+        _LoopThread.run(_close())
+
+
+# =========================================================
+# 同步门面
+# =========================================================
+class _LoopThread:
+    """后台事件循环线程，供同步门面提交协程"""
+    _loop = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                threading.Thread(target=cls._loop.run_forever, name="async-sql-loop", daemon=True).start()
+            return cls._loop
+
+    @classmethod
+    def run(cls, coro):
+        return asyncio.run_coroutine_threadsafe(_in_case(CURRENT_CASE.get(), coro), cls.loop()).result()
+
+
+async def _in_case(case: str, coro):
+    # 后台事件循环中的任务不继承调用线程的上下文，需带上当前用例供耗时统计使用
+    CURRENT_CASE.set(case)
+    return await coro
+
+
+class SyncSQLHandler(BaseSQLHandler):
+    """
+    异步 Handler 的同步门面：实现 BaseSQLHandler 接口，现有调用方（RequestDataProcessor、
+    ValueResolver、查询缓存等）无需修改即可使用；多线程调用会在后台事件循环中并发执行。
+    """
+
+    def __init__(self, handler: AsyncBaseSQLHandler):
+        self.handler = handler
+        self.name = handler.name
+        self.db_key = handler.db_key
+        self.paramstyle = handler.paramstyle
+
+    def execute_query(self, sql: str, params: Optional[tuple] = None) -> List[tuple]:
+        return _LoopThread.run(self.handler.execute_query(sql, params))
+
+    def fetchone(self, sql: str, params: Optional[tuple] = None) -> Any:
+        return _LoopThread.run(self.handler.fetchone(sql, params))
+
+    def fetchall(self, sql: str) -> List[Any]:
+        return self.execute_query(sql)
+
+    def execute_batch(self, statements: List[str], params: Optional[List[Optional[tuple]]] = None) -> List[List[tuple]]:
+        return _LoopThread.run(self.handler.execute_batch(statements, params))
+
+    def iter_chunks(self, sql: str, params: Optional[tuple] = None,
+                    chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[tuple]]:
+        chunks = self.handler.iter_chunks(sql, params, chunk_size)
+        try:
+            while True:
+                try:
+                    yield _LoopThread.run(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            _LoopThread.run(chunks.aclose())
+
+    def close(self):
+        # 连接池在会话内复用，显式调用 shutdown 时才关闭
+        pass
+
+    def shutdown(self) -> None:
+        _LoopThread.run(self.handler.close())
+
+
+if __name__ == "__main__":
+    import os
+    import sqlite3
+    import tempfile
+
+    async def demo(conf):
+        handler = AsyncSQLHandlerFactory.create(conf)
+        start = time.perf_counter()
+        rows = await asyncio.gather(*(
+            handler.fetchone(*handler.prepare("SELECT amount FROM ledger WHERE id = ${id}", {"id": i}))
+            for i in range(1, 201)
+        ))
+        print(f"并发 200 次 fetchone: {time.perf_counter() - start:.3f}s, 结果示例 {rows[:3]}")
+        print(await handler.execute_batch(["SELECT COUNT(*) FROM ledger", "SELECT SUM(amount) FROM ledger"]))
+        print(handler._pool().stats())
+        await handler.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "demo.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE ledger (id INTEGER PRIMARY KEY, amount REAL)")
+        conn.executemany("INSERT INTO ledger VALUES (?, ?)", [(i, i * 0.5) for i in range(1, 1001)])
+        conn.commit()
+        conn.close()
+
+        sqlite_conf = {"type": "sqlite", "path": path, "pool_size": "5"}
+        asyncio.run(demo(sqlite_conf))
+
+        # 同步门面：与 SQLHandlerFactory.create 返回的 Handler 用法相同
+        sync_handler = AsyncSQLHandlerFactory.create_sync(sqlite_conf)
+        print(sync_handler.fetchone("SELECT amount FROM ledger WHERE id = ?", (10,)))
+        print(sync_handler.cached_query("SELECT COUNT(*) FROM ledger", ttl=60))
+        sync_handler.shutdown()
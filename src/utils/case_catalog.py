@@ -0,0 +1,203 @@
+# -*- coding:utf-8 -*-
+"""
+用例目录
+
+发现 API / UI 用例目录下的全部工作簿与工作表，用进程池并行解析，按 目录 → 文件路径 → 工作表 → 行 的固定顺序合并，
+得到一份带索引的用例目录。工作簿较多时收集耗时随 CPU 核数而不是文件数增长。
+"""
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from config.settings import ProjectPaths
+from src.utils.read_test_cases import (
+    CASE_CACHE, GenericCaseReader, process_api_row, process_ui_row, read_conf
+)
+from src.utils.logger import LOGGER
+
+CASE_SUFFIXES = (".xlsx", ".xls", ".csv")
+ROW_PROCESSORS = {"api": process_api_row, "ui": process_ui_row}
+DEFAULT_ROOTS = (("api", ProjectPaths.API_AUTO_DIR), ("ui", ProjectPaths.APP_UI_DIR))
+UI_KEYS = ("case_module", "case_submodule", "case_name", "case_title")
+
+LOADER_CONF = read_conf.get_dict("case_loader") if read_conf.config.has_section("case_loader") else {}
+
+
+class CatalogEntry(NamedTuple):
+    """
+    目录中的一条用例：类型、工作簿（相对 data 目录）、工作表、Excel 行号与解析后的用例。
+    module / submodule / case_name / title 按表格习惯向下填充（空单元格沿用上一行的值）。
+    """
+    kind: str
+    workbook: str
+    path: str
+    sheet_index: int
+    sheet: str
+    row: int
+    module: Optional[str]
+    submodule: Optional[str]
+    case_name: Optional[str]
+    title: Optional[str]
+    case: Any
+
+
+def discover(roots: Sequence[Tuple[str, Path]] = DEFAULT_ROOTS) -> List[Tuple[str, Path]]:
+    """按目录顺序返回 (类型, 工作簿路径)，同一目录内按路径排序，忽略 Excel 临时文件"""
+    found = []
+    for kind, root in roots:
+        root = Path(root)
+        if not root.exists():
+            continue
+        found.extend((kind, p.resolve()) for p in sorted(root.rglob("*"))
+                     if p.suffix.lower() in CASE_SUFFIXES and not p.name.startswith("~$"))
+    return found
+
+
+def _workbook_label(path: Path) -> str:
+    try:
+        return path.relative_to(Path(ProjectPaths.DATA_DIR).resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def parse_workbook(task: tuple) -> Tuple[List[CatalogEntry], tuple]:
+    """
+    解析一个工作簿的全部工作表（在进程池 worker 中执行），返回 (用例列表, 解析缓存统计增量)。
+    task 为 (类型, 路径, 是否使用解析缓存[, 只处理的 (工作表序号, Excel 行号) 集合])；
+    跳过的行（API 返回 None、UI 返回空字典）与不在集合中的行不进入目录，标签仍按原始行向下填充。
+    """
+    kind, path, use_cache, *rest = task
+    wanted = rest[0] if rest else None
+    processor = ROW_PROCESSORS[kind]
+    before = CASE_CACHE.counters()
+    label = _workbook_label(Path(path))
+    entries = []
+    cache = CASE_CACHE if use_cache else None
+    for index, sheet in enumerate(GenericCaseReader.sheet_names(path, cache) or [""]):
+        def handle(row, idx, index=index):
+            case = processor(row, idx) if wanted is None or (index, idx + 1) in wanted else None
+            return idx, row[:len(UI_KEYS)], case
+        reader = GenericCaseReader(path, handle, cache=cache, sheet=sheet if index else 0)
+        current = [None] * len(UI_KEYS)
+        for idx, labels, case in reader.read():
+            labels = list(labels) + [None] * (len(UI_KEYS) - len(labels))
+            current = [value if value is not None else prior for value, prior in zip(labels, current)]
+            if case:
+                entries.append(CatalogEntry(kind, label, str(path), index, sheet, idx + 1, *current, case))
+    delta = tuple(after - prior for after, prior in zip(CASE_CACHE.counters(), before))
+    return entries, delta
+
+
+def parse_workbooks(tasks: Sequence[tuple], workers: int = None,
+                    min_parallel: int = None) -> Tuple[List[Tuple[List[CatalogEntry], tuple]], int]:
+    """
+    解析多个工作簿（task 格式同 parse_workbook），返回 (与 tasks 顺序一致的结果, 实际进程数)。
+    :param workers: 进程数，默认取 [case_loader] workers，0 表示 CPU 核数
+    :param min_parallel: 工作簿数少于该值时直接在当前进程解析（进程启动开销大于收益）
+    """
+    workers = int(LOADER_CONF.get("workers") or 0) if workers is None else workers
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+    min_parallel = int(LOADER_CONF.get("min_parallel") or 4) if min_parallel is None else min_parallel
+    if workers > 1 and len(tasks) >= min_parallel:
+        # map 按提交顺序返回结果，合并顺序与串行一致
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(parse_workbook, tasks))
+        for _, delta in results:
+            CASE_CACHE.merge(delta)
+        return results, workers
+    return [parse_workbook(task) for task in tasks], 1
+
+
+class CaseCatalog:
+    """
+    带索引的用例目录：
+    - entries: 按固定顺序排列的全部用例
+    - workbook(path) / module(name) / get(workbook, row, sheet) 按索引取用例
+    - selection: 设置后 load 只解析其中的工作簿与行（{工作簿绝对路径: {(工作表序号, Excel 行号), ...}}），
+      由 --select 在收集前设置
+    """
+    selection: Optional[Dict[str, frozenset]] = None
+
+    def __init__(self, entries: Iterable[CatalogEntry], files: Sequence[str] = ()):
+        self.entries: List[CatalogEntry] = list(entries)
+        self.files: List[str] = list(files)
+        self._by_path: Dict[str, List[int]] = defaultdict(list)
+        self._by_module: Dict[str, List[int]] = defaultdict(list)
+        self._by_key: Dict[tuple, int] = {}
+        for position, entry in enumerate(self.entries):
+            self._by_path[entry.path].append(position)
+            self._by_module[str(entry.module)].append(position)
+            self._by_key[(entry.workbook, entry.sheet_index, entry.row)] = position
+
+    # ---------------------------------------------------
+    # 1. 加载
+    # ---------------------------------------------------
+    @classmethod
+    def load(cls, roots: Sequence[Tuple[str, Path]] = DEFAULT_ROOTS, workers: int = None,
+             min_parallel: int = None, use_cache: bool = True,
+             selection: Optional[Dict[str, frozenset]] = None,
+             files: Optional[Iterable] = None) -> "CaseCatalog":
+        """
+        :param roots: (类型, 目录) 列表，类型为 api / ui，决定行处理函数
+        :param workers: 进程数，默认取 [case_loader] workers，0 表示 CPU 核数
+        :param min_parallel: 工作簿数少于该值时直接在当前进程解析（进程启动开销大于收益）
+        :param use_cache: 是否使用用例解析缓存
+        :param selection: 只加载选中的工作簿与行，默认取 CaseCatalog.selection
+        :param files: 只加载 roots 下的这些工作簿
+        """
+        start = time.perf_counter()
+        selection = cls.selection if selection is None else selection
+        tasks = [(kind, str(path), use_cache) for kind, path in discover(roots)]
+        if files is not None:
+            wanted = {str(Path(p).resolve()) for p in files}
+            tasks = [task for task in tasks if task[1] in wanted]
+        if selection is not None:
+            tasks = [task + (selection[task[1]],) for task in tasks if task[1] in selection]
+        results, workers = parse_workbooks(tasks, workers, min_parallel)
+        catalog = cls((entry for entries, _ in results for entry in entries), [task[1] for task in tasks])
+        LOGGER.info(
+            f"用例目录加载完成: {len(tasks)} 个工作簿, {len(catalog.entries)} 条用例, "
+            f"进程数 {workers}, 耗时 {time.perf_counter() - start:.2f}s"
+        )
+        return catalog
+
+    # ---------------------------------------------------
+    # 2. 查询
+    # ---------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self.entries)
+
+    def workbook(self, path) -> List[CatalogEntry]:
+        """某个工作簿全部工作表中的用例"""
+        return [self.entries[i] for i in self._by_path.get(str(Path(path).resolve()), [])]
+
+    def cases(self, path) -> list:
+        return [entry.case for entry in self.workbook(path)]
+
+    def module(self, name: str) -> List[CatalogEntry]:
+        return [self.entries[i] for i in self._by_module.get(name, [])]
+
+    def get(self, workbook: str, row: int, sheet_index: int = 0) -> Optional[CatalogEntry]:
+        position = self._by_key.get((workbook, sheet_index, row))
+        return None if position is None else self.entries[position]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "cases": len(self.entries),
+            "workbooks": len(self.files or self._by_path),
+            "sheets": len({(e.path, e.sheet_index) for e in self.entries}),
+            "by_kind": {kind: sum(1 for e in self.entries if e.kind == kind) for kind in ROW_PROCESSORS},
+            "modules": {name: len(positions) for name, positions in self._by_module.items()},
+        }
+
+
+if __name__ == "__main__":
+    import json
+
+    catalog = CaseCatalog.load()
+    print(json.dumps(catalog.summary(), ensure_ascii=False, indent=4))
@@ -0,0 +1,270 @@
+# -*- coding:utf-8 -*-
+"""
+用例索引与按表达式选择
+
+把全部工作簿中每条用例的 模块 / 子模块 / 用例名 / 标题 / 标签 / 文件 / 工作表 / 行号 保存为持久化索引
+（默认 data/cache_file/case_index.json）。每次使用前只 stat 各工作簿，mtime 或大小变化的工作簿才重新解析。
+--select 表达式在索引上匹配，CaseCatalog 随后只解析命中的工作簿、只处理命中的行：
+- 模块/子模块/用例名/标题：按 / 分段，每段支持 * ? [] 通配，段数不足时其余段任意，如 登录、H5_充值/链上*
+- @标签 或 tag:标签：匹配 tags 列（API 第 17 列），以及隐含标签 api / ui 与工作簿文件名（不含扩展名）
+- file:通配：匹配工作簿相对 data 目录的路径或文件名
+多个表达式取并集。API 用例在索引中同时记录消费 / 生产的 ${var}，选中用例依赖的生产者默认一并选中
+（[case_index] with_producers = false 时只告警）。
+"""
+import os
+import json
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+from config.settings import ProjectPaths
+from src.utils.case_catalog import DEFAULT_ROOTS, discover, parse_workbooks, _workbook_label
+from src.core.api.case_dependency import consumed_vars, produced_vars
+from src.utils.read_test_cases import read_conf
+from src.utils.logger import LOGGER
+
+INDEX_CONF = read_conf.get_dict("case_index") if read_conf.config.has_section("case_index") else {}
+
+
+class IndexRow(NamedTuple):
+    """索引中的一条用例，标签列为向下填充后的值"""
+    kind: str
+    workbook: str
+    path: str
+    sheet_index: int
+    sheet: str
+    row: int
+    module: Any
+    submodule: Any
+    case_name: Any
+    title: Any
+    tags: tuple
+    consumes: tuple = ()
+    produces: tuple = ()
+
+    @property
+    def key(self) -> tuple:
+        return self.path, self.sheet_index, self.row
+
+    @property
+    def implicit_tags(self) -> tuple:
+        return self.tags + (self.kind, Path(self.workbook).stem)
+
+
+class Selector:
+    """一条 --select 表达式"""
+    __slots__ = ("expression", "kind", "patterns")
+
+    def __init__(self, expression: str, kind: str, patterns: Tuple[str, ...]):
+        self.expression = expression
+        self.kind = kind
+        self.patterns = patterns
+
+    @classmethod
+    def parse(cls, expression: str) -> "Selector":
+        text = expression.strip()
+        if text.startswith("@"):
+            return cls(expression, "tag", (text[1:],))
+        if text.startswith("tag:"):
+            return cls(expression, "tag", (text[4:],))
+        if text.startswith("file:"):
+            return cls(expression, "file", (text[5:],))
+        # 标题中可能含 /，最多拆成 4 段
+        return cls(expression, "path", tuple(segment.strip() or "*" for segment in text.split("/", 3)))
+
+    def matches(self, row: IndexRow) -> bool:
+        if self.kind == "tag":
+            return any(fnmatchcase(tag, self.patterns[0]) for tag in row.implicit_tags)
+        if self.kind == "file":
+            name = Path(row.workbook)
+            return any(fnmatchcase(value, self.patterns[0]) for value in (row.workbook, name.name, name.stem))
+        labels = (row.module, row.submodule, row.case_name, row.title)
+        return all(fnmatchcase("" if value is None else str(value), pattern)
+                   for value, pattern in zip(labels, self.patterns))
+
+    def __repr__(self) -> str:
+        return f"Selector({self.expression!r})"
+
+
+class CaseIndex:
+    """
+    持久化的用例索引：{工作簿绝对路径: {kind, mtime_ns, size, rows}}，
+    rows 为 [工作表序号, 工作表名, Excel 行号, 模块, 子模块, 用例名, 标题, [标签], [消费变量], [生产变量]]。
+    """
+    FORMAT = 2
+
+    def __init__(self, path, roots: Sequence[Tuple[str, Path]] = DEFAULT_ROOTS):
+        self.path = Path(path)
+        self.roots = roots
+        self.workbooks: Dict[str, dict] = {}
+        self._loaded = False
+
+    @classmethod
+    def from_conf(cls, conf: Optional[Dict[str, str]]) -> "CaseIndex":
+        path = Path((conf or {}).get("file") or ProjectPaths.CACHE_FILE / "case_index.json")
+        if not path.is_absolute():
+            path = Path(ProjectPaths.BASE_DIR) / path
+        return cls(path)
+
+    # ---------------------------------------------------
+    # 1. 读写与增量刷新
+    # ---------------------------------------------------
+    def load(self) -> "CaseIndex":
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.workbooks = data["workbooks"] if data.get("format") == self.FORMAT else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            self.workbooks = {}
+        self._loaded = True
+        return self
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"format": self.FORMAT, "workbooks": self.workbooks}, ensure_ascii=False),
+                           encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            LOGGER.warning(f"用例索引写入失败 {self.path}: {e}")
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        stat 全部工作簿，新增或 mtime / 大小变化的重新解析（与 CaseCatalog 相同的进程池），已删除的移除；
+        有变化时写回索引文件
+        """
+        start = time.perf_counter()
+        if not self._loaded:
+            self.load()
+        found = discover(self.roots)
+        workbooks, stale = {}, []
+        for kind, path in found:
+            key, stat = str(path), path.stat()
+            entry = self.workbooks.get(key)
+            if entry is None or entry["kind"] != kind or entry["mtime_ns"] != stat.st_mtime_ns \
+                    or entry["size"] != stat.st_size:
+                stale.append((kind, path, stat))
+            workbooks[key] = entry
+        results, _ = parse_workbooks([(kind, str(path), True) for kind, path, _ in stale])
+        for (kind, path, stat), (entries, _) in zip(stale, results):
+            workbooks[str(path)] = self._index_entry(kind, stat, entries)
+        removed = len(set(self.workbooks) - set(workbooks))
+        self.workbooks = workbooks
+        if stale or removed:
+            self.save()
+        stats = {"workbooks": len(found), "reparsed": len(stale), "removed": removed}
+        LOGGER.info(f"用例索引刷新: {stats}, 耗时 {time.perf_counter() - start:.3f}s")
+        return stats
+
+    @staticmethod
+    def _index_entry(kind: str, stat: os.stat_result, entries: list) -> dict:
+        def variables(case) -> list:
+            if kind != "api":
+                return [[], []]
+            return [sorted(consumed_vars(case)), sorted(produced_vars(case))]
+
+        return {
+            "kind": kind, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+            "rows": [[e.sheet_index, e.sheet, e.row, e.module, e.submodule, e.case_name, e.title,
+                      list(getattr(e.case, "tag_list", ()))] + variables(e.case) for e in entries],
+        }
+
+    # ---------------------------------------------------
+    # 2. 查询与选择
+    # ---------------------------------------------------
+    def rows(self) -> Iterator[IndexRow]:
+        for path, entry in self.workbooks.items():
+            workbook = _workbook_label(Path(path))
+            for sheet_index, sheet, row, module, submodule, case_name, title, tags, consumes, produces \
+                    in entry["rows"]:
+                yield IndexRow(entry["kind"], workbook, path, sheet_index, sheet, row,
+                               module, submodule, case_name, title, tuple(tags), tuple(consumes), tuple(produces))
+
+    def select(self, expressions: Iterable[str]) -> List[IndexRow]:
+        selectors = [Selector.parse(expression) for expression in expressions if expression.strip()]
+        return [row for row in self.rows() if any(selector.matches(row) for selector in selectors)]
+
+    def with_producers(self, rows: Iterable[IndexRow], order: Optional[Sequence] = None) -> Tuple[List[IndexRow], Set[str]]:
+        """
+        补充选中用例依赖的生产者：消费的 ${var} 在选中集合中没有更早的生产者时，选中执行顺序上该用例之前
+        最近的生产者（之前没有时取最后一个），补充的用例再按同样规则补充。
+        order 为工作簿的执行顺序，给定时只在这些工作簿中找生产者；未给定时按索引顺序。
+        返回 (按执行顺序排列的用例, 没有生产者的变量——默认参数或配置)
+        """
+        ordered = list(self.rows())
+        if order is not None:
+            rank = {str(Path(p).resolve()): n for n, p in enumerate(order)}
+            ordered.sort(key=lambda row: rank.get(row.path, len(rank)))   # 稳定排序，同一工作簿保持行序
+        position = {row.key: i for i, row in enumerate(ordered)}
+        producers: Dict[str, List[int]] = {}
+        for i, row in enumerate(ordered):
+            if order is None or row.path in rank:
+                for var in row.produces:
+                    producers.setdefault(var, []).append(i)
+        chosen = {position[row.key] for row in rows if row.key in position}
+        pending, external = sorted(chosen), set()
+        while pending:
+            i = pending.pop()
+            for var in ordered[i].consumes:
+                candidates = [p for p in producers.get(var, ()) if p != i]
+                if not candidates:
+                    external.add(var)
+                    continue
+                earlier = [p for p in candidates if p < i]
+                if any(p in chosen for p in earlier):
+                    continue
+                producer = earlier[-1] if earlier else candidates[-1]
+                if producer not in chosen:
+                    chosen.add(producer)
+                    pending.append(producer)
+        return [ordered[i] for i in sorted(chosen)], external
+
+    @staticmethod
+    def selection(rows: Iterable[IndexRow]) -> Dict[str, frozenset]:
+        """转换为 CaseCatalog.selection：{工作簿绝对路径: {(工作表序号, Excel 行号), ...}}"""
+        grouped: Dict[str, set] = {}
+        for row in rows:
+            grouped.setdefault(row.path, set()).add((row.sheet_index, row.row))
+        return {path: frozenset(keys) for path, keys in grouped.items()}
+
+
+CASE_INDEX = CaseIndex.from_conf(INDEX_CONF)
+
+
+def select_cases(expressions: Sequence[str], index: CaseIndex = None, with_producers: bool = None,
+                 order: Optional[Sequence] = None) -> Dict[str, frozenset]:
+    """
+    刷新索引并按表达式选择，返回可直接赋给 CaseCatalog.selection 的选择结果。
+    with_producers 默认取 [case_index] with_producers（true）：选中用例依赖的生产者一并选中，false 时只告警；
+    order 为工作簿执行顺序，生产者只在其中查找
+    """
+    index = index or CASE_INDEX
+    if with_producers is None:
+        with_producers = str(INDEX_CONF.get("with_producers", "true")).strip().lower() in ("true", "1", "yes", "on")
+    index.refresh()
+    rows = index.select(expressions)
+    if not rows:
+        LOGGER.warning(f"--select {list(expressions)}: 没有匹配的用例")
+        return {}
+    expanded, _ = index.with_producers(rows, order)
+    selected = {row.key for row in rows}
+    missing = [row for row in expanded if row.key not in selected]
+    if missing:
+        names = ", ".join(f"{row.workbook}:{row.row} {row.title}" for row in missing[:10])
+        more = f" 等 {len(missing)} 条" if len(missing) > 10 else ""
+        if with_producers:
+            LOGGER.info(f"--select 补充被依赖的生产者用例: {names}{more}")
+            rows = expanded
+        else:
+            LOGGER.warning(f"--select 未包含被依赖的生产者用例，相关 ${{var}} 可能取不到值: {names}{more}")
+    selection = index.selection(rows)
+    LOGGER.info(f"--select {list(expressions)}: 命中 {len(selection)} 个工作簿, {len(rows)} 条用例")
+    return selection
+
+
+if __name__ == "__main__":
+    import sys
+
+    CASE_INDEX.refresh()
+    for item in CASE_INDEX.select(sys.argv[1:] or ["*"]):
+        print(f"{item.workbook}:{item.row}  {item.module}/{item.submodule}/{item.case_name}/{item.title}  {item.tags}")
@@ -0,0 +1,185 @@
+# -*- coding:utf-8 -*-
+"""
+用例记录
+
+ApiCase / UiStep 代替 Excel 行的 list / dict，使用 __slots__ 保存单元格：
+- header / data / extra / expect 在加载时解析为 JsonCell（预解析的模板树），执行时不再反复 json.loads
+- 非 JSON 列的字符串做驻留，模块名、请求方法等重复值全进程只保存一份
+- 相同文本的 JSON 单元格共用一个 JsonCell，数据驱动的数万行用例只为不同的部分占用内存
+ApiCase 同时保留序列接口（下标、切片、len、迭代返回单元格原文），按下标读取用例的旧代码无需修改；
+UiStep 实现只读 Mapping 接口，与原来的 dict 用法一致。
+"""
+import re
+import sys
+from collections.abc import Mapping
+from typing import Any, Iterator, Sequence
+from src.utils.platform_utils import JsonCell, json_cell
+from src.utils.logger import ERROR_LOGGER
+
+API_FIELDS = (
+    "module", "submodule", "case_name", "title", "skip", "method", "path", "header",
+    "parametric_type", "data", "file_path", "extra", "sql", "expect", "wait", "retry", "tags"
+)
+# 加载时解析为 JsonCell 的列
+JSON_FIELDS = ("header", "data", "extra", "expect")
+# 必有的前 15 列，第 16 列 retry、第 17 列 tags 可选
+API_BASE_COLUMNS = 15
+# send_case 使用的列（不含 tags）
+REQUEST_COLUMNS = 16
+
+_TAG_SEPARATOR = re.compile(r"[,，;；\s]+")
+
+UI_FIELDS = (
+    "case_module", "case_submodule", "case_name", "case_title", "skip", "by",
+    "finder", "action", "value", "deposit", "retrieve", "expected",
+    "sliding_location", "wait"
+)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _cell_text(value: Any) -> Any:
+    return value.text if isinstance(value, JsonCell) else value
+
+
+def parse_tags(value: Any) -> tuple:
+    """tags 列：逗号 / 分号 / 空白分隔的标签"""
+    if value is None:
+        return ()
+    return tuple(tag for tag in _TAG_SEPARATOR.split(str(value)) if tag)
+
+
+class ApiCase:
+    """
+    一条 API 用例。属性名见 API_FIELDS，JSON 列为 JsonCell（空单元格为 None）；
+    case[i] / case[:15] / list(case) 返回单元格原文，与原来的行 list 一致。
+    """
+    __slots__ = API_FIELDS
+    json_fields = JSON_FIELDS
+
+    def __init__(self, *cells: Any):
+        cells = cells[:len(API_FIELDS)]
+        for name, value in zip(API_FIELDS, cells):
+            if name in self.json_fields and isinstance(value, str) and value:
+                value = json_cell(value)
+            else:
+                value = _intern(value)
+            object.__setattr__(self, name, value)
+        for name in API_FIELDS[len(cells):]:
+            object.__setattr__(self, name, None)
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any], idx: int = None, **kwargs) -> "ApiCase":
+        """由 Excel/CSV 的一行构建，JSON 列不合法时在加载阶段记录错误（仍保留用例，执行时按原逻辑处理）"""
+        case = cls(*row, **kwargs)
+        for name in cls.json_fields:
+            cell = getattr(case, name)
+            if isinstance(cell, JsonCell) and cell.error:
+                ERROR_LOGGER.error(f"第 {idx} 行 {name} 列不是合法 JSON: {cell.error} | {cell.text}")
+        return case
+
+    @classmethod
+    def of(cls, case: Any) -> "ApiCase":
+        """
+        send_case 的入参兼容：ApiCase 原样返回，list/tuple 转换为 ApiCase，
+        带 load() 的延迟记录（数据驱动用例的变体）在这里才读取数据
+        """
+        if isinstance(case, cls):
+            return case
+        if hasattr(case, "load"):
+            return case.load()
+        return cls(*case)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ApiCase 为只读记录")
+
+    def cells(self) -> tuple:
+        """请求相关的 16 列（含 retry，不含 tags），JSON 列为 JsonCell，供 send_case 解包"""
+        return tuple(getattr(self, name) for name in API_FIELDS[:REQUEST_COLUMNS])
+
+    @property
+    def tag_list(self) -> tuple:
+        return parse_tags(self.tags)
+
+    # ---------------------------------------------------
+    # 序列接口：返回单元格原文
+    # ---------------------------------------------------
+    def __len__(self) -> int:
+        # 可选列只计到最后一个有值的列，与原来的行 list 长度一致
+        for size in range(len(API_FIELDS), API_BASE_COLUMNS, -1):
+            if getattr(self, API_FIELDS[size - 1]) is not None:
+                return size
+        return API_BASE_COLUMNS
+
+    def __iter__(self) -> Iterator[Any]:
+        for name in API_FIELDS[:len(self)]:
+            yield _cell_text(getattr(self, name))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return _cell_text(getattr(self, API_FIELDS[:len(self)][index]))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ApiCase, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ApiCase({self.module!r}, {self.case_name!r}, {self.title!r}, {self.method!r}, {self.path!r})"
+
+    def __reduce__(self):
+        # 跨进程（用例目录的进程池）只传单元格原文，JsonCell 在接收方重新共用
+        return type(self), tuple(self)
+
+    @property
+    def label(self) -> str:
+        return f"{self.case_name}/{self.title}"
+
+
+class UiStep(Mapping):
+    """一条 UI 步骤，键见 UI_FIELDS；step.get("by") / step["finder"] 与原来的 dict 用法一致"""
+    __slots__ = UI_FIELDS
+
+    def __init__(self, *cells: Any):
+        cells = cells[:len(UI_FIELDS)]
+        for name, value in zip(UI_FIELDS, cells):
+            object.__setattr__(self, name, _intern(value))
+        for name in UI_FIELDS[len(cells):]:
+            object.__setattr__(self, name, None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("UiStep 为只读记录")
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in UI_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(UI_FIELDS)
+
+    def __len__(self) -> int:
+        return len(UI_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"UiStep({self.case_name!r}, {self.case_title!r}, {self.action!r})"
+
+    def __reduce__(self):
+        return UiStep, tuple(getattr(self, name) for name in UI_FIELDS)
+
+
+if __name__ == "__main__":
+    row = ["登录", "账号登录", "密码登录", "正确密码", None, "post", "/api/login",
+           '{"lang": "zh"}', "application/json", '{"account": "${account}", "password": "${password}"}',
+           None, '{"token": "$.data.token"}', None, '{"$.code": 0}', None]
+    case = ApiCase.from_row(row, 1)
+    print(case, len(case), case[:4])
+    print(case.data.render({"account": "u1@test.com", "password": "123456"}))
+    print(case.extra.value, ApiCase.from_row(row, 2).data is case.data)
+    step = UiStep("注册", "邮箱注册", "输入邮箱", "输入", None, "id", "email", "send_keys", "${email}")
+    print(step, step.get("finder"), dict(step)["action"])
@@ -0,0 +1,453 @@
+# -*- coding:utf-8 -*-
+"""
+数据驱动用例
+
+API 用例的 data 列可以写数据文件或目录（相对项目根目录），一行用例按文件中的记录展开为 N 条：
+- .json: 对象数组（单个对象视为一条）
+- .jsonl: 每行一个 JSON 对象
+- .csv: 首行为列名，之后每行一条（取值均为字符串）
+目录下按文件名顺序读取全部 .json / .jsonl / .csv。记录即请求数据，保留键 _title 追加到用例标题，
+_expect 覆盖 expect 列。
+
+收集阶段只建立索引（记录数，jsonl / csv 另记每条记录的字节偏移），pytest 收集钩子按索引生成测试项，
+变体只保存 (用例, 序号)，执行时才读取、解析对应记录；路径解析与文件索引按单元格文本缓存，
+解析后的 .json 文件按 LRU 保留最近 [data_driven] parsed_files 个。
+每个 pytest 测试项约占 2~3KB，一行用例最多生成 [data_driven] max_items 个测试项：记录数不超过时每条记录一个，
+超过时连续的记录合并为一批（CaseBatch），由 pytest_pyfunc_call 钩子在一个测试项中逐条执行。
+"""
+import io
+import re
+import math
+import inspect
+import csv
+import json
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from config.settings import ProjectPaths
+from src.utils.case_records import ApiCase, JSON_FIELDS
+from src.utils.platform_utils import JsonCell
+from src.utils.logger import LOGGER, ERROR_LOGGER
+
+PROJECT = Path(ProjectPaths.BASE_DIR)
+DATA_SUFFIXES = (".json", ".jsonl", ".csv")
+# 记录中的保留键，不作为请求数据
+TITLE_KEY = "_title"
+EXPECT_KEY = "_expect"
+
+_VAR_BYTES = re.compile(rb"\$\{(.*?)}")
+
+
+class ParsedFiles:
+    """解析后的 .json 数据文件，按 LRU 保留最近 maxsize 个"""
+
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = max(1, int(maxsize))
+        self._files: "OrderedDict[Path, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, conf: Optional[Dict[str, str]]) -> "ParsedFiles":
+        self.maxsize = max(1, int((conf or {}).get("parsed_files") or 8))
+        return self
+
+    def get(self, path: Path, loader: Callable[[Path], list]) -> list:
+        with self._lock:
+            records = self._files.get(path)
+            if records is not None:
+                self._files.move_to_end(path)
+                return records
+        records = loader(path)
+        self.put(path, records)
+        return records
+
+    def put(self, path: Path, records: list) -> None:
+        with self._lock:
+            self._files[path] = records
+            self._files.move_to_end(path)
+            while len(self._files) > self.maxsize:
+                self._files.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+
+
+PARSED_FILES = ParsedFiles()
+# 一行数据驱动用例最多生成的测试项数，0 表示不限制（每条记录一个测试项）
+MAX_ITEMS = 1000
+
+
+def configure(conf: Optional[Dict[str, str]]) -> None:
+    """读取 [data_driven] 配置：parsed_files、max_items"""
+    global MAX_ITEMS
+    conf = conf or {}
+    PARSED_FILES.configure(conf)
+    MAX_ITEMS = max(0, int(conf.get("max_items", 1000) or 0))
+
+
+# =========================================================
+# 数据文件索引
+# =========================================================
+def _load_json(path: Path) -> list:
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def _logical_lines(f) -> Iterator[tuple]:
+    """按 CSV 逻辑记录读取：引号内的换行不结束记录，返回 (起始偏移, 原始字节)"""
+    offset = f.tell()
+    buffer, quotes = b"", 0
+    for line in iter(f.readline, b""):
+        buffer += line
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield offset, buffer
+            offset += len(buffer)
+            buffer, quotes = b"", 0
+    if buffer:
+        yield offset, buffer
+
+
+def _parse_csv_line(raw: bytes) -> List[str]:
+    return next(csv.reader(io.StringIO(raw.decode("utf-8-sig"), newline="")), [])
+
+
+class DataFile:
+    """单个数据文件的索引：记录数、引用的 ${var}，jsonl / csv 还有每条记录的起始字节偏移"""
+    __slots__ = ("path", "kind", "count", "offsets", "fields", "variables")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.kind = path.suffix.lower()
+        self.offsets: Optional[array] = None
+        self.fields: Optional[List[str]] = None
+        self.variables = frozenset()
+        getattr(self, f"_index_{self.kind[1:]}")()
+
+    def _index_json(self) -> None:
+        records = _load_json(self.path)
+        self.count = len(records)
+        self.variables = frozenset(v.decode("utf-8") for v in _VAR_BYTES.findall(self.path.read_bytes()))
+        PARSED_FILES.put(self.path, records)
+
+    def _index_jsonl(self) -> None:
+        offsets, names = array("q"), set()
+        with self.path.open("rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    offsets.append(offset)
+                    names.update(_VAR_BYTES.findall(line))
+                offset += len(line)
+        self._finish(offsets, names)
+
+    def _index_csv(self) -> None:
+        offsets, names = array("q"), set()
+        with self.path.open("rb") as f:
+            for offset, raw in _logical_lines(f):
+                if not raw.strip():
+                    continue
+                if self.fields is None:
+                    self.fields = _parse_csv_line(raw)
+                    continue
+                offsets.append(offset)
+                names.update(_VAR_BYTES.findall(raw))
+        self._finish(offsets, names)
+
+    def _finish(self, offsets: array, names: set) -> None:
+        self.offsets = offsets
+        self.count = len(offsets)
+        self.variables = frozenset(v.decode("utf-8") for v in names)
+
+    def record(self, index: int) -> Any:
+        if self.kind == ".json":
+            return PARSED_FILES.get(self.path, _load_json)[index]
+        with self.path.open("rb") as f:
+            f.seek(self.offsets[index])
+            if self.kind == ".jsonl":
+                return json.loads(f.readline())
+            _, raw = next(_logical_lines(f))
+        return dict(zip(self.fields, _parse_csv_line(raw)))
+
+    def __iter__(self) -> Iterator[Any]:
+        """顺序读取全部记录（不按偏移逐条打开文件）"""
+        if self.kind == ".json":
+            yield from PARSED_FILES.get(self.path, _load_json)
+            return
+        with self.path.open("rb") as f:
+            if self.kind == ".jsonl":
+                yield from (json.loads(line) for line in f if line.strip())
+                return
+            for _, raw in _logical_lines(f):
+                if raw.strip():
+                    yield dict(zip(self.fields, _parse_csv_line(raw)))
+
+
+class DataSource:
+    """data 列指向的数据文件或目录，记录按 文件名 → 文件内顺序 编号"""
+    __slots__ = ("text", "path", "files", "ends")
+
+    def __init__(self, text: str, path: Path, files: List[DataFile]):
+        self.text = text
+        self.path = path
+        self.files = files
+        self.ends = []
+        total = 0
+        for data_file in files:
+            total += data_file.count
+            self.ends.append(total)
+
+    def __len__(self) -> int:
+        return self.ends[-1] if self.ends else 0
+
+    def record(self, index: int) -> Any:
+        if not 0 <= index < len(self):
+            raise IndexError(f"{self.text} 共 {len(self)} 条记录，没有第 {index} 条")
+        position = bisect_right(self.ends, index)
+        start = self.ends[position - 1] if position else 0
+        return self.files[position].record(index - start)
+
+    def __iter__(self) -> Iterator[Any]:
+        for data_file in self.files:
+            yield from data_file.__iter__()
+
+    @property
+    def variables(self) -> frozenset:
+        return frozenset().union(*(data_file.variables for data_file in self.files))
+
+    def __repr__(self) -> str:
+        return f"DataSource({self.text!r}, files={len(self.files)}, records={len(self)})"
+
+
+def data_source(text: Any) -> Optional[DataSource]:
+    """
+    data 列是数据文件/目录时返回 DataSource，否则返回 None。
+    JSON 文本（以 { 或 [ 开头）与多行文本直接跳过，不访问文件系统；其余文本的解析结果按文本缓存。
+    """
+    if not isinstance(text, str):
+        return None
+    text = text.strip()
+    if not text or text[0] in "{[" or "\n" in text:
+        return None
+    return _resolve(text)
+
+
+@lru_cache(maxsize=1024)
+def _resolve(text: str) -> Optional[DataSource]:
+    try:
+        path = (PROJECT / text).resolve()
+        if path.is_dir():
+            files = sorted(p for p in path.iterdir() if p.suffix.lower() in DATA_SUFFIXES and p.is_file())
+        elif path.is_file() and path.suffix.lower() in DATA_SUFFIXES:
+            files = [path]
+        else:
+            return None
+        if not files:
+            return None
+        source = DataSource(text, path, [DataFile(p) for p in files])
+    except (OSError, ValueError) as e:
+        ERROR_LOGGER.error(f"读取数据驱动文件出错 {text}: {e}")
+        return None
+    LOGGER.info(f"数据驱动: {text} 共 {len(source.files)} 个文件, {len(source)} 条记录")
+    return source
+
+
+# =========================================================
+# 数据驱动用例与变体
+# =========================================================
+class DataDrivenCase(ApiCase):
+    """data 列为数据文件/目录的用例，按记录展开为 CaseVariant；case[9] 仍为原始路径"""
+    __slots__ = ("source",)
+    json_fields = tuple(name for name in JSON_FIELDS if name != "data")
+
+    def __init__(self, *cells: Any, source: DataSource = None):
+        super().__init__(*cells)
+        object.__setattr__(self, "source", source or data_source(self.data))
+
+    @property
+    def count(self) -> int:
+        return len(self.source) if self.source is not None else 0
+
+    @property
+    def variables(self) -> frozenset:
+        """数据文件中引用的 ${var}，供用例依赖图识别生产/消费关系"""
+        return self.source.variables if self.source is not None else frozenset()
+
+    def variants(self) -> Iterator["CaseVariant"]:
+        return (CaseVariant(self, index) for index in range(self.count))
+
+    def variant(self, index: int) -> ApiCase:
+        """第 index 条记录对应的用例：data 为该记录，_title / _expect 覆盖标题与 expect"""
+        record = self.source.record(index)
+        cells = list(self.cells())
+        suffix, expect = index + 1, None
+        if isinstance(record, dict) and (TITLE_KEY in record or EXPECT_KEY in record):
+            record = dict(record)
+            suffix = record.pop(TITLE_KEY, suffix)
+            expect = record.pop(EXPECT_KEY, None)
+        cells[3] = f"{self.title}-{suffix}"
+        cells[9] = JsonCell.from_value(record)
+        if expect is not None:
+            cells[13] = expect if isinstance(expect, str) else JsonCell.from_value(expect)
+        return ApiCase(*cells, self.tags)
+
+
+class CaseVariant:
+    """数据驱动用例的一条变体：收集阶段只保存 (用例, 序号)，send_case 时才读取记录"""
+    __slots__ = ("case", "index")
+
+    def __init__(self, case: DataDrivenCase, index: int):
+        self.case = case
+        self.index = index
+
+    def load(self) -> ApiCase:
+        return self.case.variant(self.index)
+
+    def __repr__(self) -> str:
+        return f"CaseVariant({self.case.title!r}, {self.index})"
+
+
+def expand_cases(cases: Iterable) -> Iterator:
+    """不经过 pytest 直接执行时使用：数据驱动用例展开为各条记录对应的 ApiCase，其余用例原样返回"""
+    for case in cases:
+        if isinstance(case, DataDrivenCase):
+            yield from (case.variant(index) for index in range(case.count))
+        else:
+            yield case
+
+
+class CaseBatch:
+    """连续的一批变体 [start, stop)，作为一个测试项的参数，执行时逐条读取记录"""
+    __slots__ = ("case", "start", "stop")
+
+    def __init__(self, case: DataDrivenCase, start: int, stop: int):
+        self.case = case
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __iter__(self) -> Iterator[CaseVariant]:
+        return (CaseVariant(self.case, index) for index in range(self.start, self.stop))
+
+    @property
+    def id(self) -> str:
+        return f"data{self.start + 1}-{self.stop}"
+
+    def __repr__(self) -> str:
+        return f"CaseBatch({self.case.title!r}, {self.start}, {self.stop})"
+
+
+def split_records(case: DataDrivenCase, max_items: int = None) -> List:
+    """记录数不超过 max_items 时每条记录一个 CaseVariant，否则均分为不超过 max_items 个 CaseBatch"""
+    max_items = MAX_ITEMS if max_items is None else max_items
+    if not max_items or case.count <= max_items:
+        return list(case.variants())
+    size = math.ceil(case.count / max_items)
+    return [CaseBatch(case, start, min(start + size, case.count)) for start in range(0, case.count, size)]
+
+
+# ===================================================
+# pytest 集成：测试项复制依赖 pytest 内部结构（CallSpec2 为 dataclass、_idlist、_fixtureinfo），
+# 集中在 _clone_item；版本超出已验证范围或结构不符时不复制，整行作为一个测试项由 run_records 逐条执行
+# ===================================================
+PYTEST_VERIFIED = ((8, 0), (10, 0))
+_clone_support: Optional[bool] = None
+
+
+def _clone_supported(item) -> bool:
+    global _clone_support
+    if _clone_support is None:
+        import dataclasses
+        import pytest
+        version = tuple(pytest.version_tuple[:2])
+        _clone_support = (PYTEST_VERIFIED[0] <= version < PYTEST_VERIFIED[1]
+                          and dataclasses.is_dataclass(item.callspec)
+                          and isinstance(getattr(item.callspec, "_idlist", None), list)
+                          and hasattr(item, "_fixtureinfo"))
+        if not _clone_support:
+            LOGGER.warning(f"pytest {pytest.__version__} 未经验证，数据驱动用例不按记录拆分，每行作为一个测试项逐条执行")
+    return _clone_support
+
+
+def _clone_item(item, argname: str, value, suffix: str):
+    """以 value 替换参数 argname、名称追加 suffix，复制出同一测试函数的新测试项（标记沿用原测试项）"""
+    import dataclasses
+    callspec = item.callspec
+    spec = dataclasses.replace(callspec, params={**callspec.params, argname: value},
+                               _idlist=[*callspec._idlist, suffix])
+    return type(item).from_parent(
+        item.parent, name=f"{item.originalname}[{spec.id}]", callspec=spec, callobj=item.obj,
+        fixtureinfo=item._fixtureinfo, originalname=item.originalname
+    )
+
+
+def expand_items(items: Iterable, argname: str = "case", max_items: int = None) -> Iterator:
+    """
+    pytest 收集钩子使用：参数 argname 为 DataDrivenCase 的用例按 split_records 生成测试项，
+    名称追加 -data{序号} 或 -data{起}-{止}，标记（如 xdist_group）沿用原用例；记录数为 0 时该行不生成测试项。
+    """
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        case = callspec.params.get(argname) if callspec is not None else None
+        if not isinstance(case, DataDrivenCase):
+            yield item
+            continue
+        if not case.count:
+            continue
+        if not _clone_supported(item):
+            yield item
+            continue
+        for part in split_records(case, max_items):
+            suffix = part.id if isinstance(part, CaseBatch) else f"data{part.index + 1}"
+            yield _clone_item(item, argname, part, suffix)
+
+
+def run_records(pyfuncitem, argname: str = "case") -> bool:
+    """
+    pytest_pyfunc_call 钩子使用：参数为 CaseBatch / DataDrivenCase 时逐条记录调用测试函数并返回 True，
+    单条失败不中断本批，结束后汇总失败的记录抛出 AssertionError；其他参数返回 False，交给 pytest 默认调用。
+    """
+    __tracebackhide__ = True
+    value = pyfuncitem.funcargs.get(argname)
+    if isinstance(value, DataDrivenCase):
+        value = CaseBatch(value, 0, value.count)
+    if not isinstance(value, CaseBatch):
+        return False
+    func = pyfuncitem.obj
+    kwargs = {name: pyfuncitem.funcargs[name] for name in inspect.signature(func).parameters
+              if name in pyfuncitem.funcargs}
+    failures = []
+    for variant in value:
+        try:
+            func(**{**kwargs, argname: variant})
+        except Exception as e:
+            failures.append(f"data{variant.index + 1}: {type(e).__name__}: {e}")
+            ERROR_LOGGER.error(f"{value.case.title} 第 {variant.index + 1} 条记录失败: {e}")
+    if failures:
+        shown = "\n".join(failures[:20])
+        more = f"\n... 其余 {len(failures) - 20} 条见错误日志" if len(failures) > 20 else ""
+        raise AssertionError(f"{value.id} 中 {len(failures)}/{len(value)} 条记录失败:\n{shown}{more}")
+    return True
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, "a.jsonl").write_text('{"amount": 1, "_title": "最小值"}\n{"amount": "${max_amount}"}\n',
+                                        encoding="utf-8")
+        Path(tmp, "b.csv").write_text('amount,remark\n10,"多行\n备注"\n20,普通\n', encoding="utf-8")
+        row = ["充值", "链上充值", "金额边界", "金额", None, "post", "/api/deposit", None, "application/json",
+               tmp, None, None, None, '{"$.code": 0}', None]
+        case = DataDrivenCase(*row)
+        print(case.source, sorted(case.variables))
+        for variant in case.variants():
+            loaded = variant.load()
+            print(variant, loaded.title, loaded.data.render({"max_amount": 99}))
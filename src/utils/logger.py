@@ -39,6 +39,7 @@ LOGGING_DIC = {
             'maxBytes': 1024 * 1024 * 10,  # 日志大小 10M
             'backupCount': 10,  # 日志文件保存数量限制
             'encoding': 'utf-8',
+            'delay': True,  # 第一条日志写入时才打开文件，导入模块不创建/占用日志文件
             'formatter': 'standard',
         },
         'file_error_handler': {
@@ -48,6 +49,7 @@ LOGGING_DIC = {
             'maxBytes': 1024 * 1024 * 10,  # 日志大小 10M
             'backupCount': 10,  # 日志文件保存数量限制
             'encoding': 'utf-8',
+            'delay': True,  # 第一条日志写入时才打开文件，导入模块不创建/占用日志文件
             'formatter': 'standard',
         },
     },
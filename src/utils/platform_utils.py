@@ -2,13 +2,18 @@
 # Create on
 import shutil
 import time
+import logging
 import re
 import os
+import sys
 import json
+import weakref
+import threading
 import subprocess
 from string import Template
+from functools import lru_cache
 from jsonpath import jsonpath
-from typing import NamedTuple, Any, Dict, List, Union
+from typing import NamedTuple, Any, Dict, List, Optional, Union
 from src.utils.logger import LOGGER, ERROR_LOGGER
 
 
@@ -225,6 +230,181 @@ def replace_str(text: str, extra_pool: Dict[str, Any]) -> str:
         return text
 
 
+# =========================================================
+# ${var} 模板：每个模板字符串只解析一次，之后直接按片段渲染
+# =========================================================
+VAR_PATTERN = re.compile(r'\$\{(.*?)}')
+
+
+class CompiledTemplate:
+    """
+    预解析的 ${var} 模板，segments 为 (是否变量, 文本/变量名) 列表。
+    变量在参数池中不存在时保留原样 ${var}，与 rep_expr 原有行为一致。
+    """
+    __slots__ = ("text", "segments", "variables")
+
+    def __init__(self, text: str):
+        self.text = text
+        segments = []
+        pos = 0
+        for match in VAR_PATTERN.finditer(text):
+            if match.start() > pos:
+                segments.append((False, text[pos:match.start()]))
+            segments.append((True, match.group(1)))
+            pos = match.end()
+        if pos < len(text):
+            segments.append((False, text[pos:]))
+        self.segments = tuple(segments)
+        self.variables = tuple(v for is_var, v in self.segments if is_var)
+
+    def render(self, extra_pool: Dict[str, Any]) -> str:
+        if not self.variables:
+            return self.text
+        parts = []
+        for is_var, value in self.segments:
+            if is_var:
+                parts.append(str(extra_pool[value]) if value in extra_pool else f"${{{value}}}")
+            else:
+                parts.append(value)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text: str) -> CompiledTemplate:
+    return CompiledTemplate(text)
+
+
+class JsonTemplate:
+    """
+    预解析的 JSON 模板：JSON 文本只 loads 一次，渲染时只替换包含 ${var} 的字符串（键和值），
+    其余节点类型保持不变。每次渲染都返回新的容器，调用方可以放心原地修改。
+    解析时含 ${var} 的字符串直接替换为 CompiledTemplate 节点，键名做驻留，数万个模板共用相同的键。
+    """
+    __slots__ = ("tree", "dynamic")
+
+    def __init__(self, tree: Any):
+        self.dynamic = False
+        self.tree = self._compile(tree)
+
+    def _compile(self, node: Any) -> Any:
+        if isinstance(node, dict):
+            return {self._compile(k) if "${" in k else sys.intern(k): self._compile(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self._compile(v) for v in node]
+        if isinstance(node, str) and "${" in node:
+            self.dynamic = True
+            return compile_template(node)
+        return node
+
+    def render(self, extra_pool: Dict[str, Any]) -> Any:
+        return self._render(self.tree, extra_pool)
+
+    def _render(self, node: Any, extra_pool: Dict[str, Any]) -> Any:
+        node_type = type(node)
+        if node_type is dict:
+            return {self._render(k, extra_pool): self._render(v, extra_pool) for k, v in node.items()}
+        if node_type is list:
+            return [self._render(v, extra_pool) for v in node]
+        if node_type is CompiledTemplate:
+            return node.render(extra_pool)
+        return node
+
+
+@lru_cache(maxsize=4096)
+def compile_json_template(text: str) -> Optional[JsonTemplate]:
+    """JSON 文本本身合法时返回 JsonTemplate；含未加引号的 ${var} 等非法 JSON 时返回 None"""
+    try:
+        return JsonTemplate(json.loads(text))
+    except (ValueError, TypeError):
+        return None
+
+
+class JsonCell:
+    """
+    用例中的 JSON 单元格（header / data / extra / expect），加载时解析并校验一次：
+    - template: 合法 JSON 时为预解析的 JsonTemplate，执行时直接在树上替换 ${var}
+    - 含未加引号的 ${var}（如 {"amount": ${amount}}）时 template 为 None，渲染时退回文本替换后再解析
+    - error: 把 ${var} 视为普通值后仍不是合法 JSON 时的错误信息，加载阶段即可发现
+    不经过 lru_cache，数万条用例也不会互相挤出缓存；相同文本的单元格共用一个实例（见 json_cell）。
+    """
+    __slots__ = ("text", "template", "error", "__weakref__")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.error = None
+        try:
+            self.template = JsonTemplate(json.loads(text))
+        except (ValueError, TypeError) as e:
+            self.template = None
+            try:
+                json.loads(VAR_PATTERN.sub("0", text))
+            except (ValueError, TypeError):
+                self.error = str(e)
+
+    @classmethod
+    def from_value(cls, value: Any) -> "JsonCell":
+        """由已解析的值构建（数据驱动的记录），不再经过 json.loads"""
+        cell = cls.__new__(cls)
+        cell.text = json.dumps(value, ensure_ascii=False)
+        cell.template = JsonTemplate(value)
+        cell.error = None
+        return cell
+
+    @property
+    def value(self) -> Any:
+        """解析后的 JSON（不替换 ${var}，不含变量时直接返回解析结果，只读）；非法 JSON 时为 None"""
+        if self.template is None:
+            return None
+        return self.template.render({}) if self.template.dynamic else self.template.tree
+
+    def render(self, extra_pool: Dict[str, Any]) -> Any:
+        if self.template is not None:
+            return self.template.render(extra_pool)
+        return convert_json(rep_expr(self.text, extra_pool))
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"JsonCell({self.text!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, JsonCell):
+            return self.text == other.text
+        return self.text == other
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def __reduce__(self):
+        return json_cell, (self.text,)
+
+
+_JSON_CELLS = weakref.WeakValueDictionary()
+_JSON_CELLS_LOCK = threading.Lock()
+
+
+def json_cell(text: str) -> JsonCell:
+    """按文本共用 JsonCell：数据驱动的多行用例通常 header / expect 相同，只解析、保存一份"""
+    with _JSON_CELLS_LOCK:
+        cell = _JSON_CELLS.get(text)
+        if cell is None:
+            cell = _JSON_CELLS[text] = JsonCell(text)
+        return cell
+
+
+def json_value(cell: Any) -> Any:
+    """取 JSON 单元格解析后的值：JsonCell 直接返回已解析的树，字符串按原逻辑 json.loads（非法时抛出异常）"""
+    if isinstance(cell, JsonCell):
+        if cell.template is None:
+            raise ValueError(f"不是合法 JSON: {cell.text}")
+        return cell.value
+    return json.loads(cell)
+
+
 def rep_expr(text: str, extra_pool: Dict[str, Any]) -> str:
     """
     替换文本中的表达式变量，格式为${var}，从extra_pool中取值替换。
@@ -233,26 +413,152 @@ def rep_expr(text: str, extra_pool: Dict[str, Any]) -> str:
         ERROR_LOGGER.error(f"rep_expr需要一个字符串输入，得到 {type(text)}")
         return text
 
-    pattern = re.compile(r'\$\{(.*?)}')
-    def replacer(match):
-        key = match.group(1)
-        value = extra_pool.get(key, match.group(0))
-        return str(value)
     try:
-        result = pattern.sub(replacer, text)
-        LOGGER.debug(f"rep_expr 输入: {text}, 输出: {result}")
+        result = compile_template(text).render(extra_pool)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"rep_expr 输入: {text}, 输出: {result}")
         return result
     except Exception as e:
         ERROR_LOGGER.error(f"rep_expr错误: {e}")
         return text
 
 
+def render_json(text: str, extra_pool: Dict[str, Any]) -> Any:
+    """
+    替换 ${var} 并转换为 json 对象。
+    合法 JSON 模板直接在解析好的树上替换，不再每次先替换文本再 json.loads；
+    否则退回 rep_expr + convert_json；加载阶段已解析的 JsonCell 直接渲染。
+    """
+    if isinstance(text, JsonCell):
+        return text.render(extra_pool)
+    if not isinstance(text, str):
+        return convert_json(text)
+    template = compile_json_template(text)
+    if template is not None:
+        return template.render(extra_pool)
+    return convert_json(rep_expr(text, extra_pool))
+
+
+# =========================================================
+# JSONPath：表达式编译结果按 LRU 缓存，简单路径直接遍历 dict/list
+# =========================================================
+# 形如 $.data.token / $.data[0].token / $['data'] 的简单路径，不含过滤、通配、切片和递归
+_SIMPLE_STEPS = r"(?:\.[^.\[\]()?*@'\"]+|\[\d+]|\['[^'\[\]]*'])"
+SIMPLE_JSONPATH_PATTERN = re.compile(rf"^\${_SIMPLE_STEPS}+$")
+SIMPLE_JSONPATH_STEP = re.compile(r"\.([^.\[\]()?*@'\"]+)|\[(\d+)]|\['([^'\[\]]*)']")
+# 形如 $.data.list[?(@.coinSymbol == 'USDT')].totalBalance 的单个过滤表达式路径
+FILTER_JSONPATH_PATTERN = re.compile(rf"^(\${_SIMPLE_STEPS}*)\[\?\((.*?)\)]({_SIMPLE_STEPS}*)$")
+_MISSING = object()
+
+
+def _translate_jsonpath_filter(loc: str) -> str:
+    """把过滤表达式翻译成 python 表达式，规则与 jsonpath 库 evalx 保持一致"""
+    loc = loc.replace("@.length", "len(__obj)")
+    loc = loc.replace("&&", " and ").replace("||", " or ")
+    loc = re.sub(r"!@\.([a-zA-Z@_0-9-]*)", lambda m: "'%s' not in __obj" % m.group(1), loc)
+
+    def brackets(elts):
+        return "__obj" + "".join(f"[{e}]" if e.isdigit() else f"['{e}']" for e in elts)
+
+    def varmatch(m):
+        elts = m.group(1).split('.')
+        if elts[-1] == "length":
+            return "len(%s)" % brackets(elts[1:-1])
+        return brackets(elts[1:])
+
+    loc = re.sub(r'(?<!\\)(@\.[a-zA-Z@_.0-9]+)', varmatch, loc)
+    return re.sub(r'(?<!\\)@', "__obj", loc).replace(r'\@', '@')
+
+
+def _split_steps(path: str) -> tuple:
+    return tuple(name or index or quoted for name, index, quoted in SIMPLE_JSONPATH_STEP.findall(path))
+
+
+def _walk_steps(obj: Any, steps: tuple) -> Any:
+    """按步骤逐级取值，规则与 jsonpath 库一致；取不到时返回 _MISSING"""
+    for step in steps:
+        if isinstance(obj, dict):
+            if step not in obj:
+                return _MISSING
+            obj = obj[step]
+        elif isinstance(obj, list) and step.isdigit() and int(step) < len(obj):
+            obj = obj[int(step)]
+        else:
+            return _MISSING
+    return obj
+
+
+class CompiledJsonPath:
+    """
+    编译后的 JSONPath：
+    - 简单路径：按步骤直接取值
+    - 单个过滤表达式路径：过滤条件只翻译、编译一次，逐项 eval 编译好的代码
+    - 其他（通配、递归、切片等）交给 jsonpath 库完整解析
+    返回值与 jsonpath.jsonpath 一致：匹配结果列表，或无匹配时返回 False
+    """
+    __slots__ = ("expr", "steps", "filter_code", "suffix")
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.steps = None
+        self.filter_code = None
+        self.suffix = ()
+        if SIMPLE_JSONPATH_PATTERN.match(expr):
+            self.steps = _split_steps(expr)
+            return
+        match = FILTER_JSONPATH_PATTERN.match(expr)
+        if match:
+            try:
+                self.filter_code = compile(_translate_jsonpath_filter(match.group(2)), "<jsonpath>", "eval")
+            except SyntaxError:
+                return
+            self.steps = _split_steps(match.group(1))
+            self.suffix = _split_steps(match.group(3))
+
+    def find(self, json_obj: Any) -> Union[List[Any], bool]:
+        if self.steps is None or not isinstance(json_obj, (dict, list)):
+            return jsonpath(json_obj, self.expr)
+        if not json_obj:
+            return False
+        current = _walk_steps(json_obj, self.steps)
+        if current is _MISSING:
+            return False
+        if self.filter_code is None:
+            return [current]
+
+        if isinstance(current, list):
+            items = current
+        elif isinstance(current, dict):
+            items = current.values()
+        else:
+            return False
+        result = []
+        for item in items:
+            try:
+                matched = eval(self.filter_code, {}, {"__obj": item})
+            except Exception:
+                matched = False
+            if matched:
+                value = _walk_steps(item, self.suffix)
+                if value is not _MISSING:
+                    result.append(value)
+        return result or False
+
+
+@lru_cache(maxsize=2048)
+def compile_jsonpath(expr: str) -> CompiledJsonPath:
+    return CompiledJsonPath(expr)
+
+
 def extractor(json_obj: Union[Dict, List], json_path: str) -> Any:
     """
     使用jsonpath表达式从json对象中提取数据。
+    json_path 不是字符串时（如 extra 中的常量 "amount_set": 10）原样返回。
     """
+    if not isinstance(json_path, str):
+        return json_path
     try:
-        matches = jsonpath(json_obj, json_path)
+        matches = compile_jsonpath(json_path).find(json_obj)
         if not matches:
             return None
         if len(matches) == 1:
@@ -288,7 +594,8 @@ def convert_json(data: str) -> Any:
         return data
     try:
         obj = json.loads(data)
-        LOGGER.debug(f"convert_json 输入: {data}, 输出: {obj}")
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"convert_json 输入: {data}, 输出: {obj}")
         return obj
     except Exception as e:
         ERROR_LOGGER.error(f"convert_json 错误: {e}")
@@ -1,11 +1,18 @@
 # -*- coding:utf-8 -*-
+import os
+import sys
 import json
+import time
 import yaml
-import pandas as pd
+import marshal
+import hashlib
+import threading
 from pathlib import Path
 import configparser
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterator, List, Dict, Any, Optional, Union
 from src.utils.logger import LOGGER, ERROR_LOGGER
+from src.utils.case_records import ApiCase, UiStep
+from src.utils.data_driven import DataDrivenCase, data_source, configure as configure_data_driven
 from config.settings import ProjectPaths
 
 PROJECT = Path(ProjectPaths.BASE_DIR)
@@ -34,26 +41,12 @@ def is_path(text):
 
 
 def process_json_files_in_path(relative_path):
-    """处理指定路径下的 JSON 文件并合并数据"""
+    """读取数据文件/目录（.json / .jsonl / .csv）中的全部记录，不是数据路径时返回 None"""
+    source = data_source(relative_path)
+    if source is None:
+        return None
     try:
-        absolute_path = PROJECT / relative_path
-        absolute_path = absolute_path.resolve()
-
-        if not absolute_path.exists() or not absolute_path.is_dir():
-            return None
-
-        files = list(absolute_path.glob("*.json"))
-        if not files:
-            return None
-
-        data = []
-        for file in files:
-            try:
-                with file.open('r', encoding='utf-8') as f:
-                    data.extend(json.load(f))
-            except Exception as e:
-                ERROR_LOGGER.error(f"读取 JSON 文件时出错 {file}: {e}")
-        return data
+        return list(source)
     except Exception as e:
         ERROR_LOGGER.error(f"错误处理路径 {relative_path}: {e}")
         return None
@@ -76,19 +69,236 @@ class ReadConf:
 read_conf = ReadConf(ProjectPaths.OBJ_CONFIG)
 
 
+# =========================================================
+# 解析结果磁盘缓存
+# =========================================================
+class CaseCache:
+    """
+    用例文件解析结果的磁盘缓存（read_excel + 换行清理后的行），每个文件一个 marshal 二进制文件：
+    - 键为 文件路径 + 读取方式，记录 mtime、大小、内容摘要与当次解析耗时
+    - mtime 与大小都未变化时直接命中；大小相同但 mtime 变化（如 CI 重新检出）时比较内容摘要，一致仍算命中
+    - 任一不一致即重新解析并覆盖；缓存文件损坏或 Python 版本不同时视为未命中
+    row_processor 不进缓存，每次读取时照常执行（它依赖数据目录等外部文件）。
+    """
+    FORMAT = 1
+
+    def __init__(self, cache_dir, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.parse_time = 0.0   # 未命中时的解析耗时
+        self.load_time = 0.0    # 命中时读取缓存的耗时
+        self.saved_time = 0.0   # 命中时节省的时间（缓存记录的解析耗时 - 读取缓存耗时）
+
+    @classmethod
+    def from_conf(cls, conf: Optional[Dict[str, str]]) -> "CaseCache":
+        conf = conf or {}
+        cache_dir = conf.get("dir") or ProjectPaths.CACHE_FILE / "case_cache"
+        if not Path(cache_dir).is_absolute():
+            cache_dir = PROJECT / cache_dir
+        enabled = str(conf.get("enabled", "true")).strip().lower() != "false"
+        return cls(cache_dir, enabled)
+
+    def _entry_path(self, file_path: Path, variant: str) -> Path:
+        name = hashlib.sha1(f"{file_path}|{variant}".encode("utf-8")).hexdigest()[:24]
+        return self.cache_dir / f"{name}.bin"
+
+    @staticmethod
+    def digest(file_path: Path) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _load_entry(self, entry_path: Path) -> Optional[tuple]:
+        try:
+            with open(entry_path, "rb") as f:
+                entry = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(entry, tuple) or len(entry) != 8 or entry[:2] != (self.FORMAT, sys.version_info[:2]):
+            return None
+        return entry
+
+    def _store_entry(self, entry_path: Path, entry: tuple) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = entry_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                marshal.dump(entry, f)
+            os.replace(tmp, entry_path)
+        except (OSError, ValueError) as e:
+            LOGGER.warning(f"用例缓存写入失败 {entry_path}: {e}")
+
+    def lookup(self, file_path: Path, variant: str, count: bool = True) -> Optional[List[list]]:
+        """返回命中的缓存行，未命中返回 None；count=False 时不计入命中统计（如工作表名称）"""
+        if not self.enabled:
+            return None
+        start = time.perf_counter()
+        stat = file_path.stat()
+        entry_path = self._entry_path(file_path, variant)
+        entry = self._load_entry(entry_path)
+        if entry is None:
+            return None
+        _, _, mtime_ns, size, cached_digest, cached_parse_time, _, rows = entry
+        hit = mtime_ns == stat.st_mtime_ns and size == stat.st_size
+        if not hit and size == stat.st_size:
+            hit = self.digest(file_path) == cached_digest
+            if hit:
+                self._store_entry(entry_path, entry[:2] + (stat.st_mtime_ns,) + entry[3:])
+        if not hit:
+            return None
+        elapsed = time.perf_counter() - start
+        if not count:
+            return rows
+        with self._lock:
+            self.hits += 1
+            self.load_time += elapsed
+            self.saved_time += max(cached_parse_time - elapsed, 0.0)
+        LOGGER.debug(f"用例缓存命中: {file_path} ({len(rows)} 行, {elapsed * 1000:.1f}ms)")
+        return rows
+
+    def store(self, file_path: Path, variant: str, rows: List[list], parse_time: float,
+              stat: os.stat_result = None, count: bool = True) -> None:
+        """写入解析结果；stat 应在解析开始前获取，解析期间文件被修改时下次读取会重新解析"""
+        if not self.enabled:
+            return
+        stat = stat or file_path.stat()
+        self._store_entry(self._entry_path(file_path, variant), (
+            self.FORMAT, sys.version_info[:2], stat.st_mtime_ns, stat.st_size,
+            self.digest(file_path), parse_time, str(file_path), rows
+        ))
+        if not count:
+            return
+        with self._lock:
+            self.misses += 1
+            self.parse_time += parse_time
+
+    def get_or_parse(self, file_path: Path, variant: str, parse: Callable[[], List[list]],
+                     count: bool = True) -> List[list]:
+        """命中时返回缓存的行，否则调用 parse 解析并写入缓存"""
+        rows = self.lookup(file_path, variant, count)
+        if rows is not None:
+            return rows
+        stat = file_path.stat()
+        start = time.perf_counter()
+        rows = parse()
+        self.store(file_path, variant, rows, time.perf_counter() - start, stat, count)
+        return rows
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "parse_time": round(self.parse_time, 3),
+            "load_time": round(self.load_time, 3),
+            "saved_time": round(self.saved_time, 3),
+        }
+
+    def counters(self) -> tuple:
+        return self.hits, self.misses, self.parse_time, self.load_time, self.saved_time
+
+    def merge(self, delta: tuple) -> None:
+        """合并其他进程（并行加载的 worker）中的统计增量"""
+        with self._lock:
+            self.hits += delta[0]
+            self.misses += delta[1]
+            self.parse_time += delta[2]
+            self.load_time += delta[3]
+            self.saved_time += delta[4]
+
+    def log(self) -> None:
+        if self.hits or self.misses:
+            LOGGER.info(f"用例解析缓存统计: {self.summary()}")
+
+    def clear(self) -> None:
+        for entry_path in self.cache_dir.glob("*.bin"):
+            entry_path.unlink(missing_ok=True)
+
+
+CASE_CACHE = CaseCache.from_conf(read_conf.get_dict("case_cache") if read_conf.config.has_section("case_cache") else {})
+# 数据驱动文件：解析后的 .json 数据文件按 LRU 保留 parsed_files 个，一行最多生成 max_items 个测试项
+configure_data_driven(read_conf.get_dict("data_driven") if read_conf.config.has_section("data_driven") else {})
+# [case_reader] backend 为默认读取方式，其余键为文件名 -> 读取方式（pandas / openpyxl）
+READER_CONF = read_conf.get_dict("case_reader") if read_conf.config.has_section("case_reader") else {}
+READER_BACKENDS = ("pandas", "openpyxl")
+
+# pandas.read_excel 默认视为空值的字符串，流式读取按相同规则转为 None
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+
+def cell_text(value) -> Optional[str]:
+    """把 openpyxl 单元格值转换为与 pandas（dtype=str + 去换行）相同的文本"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return None if value in NA_STRINGS else value.replace("\n", "")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
 # =========================================================
 # 通用读取类（支持逐行 yield）
 # =========================================================
 class GenericCaseReader:
-    def __init__(self, file_path, row_processor=None):
+    def __init__(self, file_path, row_processor=None, cache: Optional[CaseCache] = CASE_CACHE, backend: str = None,
+                 sheet: Union[int, str] = 0):
         """
         :param file_path: 用例文件路径
         :param row_processor: 行处理函数，可选；接收参数 (row_list: list, row_index: int)
+        :param cache: Excel/CSV 解析结果缓存，None 表示每次都重新解析
+        :param backend: Excel 读取方式，pandas（整表读入）或 openpyxl（只读模式逐行流式读取）；
+                        未指定时取 [case_reader] 中该文件名的配置，其次为 backend 默认值
+        :param sheet: Excel 工作表序号或名称，默认第一个工作表
         """
         self.file_path = Path(file_path).resolve()
         self.row_processor = row_processor
+        self.cache = cache
+        self.sheet = sheet
         if not self.file_path.exists():
             raise FileNotFoundError(f"文件不存在: {self.file_path}")
+        self.backend = (backend or READER_CONF.get(self.file_path.name) or READER_CONF.get("backend") or "pandas").lower()
+        if self.backend not in READER_BACKENDS:
+            raise ValueError(f"不支持的读取方式: {self.backend}，可选 {READER_BACKENDS}")
+
+    @staticmethod
+    def sheet_names(file_path, cache: Optional[CaseCache] = CASE_CACHE) -> List[str]:
+        """
+        Excel 文件的全部工作表名称；其他格式只有一个“表”，返回空列表。
+        名称与解析结果一样按 mtime / 大小缓存，缓存命中时不打开工作簿（也不导入 openpyxl / pandas）
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() not in (".xlsx", ".xls"):
+            return []
+        if cache is None:
+            return GenericCaseReader._read_sheet_names(file_path)
+        return list(cache.get_or_parse(file_path, "sheets", lambda: GenericCaseReader._read_sheet_names(file_path),
+                                       count=False))
+
+    @staticmethod
+    def _read_sheet_names(file_path: Path) -> List[str]:
+        if file_path.suffix.lower() == ".xlsx":
+            import openpyxl
+            workbook = openpyxl.load_workbook(file_path, read_only=True)
+            try:
+                return list(workbook.sheetnames)
+            finally:
+                workbook.close()
+        import pandas as pd
+        return list(pd.ExcelFile(file_path).sheet_names)
+
+    def _variant(self, name: str) -> str:
+        # 第一个工作表沿用原缓存键，其余工作表单独缓存
+        return name if self.sheet in (0, None) else f"{name}:{self.sheet}"
 
     def read(self):
         """按文件类型读取，并逐行 yield"""
@@ -113,24 +323,70 @@ class GenericCaseReader:
             yield json.load(f)
 
     def _read_excel(self):
-        df = pd.read_excel(self.file_path, header=None, dtype=str)  # 一行一个 list
-        df = df.replace('\n', '', regex=True).replace(pd.NA, None)
-        for idx, row in enumerate(df.itertuples(index=False, name=None)):
-            if idx == 0:  # 跳过第一行表头
-                continue
-            row_list = list(row)
-            if self.row_processor:
-                processed = self.row_processor(row_list, idx)
-                if processed is None:
-                    continue
-                yield processed
-            else:
-                yield row_list
+        if self.backend == "openpyxl":
+            # 流式读取不写解析缓存：写缓存需要收集全部行，内存不再只保留当前行
+            yield from self._yield_rows(self._stream_excel())
+        else:
+            yield from self._yield_rows(self._cached_rows(self._variant("excel"), self._parse_excel))
 
     def _read_csv(self):
+        yield from self._yield_rows(self._cached_rows("csv", self._parse_csv))
+
+    def _cached_rows(self, variant: str, parse: Callable[[], List[list]]) -> List[list]:
+        if self.cache is None:
+            return parse()
+        return self.cache.get_or_parse(self.file_path, variant, parse)
+
+    def _stream_excel(self) -> Iterator[list]:
+        """
+        openpyxl 只读模式逐行解析指定工作表（含表头），内存中只保留当前行。
+        单元格取值与 pandas 后端一致：转文本、去换行、空值为 None，末尾空行忽略。
+        行宽与 pandas 不同：pandas 按整表最大列数补齐，流式读取无法预知后续行，只按表头列数补齐、
+        超出表头的行保留原宽度；行处理函数（ApiCase / UiStep / 用例目录）按位置取值，短行缺少的列视为 None。
+        """
+        import openpyxl
+        workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[self.sheet] if isinstance(self.sheet, str) else workbook.worksheets[self.sheet]
+            # 部分工具生成的文件 dimension 不准确，按实际单元格读取
+            sheet.reset_dimensions()
+            width, blank_rows = None, 0
+            for values in sheet.iter_rows(values_only=True):
+                row = [cell_text(v) for v in values]
+                while row and row[-1] is None:
+                    row.pop()
+                if not row:
+                    blank_rows += 1
+                    continue
+                if width is None:
+                    width = len(row)  # 第一个非空行为表头
+                for _ in range(blank_rows):
+                    yield [None] * width
+                blank_rows = 0
+                yield row + [None] * (width - len(row))
+        finally:
+            workbook.close()
+
+    # pandas 只在缓存未命中、需要解析文件时导入（导入耗时约 0.3s）
+    def _parse_excel(self) -> List[list]:
+        import pandas as pd
+        df = pd.read_excel(self.file_path, sheet_name=self.sheet, header=None, dtype=str)  # 一行一个 list
+        return self._clean(df)
+
+    def _parse_csv(self) -> List[list]:
+        import pandas as pd
         df = pd.read_csv(self.file_path, header=None, dtype=str)
+        return self._clean(df)
+
+    @staticmethod
+    def _clean(df) -> List[list]:
+        """去掉单元格中的换行、空值转为 None，返回包含表头的全部行"""
+        import pandas as pd
         df = df.replace('\n', '', regex=True).replace(pd.NA, None)
-        for idx, row in enumerate(df.itertuples(index=False, name=None)):
+        return [list(row) for row in df.itertuples(index=False, name=None)]
+
+    def _yield_rows(self, rows: List[list]):
+        for idx, row in enumerate(rows):
             if idx == 0:  # 跳过第一行表头
                 continue
             row_list = list(row)
@@ -146,44 +402,37 @@ class GenericCaseReader:
 # =========================================================
 # 行处理器实现（针对 Excel/CSV 的一行 list）
 # =========================================================
-def process_api_row(row_list: List[Any], idx: int) -> Optional[List[Any]]:
-    """处理 API 用例行（row_list 是一个 list）"""
+def process_api_row(row_list: List[Any], idx: int) -> Optional[ApiCase]:
+    """处理 API 用例行（row_list 是一个 list），返回 ApiCase，JSON 列在此解析并校验"""
     try:
         # 第5列是 skip
         skip_val = str(row_list[4]).strip().upper() if len(row_list) > 4 else ""
         if skip_val == "Y":
             return None
 
-        # 第10列是 data
-        if len(row_list) > 9:
-            data_field = row_list[9]
-            if data_field and not is_json(data_field) and is_path(data_field):
-                json_data = process_json_files_in_path(data_field)
-                if json_data:
-                    # 这里可对 json_data 做特殊处理
-                    pass
+        # 第10列是 data：数据文件/目录时按记录展开（收集钩子逐条生成测试项，见 data_driven）
+        source = data_source(row_list[9]) if len(row_list) > 9 else None
+        if source is not None:
+            if not len(source):
+                LOGGER.warning(f"第 {idx} 行数据驱动文件没有记录，跳过: {source.text}")
+                return None
+            return DataDrivenCase.from_row(row_list, idx, source=source)
 
-        return row_list
+        return ApiCase.from_row(row_list, idx)
     except Exception as e:
         ERROR_LOGGER.error(f"处理第 {idx} 行 API 用例出错: {e}")
         return None
 
 
-def process_ui_row(row_list: List[Any], idx: int) -> Dict[str, Any]:
-    """处理 UI 用例行（row_list 是一个 list）"""
+def process_ui_row(row_list: List[Any], idx: int) -> Union[UiStep, Dict[str, Any]]:
+    """处理 UI 用例行（row_list 是一个 list），返回 UiStep；跳过的行返回空字典"""
     try:
         # 第5列是 skip
         skip_val = str(row_list[4]).strip().upper() if len(row_list) > 4 else ""
         if skip_val == "Y":
             return {}
 
-        keys = [
-            "case_module", "case_submodule", "case_name", "case_title", "skip", "by",
-            "finder", "action", "value", "deposit", "retrieve", "expected",
-            "sliding_location", "wait"
-        ]
-
-        return dict(zip(keys, row_list))
+        return UiStep(*row_list)
     except Exception as e:
         ERROR_LOGGER.error(f"处理第 {idx} 行 UI 用例出错: {e}")
         return {}
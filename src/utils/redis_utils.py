@@ -1,32 +1,164 @@
-import redis
+import time
+import asyncio
+import weakref
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, NamedTuple
 from src.utils.logger import LOGGER
 from src.utils.read_test_cases import read_conf
 
-d = read_conf.get_dict("redis")
+if TYPE_CHECKING:
+    import redis
+    import redis.asyncio as aioredis
 
-def redis_connect():
-    return redis.Redis(
+GLOB_CHARS = "*?["
+DEFAULT_SCAN_COUNT = 500
+
+_pool = None
+_pool_lock = threading.Lock()
+# redis.asyncio 的连接绑定事件循环，每个事件循环各自一个连接池
+_async_pools = weakref.WeakKeyDictionary()
+
+
+# ===================================================
+# redis 客户端与 [redis] 配置在第一次连接时才加载，导入本模块不读取配置、不导入 redis
+# ===================================================
+@lru_cache(maxsize=None)
+def redis_conf() -> Dict[str, str]:
+    return read_conf.get_dict("redis")
+
+def scan_count() -> int:
+    return int(redis_conf().get("scan_count") or DEFAULT_SCAN_COUNT)
+
+def __getattr__(name: str):
+    # 兼容原模块级变量 d / SCAN_COUNT
+    if name == "d":
+        return redis_conf()
+    if name == "SCAN_COUNT":
+        return scan_count()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _pool_kwargs() -> dict:
+    d = redis_conf()
+    return dict(
         host=d["host"],
         port=int(d["port"]),
         db=d["db"],
         password=d["password"],
-        decode_responses=True
+        decode_responses=True,
+        max_connections=int(d.get("max_connections") or 20),
     )
 
-def clear_cache(text: str):
+def get_pool() -> "redis.ConnectionPool":
+    """进程内共用的连接池"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import redis
+                _pool = redis.ConnectionPool(**_pool_kwargs())
+    return _pool
+
+def redis_connect() -> "redis.Redis":
+    import redis
+    return redis.Redis(connection_pool=get_pool())
+
+def get_async_pool() -> "aioredis.ConnectionPool":
+    import redis.asyncio as aioredis
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        pool = _async_pools[loop] = aioredis.ConnectionPool(**_pool_kwargs())
+    return pool
+
+def async_redis_connect() -> "aioredis.Redis":
+    import redis.asyncio as aioredis
+    return aioredis.Redis(connection_pool=get_async_pool())
+
+
+class ClearResult(NamedTuple):
+    """清理结果：删除的 key 数、耗时；布尔值表示是否成功，与原先返回 True/False 兼容"""
+    removed: int
+    elapsed: float
+    success: bool = True
+
+    def __bool__(self):
+        return self.success
+
+
+def key_exists(key: str, r: "redis.Redis" = None) -> bool:
+    """
+    判断 key 是否存在，包含 * ? [ 通配符时按模式扫描
+    """
+    r = r or redis_connect()
+    if any(c in key for c in GLOB_CHARS):
+        return next(r.scan_iter(match=key, count=scan_count()), None) is not None
+    return bool(r.exists(key))
+
+def _unlink_batch(r: "redis.Redis", keys: List[str]) -> int:
+    """一次流水线提交一批 UNLINK（后台释放内存，不阻塞服务端）"""
+    pipe = r.pipeline(transaction=False)
+    for k in keys:
+        pipe.unlink(k)
+    return sum(pipe.execute())
+
+def clear_cache(text: str, batch_size: int = None) -> ClearResult:
     """
-    清理 Redis 中的指定缓存
+    清理 Redis 中的指定缓存：
+    - 不含通配符时直接 UNLINK
+    - 含通配符时用 SCAN 增量遍历（代替阻塞服务端的 KEYS），每 batch_size 个 key 流水线 UNLINK 一次
     """
+    start = time.perf_counter()
+    batch_size = batch_size or scan_count()
     try:
         r = redis_connect()
-        keys = r.keys(f"{text}")
-        LOGGER.info(f"[Redis] 查询到缓存数据 {keys} ")
-        for k in keys:
-            r.delete(k)
-        if keys:
-            LOGGER.info(f"[Redis] 已清理 {len(keys)} 条 {text} 缓存")
-        return True
+        if not any(c in text for c in GLOB_CHARS):
+            removed = r.unlink(text)
+        else:
+            removed, batch = 0, []
+            for k in r.scan_iter(match=text, count=batch_size):
+                batch.append(k)
+                if len(batch) >= batch_size:
+                    removed += _unlink_batch(r, batch)
+                    batch = []
+            if batch:
+                removed += _unlink_batch(r, batch)
+        elapsed = time.perf_counter() - start
+        if removed:
+            LOGGER.info(f"[Redis] 已清理 {removed} 条 {text} 缓存，耗时 {elapsed * 1000:.1f}ms")
+        return ClearResult(removed, elapsed)
+    except Exception as e:
+        LOGGER.error(f"[Redis] 清理缓存失败: {e}")
+        return ClearResult(0, time.perf_counter() - start, False)
+
+async def aclear_cache(text: str, batch_size: int = None) -> ClearResult:
+    """clear_cache 的异步版本，供 asyncio 并发执行器使用"""
+    start = time.perf_counter()
+    batch_size = batch_size or scan_count()
+    try:
+        r = async_redis_connect()
+        if not any(c in text for c in GLOB_CHARS):
+            removed = await r.unlink(text)
+        else:
+            removed, batch = 0, []
+            async for k in r.scan_iter(match=text, count=batch_size):
+                batch.append(k)
+                if len(batch) >= batch_size:
+                    removed += await _aunlink_batch(r, batch)
+                    batch = []
+            if batch:
+                removed += await _aunlink_batch(r, batch)
+        elapsed = time.perf_counter() - start
+        if removed:
+            LOGGER.info(f"[Redis] 已清理 {removed} 条 {text} 缓存，耗时 {elapsed * 1000:.1f}ms")
+        return ClearResult(removed, elapsed)
     except Exception as e:
         LOGGER.error(f"[Redis] 清理缓存失败: {e}")
-        return False
+        return ClearResult(0, time.perf_counter() - start, False)
 
+async def _aunlink_batch(r: "aioredis.Redis", keys: List[str]) -> int:
+    async with r.pipeline(transaction=False) as pipe:
+        for k in keys:
+            pipe.unlink(k)
+        return sum(await pipe.execute())
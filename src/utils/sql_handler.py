@@ -1,54 +1,668 @@
+import re
+import time
 import sqlite3
+import threading
+from decimal import Decimal
 import pymysql
-from typing import Any, List, Optional, Dict, Union
+from pymysql.constants import CLIENT
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict, Tuple, Union
+from src.utils.platform_utils import VAR_PATTERN, rep_expr
+from src.utils.sql_metrics import SQL_METRICS
 from src.utils.logger import LOGGER, ERROR_LOGGER
 
 
+# =========================================================
+# 连接池
+# =========================================================
+class ConnectionPool:
+    """
+    单个数据库（db_key）的连接池：
+    - max_size: 最大连接数，全部借出时等待 checkout_timeout 秒后抛出 TimeoutError
+    - idle_timeout: 空闲超过该时长的连接被关闭回收
+    - ping_idle: 借出前若空闲超过该时长则先做健康检查，失败时重建连接
+    归还时执行 rollback：结束只读快照，未提交的写入与原先“用完即关闭”时一样被丢弃。
+    """
+
+    def __init__(self, name: str, connect: Callable[[], Any], ping: Callable[[Any], None],
+                 max_size: int = 5, idle_timeout: float = 300, checkout_timeout: float = 10,
+                 ping_idle: float = 5):
+        self.name = name
+        self._connect = connect
+        self._ping = ping
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = float(idle_timeout)
+        self.checkout_timeout = float(checkout_timeout)
+        self.ping_idle = float(ping_idle)
+
+        self._idle = deque()          # (conn, last_used)，右端为最近归还的连接
+        self._size = 0                # 已创建且未关闭的连接数（空闲 + 借出）
+        self._checked_out: Dict[int, float] = {}
+        self._cond = threading.Condition()
+
+        # 指标
+        self.created = 0
+        self.checkouts = 0
+        self.evicted = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+
+    @staticmethod
+    def from_conf(name: str, db_conf: Dict[str, Any], connect, ping) -> "ConnectionPool":
+        """读取 db 配置中可选的 pool_size / pool_idle_timeout / pool_checkout_timeout / pool_ping_idle"""
+        return ConnectionPool(
+            name, connect, ping,
+            max_size=int(db_conf.get("pool_size") or 5),
+            idle_timeout=float(db_conf.get("pool_idle_timeout") or 300),
+            checkout_timeout=float(db_conf.get("pool_checkout_timeout") or 10),
+            ping_idle=float(db_conf.get("pool_ping_idle") or 5),
+        )
+
+    def _close_quietly(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _evict_idle_locked(self) -> None:
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._close_quietly(conn)
+            self._size -= 1
+            self.evicted += 1
+
+    def _discard(self, conn=None) -> None:
+        if conn is not None:
+            self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def acquire(self):
+        start = time.perf_counter()
+        deadline = start + self.checkout_timeout
+        with self._cond:
+            while True:
+                self._evict_idle_locked()
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise TimeoutError(f"数据库连接池 {self.name} 已满({self.max_size})，等待 {self.checkout_timeout}s 超时")
+                self._cond.wait(remaining)
+
+        # 建连 / 健康检查在锁外进行
+        try:
+            if conn is not None and time.monotonic() - last_used > self.ping_idle:
+                try:
+                    self._ping(conn)
+                except Exception as e:
+                    LOGGER.warning(f"数据库连接池 {self.name} 健康检查失败，重建连接: {e}")
+                    self.ping_failures += 1
+                    self._close_quietly(conn)
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+                self.created += 1
+        except Exception:
+            self._discard()
+            raise
+
+        waited = time.perf_counter() - start
+        with self._cond:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._checked_out[id(conn)] = time.perf_counter()
+        return conn
+
+    def release(self, conn, broken: bool = False) -> None:
+        if not broken:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        with self._cond:
+            checkout_at = self._checked_out.pop(id(conn), None)
+            if checkout_at is not None:
+                self.hold_total += time.perf_counter() - checkout_at
+        if broken:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self) -> None:
+        """关闭全部空闲连接；借出中的连接在归还后仍可继续使用"""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._close_quietly(conn)
+                self._size -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "name": self.name,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._checked_out),
+                "max_size": self.max_size,
+                "created": self.created,
+                "checkouts": self.checkouts,
+                "evicted": self.evicted,
+                "ping_failures": self.ping_failures,
+                "timeouts": self.timeouts,
+                "wait_total": round(self.wait_total, 4),
+                "wait_max": round(self.wait_max, 4),
+                "avg_wait": round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "avg_checkout": round(self.hold_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+
+# =========================================================
+# 查询结果缓存
+# =========================================================
+_QUOTED_OR_SPACE = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")|\s+")
+_READ_TABLES = re.compile(r"\b(?:from|join)\s+([`\"\w.]+)", re.I)
+_WRITE_TABLE = re.compile(
+    r"^\s*(?:insert\s+(?:ignore\s+)?into|replace\s+into|update|delete\s+from|truncate(?:\s+table)?|"
+    r"alter\s+table|drop\s+table(?:\s+if\s+exists)?|create\s+table(?:\s+if\s+not\s+exists)?)\s+([`\"\w.]+)",
+    re.I
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """折叠引号外的空白、去掉结尾分号，作为缓存键"""
+    return _QUOTED_OR_SPACE.sub(lambda m: m.group(1) or " ", sql).strip().rstrip(";").strip()
+
+
+def _table_name(raw: str) -> str:
+    return raw.strip('`"').split(".")[-1].strip('`"').lower()
+
+
+def read_tables(sql: str) -> set:
+    return {_table_name(t) for t in _READ_TABLES.findall(sql)}
+
+
+def write_table(sql: str) -> Optional[str]:
+    """写语句返回目标表名，读语句返回 None"""
+    match = _WRITE_TABLE.match(sql)
+    return _table_name(match.group(1)) if match else None
+
+
+class QueryCache:
+    """
+    单次运行内的查询结果缓存（仅用于 extra 中以 sql_cache 显式开启的查询）：
+    - 键为 (数据库, 规范化后的 SQL, 参数)
+    - 每条记录带 TTL；同一次运行中对某张表执行写语句时，涉及该表的缓存全部失效
+    - 空结果不缓存，避免把“数据尚未生成”固定下来
+    """
+
+    def __init__(self):
+        self._entries: Dict[tuple, tuple] = {}      # key -> (rows, expires_at)
+        self._by_table: Dict[tuple, set] = {}       # (数据库, 表) -> {key}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(db_name: str, sql: str, params=None) -> tuple:
+        return db_name, normalize_sql(sql), tuple(params) if params else None
+
+    def get(self, db_name: str, sql: str, params=None):
+        """返回 (是否命中, 结果)"""
+        key = self._key(db_name, sql, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._drop(key)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, db_name: str, sql: str, rows, ttl: float, params=None) -> None:
+        if not rows or ttl <= 0:
+            return
+        key = self._key(db_name, sql, params)
+        with self._lock:
+            self._entries[key] = (rows, time.monotonic() + ttl)
+            for table in read_tables(key[1]):
+                self._by_table.setdefault((db_name, table), set()).add(key)
+
+    def _drop(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+        for keys in self._by_table.values():
+            keys.discard(key)
+
+    def invalidate(self, db_name: str, sql: str) -> None:
+        """sql 为写语句时，清除同一数据库中涉及目标表的缓存"""
+        table = write_table(sql)
+        if table is None:
+            return
+        with self._lock:
+            keys = self._by_table.pop((db_name, table), set())
+            for key in keys:
+                self._drop(key)
+            if keys:
+                self.invalidations += len(keys)
+                LOGGER.debug(f"写入 {table}，清除 {len(keys)} 条查询缓存")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+            }
+
+
+QUERY_CACHE = QueryCache()
+
+
+# =========================================================
+# ${var} → 占位符
+# =========================================================
+# 单引号与双引号字符串字面量（MySQL 默认把 "..." 视为字符串）
+_SQL_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+PLACEHOLDERS = {"qmark": "?", "format": "%s"}
+# 小数按 Decimal 绑定以保留全部位数；sqlite3 不支持 Decimal，按原文本绑定（与数值列比较时按列亲和性转换）
+sqlite3.register_adapter(Decimal, str)
+
+
+class CompiledSQL:
+    """
+    预编译的 SQL 模板：
+    - '${var}' / "${var}"（整个字符串字面量）→ 占位符，按字符串绑定
+    - 值位置上的裸 ${var} → 占位符，仅当取值为数字时绑定（小数为 Decimal），其余退回文本替换
+    - 出现在字面量内部（如 LIKE '%${kw}%'）或标识符中（如 t_${suffix}）的变量无法参数化，整条语句退回文本替换
+    """
+    __slots__ = ("text", "sql", "params", "parameterizable")
+
+    def __init__(self, text: str, paramstyle: str):
+        self.text = text
+        self.params: List[Tuple[str, bool]] = []   # (变量名, 是否带引号)
+        self.parameterizable = True
+        placeholder = PLACEHOLDERS[paramstyle]
+        literals = [m.span() for m in _SQL_LITERAL.finditer(text)]
+        parts, pos = [], 0
+
+        def plain(fragment: str) -> str:
+            # pymysql 绑定参数时按 % 格式化，原文中的 % 需要转义
+            return fragment.replace("%", "%%") if paramstyle == "format" else fragment
+
+        for match in VAR_PATTERN.finditer(text):
+            start, end = match.span()
+            literal = next((span for span in literals if span[0] < start and end < span[1]), None)
+            if literal is not None:
+                if literal != (start - 1, end + 1):
+                    self.parameterizable = False
+                    break
+                parts.append(plain(text[pos:start - 1]))
+                parts.append(placeholder)
+                self.params.append((match.group(1), True))
+                pos = end + 1
+                continue
+            before = text[start - 1] if start else " "
+            after = text[end] if end < len(text) else " "
+            if before.isalnum() or before in "_.`" or after.isalnum() or after in "_.`":
+                self.parameterizable = False
+                break
+            parts.append(plain(text[pos:start]))
+            parts.append(placeholder)
+            self.params.append((match.group(1), False))
+            pos = end
+        parts.append(plain(text[pos:]))
+        self.sql = "".join(parts) if self.parameterizable and self.params else text
+
+    def bind(self, extra_pool: Dict[str, Any]) -> Optional[tuple]:
+        """返回绑定参数；存在缺失变量或裸变量不是数字时返回 None"""
+        values = []
+        for name, quoted in self.params:
+            if name not in extra_pool:
+                return None
+            value = extra_pool[name]
+            if quoted:
+                values.append(str(value))
+            elif isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                return None
+            elif isinstance(value, str):
+                # 与文本替换保持一致：裸变量按数字比较
+                text = value.strip()
+                if not _NUMBER.fullmatch(text):
+                    return None
+                values.append(Decimal(text) if "." in text else int(text))
+            else:
+                values.append(value)
+        return tuple(values)
+
+
+@lru_cache(maxsize=2048)
+def compile_sql(text: str, paramstyle: str) -> CompiledSQL:
+    return CompiledSQL(text, paramstyle)
+
+
+# =========================================================
+# 流式读取与聚合
+# =========================================================
+STREAM_CHUNK_SIZE = 1000
+
+
+class Aggregation:
+    """
+    sql 列语句前缀对应的流式聚合，结果不在内存中保留全部行：
+    - @count SELECT ...         行数，结果 [(n,)]
+    - @sum SELECT amount ...    第 1 列求和（None 忽略），@sum(2) 对第 3 列求和（列下标从 0 开始），结果 [(total,)]
+    - @limit(N) SELECT ...      前 N 行（N 为行数），SELECT / WITH 语句追加 LIMIT N 交给数据库截断；
+                                其他语句只在客户端读够即停，MySQL 非缓冲游标关闭时仍会读完剩余结果
+    旧写法 @first(N) 与 @limit(N) 相同，解析时记录告警。
+    """
+    _PREFIX = re.compile(r"^@(count|sum|limit|first)(?:\((\d+)\))?\s+", re.I)
+    _LIMITABLE = re.compile(r"^\s*(select|with)\b", re.I)
+    _HAS_LIMIT = re.compile(r"\blimit\b", re.I)
+
+    def __init__(self, op: str, arg: Optional[int] = None):
+        self.op = op.lower()
+        if self.op == "first":
+            self.op = "limit"
+        self.arg = arg
+
+    @classmethod
+    def parse(cls, statement: str) -> Tuple[Optional["Aggregation"], str]:
+        """拆出语句前缀，返回 (聚合, 去掉前缀的 SQL)；无前缀时聚合为 None"""
+        match = cls._PREFIX.match(statement)
+        if not match:
+            return None, statement
+        if match.group(1).lower() == "first":
+            LOGGER.warning(f"@first(N) 已更名为 @limit(N)，请修改语句: {statement}")
+        arg = int(match.group(2)) if match.group(2) else None
+        return cls(match.group(1), arg), statement[match.end():]
+
+    def statement(self, sql: str) -> str:
+        """
+        @limit(N) 的 SELECT / WITH 语句追加 LIMIT N，由数据库只返回 N 行；其他聚合原样返回。
+        语句自带 LIMIT 时包一层子查询（MySQL 派生表中的 ORDER BY 只在带 LIMIT 时保证生效，因此不包无 LIMIT 的语句）。
+        """
+        if self.op != "limit" or not self._LIMITABLE.match(sql):
+            return sql
+        sql = sql.strip().rstrip(";").rstrip()
+        if self._HAS_LIMIT.search(sql):
+            return f"SELECT * FROM ({sql}) AS _limited LIMIT {self.limit}"
+        return f"{sql} LIMIT {self.limit}"
+
+    def chunk_size(self, default: int = STREAM_CHUNK_SIZE) -> int:
+        if self.op == "limit":
+            return max(1, min(default, self.limit))
+        return default
+
+    @property
+    def limit(self) -> int:
+        return 1 if self.arg is None else self.arg
+
+    def initial(self):
+        return [] if self.op == "limit" else 0
+
+    def step(self, acc, chunk: List[tuple]) -> Tuple[Any, bool]:
+        """累加一批行，返回 (新累计值, 是否可以停止读取)"""
+        if self.op == "count":
+            return acc + len(chunk), False
+        if self.op == "sum":
+            col = self.arg or 0
+            return acc + sum(row[col] for row in chunk if row[col] is not None), False
+        acc.extend(chunk[:self.limit - len(acc)])
+        return acc, len(acc) >= self.limit
+
+    def finish(self, acc) -> List[tuple]:
+        return list(acc) if self.op == "limit" else [(acc,)]
+
+    def fold(self, chunks: Iterable[List[tuple]]) -> List[tuple]:
+        acc = self.initial()
+        for chunk in chunks:
+            acc, done = self.step(acc, chunk)
+            if done:
+                break
+        return self.finish(acc)
+
+    def __repr__(self) -> str:
+        return f"@{self.op}" + (f"({self.arg})" if self.arg is not None else "")
+
+
+# =========================================================
+# Handler
+# =========================================================
 class BaseSQLHandler:
     """SQL Handler 抽象基类"""
+    conn = None
+    pool: Optional[ConnectionPool] = None
+    name = ""  # 数据库标识，用于查询缓存
+    db_key = ""  # object_conf.ini 中的配置节，用于耗时统计
+    paramstyle = "format"
+
+    def _timed(self, sql: str, op: str):
+        """计时一次数据库操作，按 db_key（未设置时为数据库标识）与规范化语句汇总"""
+        return SQL_METRICS.timer(self.db_key or self.name, sql, op)
+
+    @contextmanager
+    def _connection(self):
+        """有连接池时每次操作借出一个连接，否则使用自身持有的连接"""
+        if self.pool is None:
+            yield self.conn
+            return
+        with self._borrow(self.pool) as conn:
+            yield conn
+
+    @staticmethod
+    @contextmanager
+    def _borrow(pool: ConnectionPool):
+        """从指定连接池借出一个连接，连接异常时归还为损坏连接"""
+        conn = pool.acquire()
+        broken = False
+        try:
+            yield conn
+        except (sqlite3.OperationalError, pymysql.OperationalError, pymysql.InterfaceError):
+            broken = True
+            raise
+        finally:
+            pool.release(conn, broken=broken)
+
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> List[tuple]:
         raise NotImplementedError
 
-    def fetchone(self, sql: str) -> Any:
+    def fetchone(self, sql: str, params: Optional[tuple] = None) -> Any:
         raise NotImplementedError
 
     def fetchall(self, sql: str) -> List[Any]:
         raise NotImplementedError
 
+    def execute_batch(self, statements: List[str], params: Optional[List[Optional[tuple]]] = None) -> List[List[tuple]]:
+        """依次执行多条语句，返回每条语句的全部结果行；子类可改为一次往返"""
+        params = params or [None] * len(statements)
+        return [self.execute_query(stmt, args) for stmt, args in zip(statements, params)]
+
+    def _stream_cursor(self, conn):
+        """流式读取使用的游标，子类可改为服务端/非缓冲游标"""
+        return conn.cursor()
+
+    def iter_chunks(self, sql: str, params: Optional[tuple] = None,
+                    chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[tuple]]:
+        """
+        按 chunk_size 分批产出结果行，内存中只保留当前一批。
+        迭代期间占用一个连接，应读完或显式 close() 生成器以归还连接。
+        """
+        with self._connection() as conn:
+            cursor = self._stream_cursor(conn)
+            try:
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+
+    def iter_rows(self, sql: str, params: Optional[tuple] = None,
+                  chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[tuple]:
+        for chunk in self.iter_chunks(sql, params, chunk_size):
+            yield from chunk
+
+    def aggregate(self, sql: str, aggregation: Aggregation, params: Optional[tuple] = None,
+                  chunk_size: int = STREAM_CHUNK_SIZE) -> List[tuple]:
+        """流式执行查询并聚合（count / sum / limit-N），失败时与 execute_query 一样返回 []"""
+        sql = aggregation.statement(sql)
+        chunks = self.iter_chunks(sql, params, aggregation.chunk_size(chunk_size))
+        try:
+            with self._timed(sql, f"aggregate {aggregation}"):
+                results = aggregation.fold(chunks)
+            LOGGER.debug(f"{self.name} 流式聚合 {aggregation} 成功: {sql}, 结果: {results[:5]}")
+            return results
+        except Exception as e:
+            ERROR_LOGGER.error(f"{self.name} 流式聚合 {aggregation} 失败: {e} | SQL: {sql}")
+            return []
+        finally:
+            chunks.close()
+
+    def prepare(self, template: str, extra_pool: Dict[str, Any]) -> Tuple[str, Optional[tuple]]:
+        """
+        把含 ${var} 的 SQL 模板转换为 (带占位符的 SQL, 绑定参数)。
+        同一模板只编译一次，不同取值生成相同的语句文本；无法参数化时退回 rep_expr 文本替换，参数为 None。
+        """
+        compiled = compile_sql(template, self.paramstyle)
+        if compiled.parameterizable and compiled.params:
+            params = compiled.bind(extra_pool)
+            if params is not None:
+                return compiled.sql, params
+        return rep_expr(template, extra_pool), None
+
+    def _invalidate(self, sql: str) -> None:
+        QUERY_CACHE.invalidate(self.name, sql)
+
+    def cached_query(self, sql: str, ttl: float, params: Optional[tuple] = None) -> List[tuple]:
+        """带缓存的 execute_query，写语句不缓存"""
+        if write_table(sql) is not None:
+            return self.execute_query(sql, params)
+        hit, rows = QUERY_CACHE.get(self.name, sql, params)
+        if hit:
+            LOGGER.debug(f"查询缓存命中: {sql}")
+            return rows
+        rows = self.execute_query(sql, params)
+        QUERY_CACHE.put(self.name, sql, rows, ttl, params)
+        return rows
+
+    def cached_batch(self, statements: List[str], ttl: float,
+                     params: Optional[List[Optional[tuple]]] = None) -> List[List[tuple]]:
+        """命中缓存的语句直接返回，其余语句一次批量执行；包含写语句时整体不走缓存以保证顺序语义"""
+        params = params or [None] * len(statements)
+        if any(write_table(stmt) is not None for stmt in statements):
+            return self.execute_batch(statements, params)
+        results: List[Any] = [None] * len(statements)
+        misses = []
+        for index, stmt in enumerate(statements):
+            hit, rows = QUERY_CACHE.get(self.name, stmt, params[index])
+            if hit:
+                results[index] = rows
+            else:
+                misses.append(index)
+        if misses:
+            fetched = self.execute_batch([statements[i] for i in misses], [params[i] for i in misses])
+            for index, rows in zip(misses, fetched):
+                results[index] = rows
+                QUERY_CACHE.put(self.name, statements[index], rows, ttl, params[index])
+        return results
+
     def close(self):
         raise NotImplementedError
 
 
+def split_statements(sql: str) -> List[str]:
+    """按 ; 拆分 sql 列，忽略空语句"""
+    return [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+
 class SQLiteHandler(BaseSQLHandler):
     """SQLite 数据库处理"""
-    def __init__(self, db_path: str):
+    paramstyle = "qmark"
+    def __init__(self, db_path: str, pool: ConnectionPool = None):
+        self.db_path = db_path
+        self.pool = pool
+        self.name = f"sqlite:{db_path}"
+        if pool is not None:
+            return
         try:
             LOGGER.info(f"连接 SQLite 数据库: {db_path}")
-            self.conn = sqlite3.connect(db_path, timeout=5)
+            self.conn = self.connect(db_path)
             LOGGER.info("SQLite 连接成功")
         except Exception as e:
             ERROR_LOGGER.error(f"连接 SQLite 数据库失败: {e}")
             raise
 
+    @staticmethod
+    def connect(db_path: str, check_same_thread: bool = True):
+        # 参数化后语句文本稳定，sqlite3 按连接缓存已编译的语句
+        return sqlite3.connect(db_path, timeout=5, check_same_thread=check_same_thread, cached_statements=256)
+
+    @staticmethod
+    def ping(conn) -> None:
+        conn.execute("SELECT 1")
+
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> List[tuple]:
         try:
-            cursor = self.conn.cursor()
-            if params:
-                cursor.execute(sql, params)
-            else:
-                cursor.execute(sql)
-            results = cursor.fetchall()
+            with self._timed(sql, "execute_query"), self._connection() as conn:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                self._invalidate(sql)
+                results = cursor.fetchall()
             LOGGER.debug(f"SQLite 执行 SQL 成功: {sql}, 返回 {len(results)} 条数据")
             return results
         except Exception as e:
             ERROR_LOGGER.error(f"SQLite 执行 SQL 失败: {e} | SQL: {sql}")
             return []
 
-    def fetchone(self, sql: str) -> Any:
+    def fetchone(self, sql: str, params: Optional[tuple] = None) -> Any:
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(sql)
-            result = cursor.fetchone()
+            with self._timed(sql, "fetchone"), self._connection() as conn:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                self._invalidate(sql)
+                result = cursor.fetchone()
             LOGGER.debug(f"SQLite fetchone 成功: {sql}, 结果: {result}")
             return result
         except Exception as e:
@@ -58,50 +672,101 @@ class SQLiteHandler(BaseSQLHandler):
     def fetchall(self, sql: str) -> List[Any]:
         return self.execute_query(sql)
 
+    def execute_batch(self, statements: List[str], params: Optional[List[Optional[tuple]]] = None) -> List[List[tuple]]:
+        """
+        SQLite 为进程内数据库，没有网络往返；批量模式下全部语句只借出一次连接、复用同一游标。
+        不使用 executescript：它会先提交事务且不返回查询结果。
+        """
+        results = []
+        params = params or [None] * len(statements)
+        with self._timed(";\n".join(statements), "execute_batch"), self._connection() as conn:
+            cursor = conn.cursor()
+            for stmt, args in zip(statements, params):
+                if args:
+                    cursor.execute(stmt, args)
+                else:
+                    cursor.execute(stmt)
+                self._invalidate(stmt)
+                results.append(cursor.fetchall())
+        LOGGER.debug(f"SQLite 批量执行 {len(statements)} 条 SQL 成功")
+        return results
+
     def close(self):
-        if self.conn:
+        # 连接池模式下连接由池统一管理
+        if self.pool is None and self.conn:
             self.conn.close()
             LOGGER.info("SQLite 连接已关闭")
 
 
 class MySQLHandler(BaseSQLHandler):
-    """MySQL 数据库处理"""
-    def __init__(self, host: str, port: int, user: str, password: str, db: str):
+    """
+    MySQL 数据库处理。
+    普通连接不开启多语句；execute_batch 使用单独的 batch_pool（CLIENT.MULTI_STATEMENTS），
+    避免退回文本替换的 ${var} 取值中的 ; 在其他查询中被当作下一条语句执行。
+    """
+    def __init__(self, host: str, port: int, user: str, password: str, db: str, pool: ConnectionPool = None,
+                 batch_pool: ConnectionPool = None):
+        self.pool = pool
+        self.batch_pool = batch_pool
+        self.name = f"mysql:{host}:{port}/{db}"
+        if pool is not None:
+            return
         try:
             LOGGER.info(f"连接 MySQL 数据库: {host}:{port}/{db}")
-            self.conn = pymysql.connect(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                database=db,
-                charset="utf8mb4",
-                connect_timeout=5
-            )
+            self.conn = self.connect(host, port, user, password, db)
             LOGGER.info("MySQL 连接成功")
         except pymysql.MySQLError as e:
             ERROR_LOGGER.error(f"MySQL 连接失败: {e}")
             raise
 
+    @staticmethod
+    def connect(host: str, port: int, user: str, password: str, db: str, multi_statements: bool = False):
+        return pymysql.connect(
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            database=db,
+            charset="utf8mb4",
+            connect_timeout=5,
+            # 只有 batch_pool 的连接允许一次发送多条语句
+            client_flag=CLIENT.MULTI_STATEMENTS if multi_statements else 0
+        )
+
+    @staticmethod
+    def ping(conn) -> None:
+        conn.ping(reconnect=False)
+
+    def _stream_cursor(self, conn):
+        # 非缓冲游标：结果逐批从服务端读取，不在客户端一次性缓存
+        return conn.cursor(pymysql.cursors.SSCursor)
+
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> Union[tuple[tuple[Any, ...], ...], list[Any]]:
         try:
-            cursor = self.conn.cursor()
-            if params:
-                cursor.execute(sql, params)
-            else:
-                cursor.execute(sql)
-            results = cursor.fetchall()
+            with self._timed(sql, "execute_query"), self._connection() as conn:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                self._invalidate(sql)
+                results = cursor.fetchall()
             LOGGER.debug(f"MySQL 执行 SQL 成功: {sql}, 返回 {len(results)} 条数据")
             return results
         except Exception as e:
             ERROR_LOGGER.error(f"MySQL 执行 SQL 失败: {e} | SQL: {sql}")
             return []
 
-    def fetchone(self, sql: str) -> Any:
+    def fetchone(self, sql: str, params: Optional[tuple] = None) -> Any:
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(sql)
-            result = cursor.fetchone()
+            with self._timed(sql, "fetchone"), self._connection() as conn:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                self._invalidate(sql)
+                result = cursor.fetchone()
             LOGGER.debug(f"MySQL fetchone 成功: {sql}, 结果: {result}")
             return result
         except Exception as e:
@@ -111,30 +776,125 @@ class MySQLHandler(BaseSQLHandler):
     def fetchall(self, sql: str) -> List[Any]:
         return self.execute_query(sql)
 
+    def execute_batch(self, statements: List[str], params: Optional[List[Optional[tuple]]] = None) -> List[List[tuple]]:
+        """
+        多条语句拼接后一次发送（batch_pool 的连接开启 CLIENT.MULTI_STATEMENTS），通过 nextset 逐个读取结果集。
+        pymysql 在客户端完成参数转义，未带参数的语句中的 % 需先转义后再与带参数的语句拼接。
+        独占连接模式（没有 batch_pool）下逐条执行。
+        """
+        if self.batch_pool is None:
+            return super().execute_batch(statements, params)
+        results = []
+        params = params or [None] * len(statements)
+        with self._timed(";\n".join(statements), "execute_batch"), self._borrow(self.batch_pool) as conn:
+            cursor = conn.cursor()
+            if any(params):
+                query = ";\n".join(stmt if args else stmt.replace("%", "%%") for stmt, args in zip(statements, params))
+                cursor.execute(query, tuple(v for args in params if args for v in args))
+            else:
+                cursor.execute(";\n".join(statements))
+            for stmt in statements:
+                self._invalidate(stmt)
+            while True:
+                results.append(cursor.fetchall())
+                if not cursor.nextset():
+                    break
+        if len(results) != len(statements):
+            raise ValueError(f"结果集数量 {len(results)} 与语句数量 {len(statements)} 不一致")
+        LOGGER.debug(f"MySQL 批量执行 {len(statements)} 条 SQL 成功")
+        return results
+
     def close(self):
-        if self.conn:
+        # 连接池模式下连接由池统一管理
+        if self.pool is None and self.conn:
             self.conn.close()
             LOGGER.info("MySQL 连接已关闭")
 
 
 class SQLHandlerFactory:
-    """工厂类：根据配置创建不同类型的数据库连接"""
-    @staticmethod
-    def create(db_conf: Dict[str, Any]) -> BaseSQLHandler:
+    """
+    工厂类：根据配置创建不同类型的数据库连接。
+    同一配置（同一 db_key）的 Handler 共用一个进程级连接池，pooled=False 时退回独占连接。
+    """
+    _pools: Dict[tuple, ConnectionPool] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls, db_conf: Dict[str, Any], multi_statements: bool = False) -> ConnectionPool:
+        """multi_statements 为 True 时返回 MySQL 批量执行专用的连接池（与普通连接池分开）"""
+        key = tuple(sorted((k, str(v)) for k, v in db_conf.items())) + (("multi_statements", multi_statements),)
+        with cls._lock:
+            if key not in cls._pools:
+                db_type = db_conf.get("type", "").lower()
+                if db_type == "sqlite":
+                    name = f"sqlite:{db_conf['path']}"
+                    # 连接池保证同一时刻只有一个线程使用连接
+                    connect = lambda: SQLiteHandler.connect(db_conf["path"], check_same_thread=False)
+                    ping = SQLiteHandler.ping
+                elif db_type == "mysql":
+                    name = f"mysql:{db_conf['host']}:{db_conf['port']}/{db_conf['database']}"
+                    if multi_statements:
+                        name += " (batch)"
+                    connect = lambda: MySQLHandler.connect(
+                        db_conf["host"], int(db_conf["port"]), db_conf["user"], db_conf["password"],
+                        db_conf["database"], multi_statements=multi_statements
+                    )
+                    ping = MySQLHandler.ping
+                else:
+                    raise ValueError(f"不支持的数据库类型: {db_type}")
+                cls._pools[key] = ConnectionPool.from_conf(name, db_conf, connect, ping)
+                LOGGER.info(f"创建数据库连接池: {name}")
+            return cls._pools[key]
+
+    @classmethod
+    def create(cls, db_conf: Dict[str, Any], pooled: bool = True, db_key: str = None) -> BaseSQLHandler:
+        """db_key 为配置节名称，用于 SQL 耗时统计的分组"""
+        if db_conf.get("driver", "").lower() == "async":
+            # 异步驱动 + 同步门面，接口与同步 Handler 相同
+            from src.utils.async_sql_handler import AsyncSQLHandlerFactory
+            return AsyncSQLHandlerFactory.create_sync(db_conf, db_key)
+        handler = cls._create(db_conf, pooled)
+        if db_key:
+            handler.db_key = db_key
+        return handler
+
+    @classmethod
+    def _create(cls, db_conf: Dict[str, Any], pooled: bool = True) -> BaseSQLHandler:
         db_type = db_conf.get("type", "").lower()
+        pool = cls.get_pool(db_conf) if pooled and db_type in ("sqlite", "mysql") else None
         if db_type == "sqlite":
-            return SQLiteHandler(db_conf["path"])
+            return SQLiteHandler(db_conf["path"], pool=pool)
         elif db_type == "mysql":
             return MySQLHandler(
                 host=db_conf["host"],
                 port=int(db_conf["port"]),
                 user=db_conf["user"],
                 password=db_conf["password"],
-                db=db_conf["database"]
+                db=db_conf["database"],
+                pool=pool,
+                batch_pool=cls.get_pool(db_conf, multi_statements=True) if pool is not None else None
             )
         else:
             raise ValueError(f"不支持的数据库类型: {db_type}")
 
+    @classmethod
+    def pool_stats(cls) -> List[Dict[str, Any]]:
+        with cls._lock:
+            return [pool.stats() for pool in cls._pools.values()]
+
+    @classmethod
+    def close_pools(cls) -> None:
+        """输出各连接池指标并关闭全部连接池"""
+        with cls._lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            LOGGER.info(f"数据库连接池统计: {pool.stats()}")
+            pool.close()
+        LOGGER.info(f"查询缓存统计: {QUERY_CACHE.stats()}")
+        QUERY_CACHE.clear()
+
+
 if __name__ == '__main__':
     from src.utils.read_test_cases import read_conf
 
@@ -147,8 +907,9 @@ if __name__ == '__main__':
     mysql_db = SQLHandlerFactory.create(mysql_conf)
     print(mysql_db.fetchone("SELECT * FROM t_user_info WHERE id = 1000;"))
     mysql_db.close()
+    print(SQLHandlerFactory.pool_stats())
 
     # # SQLite 测试
     # sqlite_db = SQLHandlerFactory.create(sqlite_conf)
     # print(sqlite_db.fetchall("select * from users;"))
-    # sqlite_db.close()
\ No newline at end of file
+    # sqlite_db.close()
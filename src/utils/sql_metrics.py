@@ -0,0 +1,283 @@
+# -*- coding:utf-8 -*-
+"""
+SQL 耗时统计
+
+sql_handler 中每次 fetchone / execute_query / execute_batch / 流式聚合都会经过 SQL_METRICS.timer 计时，
+按 (db_key, 规范化语句) 汇总调用次数、总耗时与耗时分布，超过阈值的记录写入慢查询日志；
+会话结束时输出 JSON 汇总并附加到 Allure 报告，用于对比数据库与 HTTP 请求各占多少时间。
+"""
+import re
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from src.utils.logger import LOGGER, ERROR_LOGGER
+
+# 当前执行的用例，由 ApiClient.send_case 设置；asyncio.to_thread 与任务会复制上下文
+CURRENT_CASE: ContextVar[str] = ContextVar("sql_current_case", default="")
+
+# 耗时分布的桶上限（毫秒），最后一个桶为 > 5000ms
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """规范化语句：字面量替换为 ?，IN 列表折叠为 (?+)，折叠空白，同类语句归为一组"""
+    text = _LITERAL.sub("?", sql)
+    text = _IN_LIST.sub("(?+)", text)
+    return _SPACE.sub(" ", text).strip().rstrip(";").strip()
+
+
+class Histogram:
+    """固定桶的耗时分布，分位数取所在桶的上限（不超过实际最大值）"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))
+        self.counts[index] += 1
+        self.calls += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p: float) -> float:
+        if not self.calls:
+            return 0.0
+        target = p / 100 * self.calls
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return round(min(BUCKETS_MS[index], self.max), 3) if index < len(BUCKETS_MS) else round(self.max, 3)
+        return round(self.max, 3)
+
+    def state(self) -> list:
+        return [list(self.counts), self.calls, self.total, self.max]
+
+    def merge(self, state: list) -> None:
+        counts, calls, total, maximum = state
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.calls += calls
+        self.total += total
+        self.max = max(self.max, maximum)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max, 3),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class _StatementStats:
+    __slots__ = ("histogram", "errors", "cases")
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.errors = 0
+        self.cases: List[str] = []
+
+
+class SQLMetrics:
+    """
+    单次运行的 SQL 耗时统计：
+    - slow_ms: 慢查询阈值（毫秒），超过时写 WARNING 日志并保留在汇总中（最多 max_slow 条）
+    - report_file: 会话结束时写入的 JSON 汇总文件，为空时不写文件
+    - http_time: 本次运行 HTTP 请求总耗时（秒），由调用方在会话结束前填入，用于对比
+    """
+
+    def __init__(self, slow_ms: float = 500, max_slow: int = 100, report_file: Optional[str] = None,
+                 enabled: bool = True):
+        self.slow_ms = float(slow_ms)
+        self.max_slow = int(max_slow)
+        self.report_file = report_file
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def configure(self, conf: Optional[Dict[str, str]]) -> "SQLMetrics":
+        """根据 object_conf.ini 的 [sql] 配置更新阈值与输出文件"""
+        conf = conf or {}
+        self.enabled = str(conf.get("metrics", "true")).strip().lower() != "false"
+        self.slow_ms = float(conf.get("slow_query_ms") or 500)
+        self.report_file = conf.get("metrics_file") or self.report_file
+        return self
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.by_db: Dict[str, Histogram] = {}
+            self.by_statement: Dict[tuple, _StatementStats] = {}
+            self.slow_queries: List[Dict[str, Any]] = []
+            self.slow_total = 0
+            self.http_time: Optional[float] = None
+
+    @contextmanager
+    def timer(self, db_key: str, sql: str, op: str):
+        """计时一次数据库操作（含从连接池借出连接），异常时记为错误后继续抛出"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(db_key, sql, op, (time.perf_counter() - start) * 1000, error=error)
+
+    def record(self, db_key: str, sql: str, op: str, ms: float, case: str = None, error: bool = False) -> None:
+        case = CURRENT_CASE.get() if case is None else case
+        statement = fingerprint(sql)
+        with self._lock:
+            self.by_db.setdefault(db_key, Histogram()).add(ms)
+            stats = self.by_statement.get((db_key, statement))
+            if stats is None:
+                stats = self.by_statement[(db_key, statement)] = _StatementStats()
+            stats.histogram.add(ms)
+            stats.errors += int(error)
+            if case and case not in stats.cases and len(stats.cases) < 5:
+                stats.cases.append(case)
+            slow = ms >= self.slow_ms
+            if slow:
+                self.slow_total += 1
+                if len(self.slow_queries) < self.max_slow:
+                    self.slow_queries.append({
+                        "db_key": db_key, "op": op, "elapsed_ms": round(ms, 3), "case": case, "sql": statement
+                    })
+        if slow:
+            LOGGER.warning(f"慢查询 {ms:.1f}ms [{db_key}] {op} 用例: {case or '-'} | SQL: {statement}")
+
+    @property
+    def calls(self) -> int:
+        with self._lock:
+            return sum(h.calls for h in self.by_db.values())
+
+    def summary(self, top: int = 50) -> Dict[str, Any]:
+        """
+        汇总：各 db_key 的耗时分布、按总耗时排序的前 top 条语句、慢查询列表；
+        设置了 http_time 时给出数据库与 HTTP 的耗时对比
+        """
+        with self._lock:
+            statements = sorted(self.by_statement.items(), key=lambda item: item[1].histogram.total, reverse=True)
+            total_ms = sum(h.total for h in self.by_db.values())
+            result = {
+                "calls": sum(h.calls for h in self.by_db.values()),
+                "sql_time_s": round(total_ms / 1000, 3),
+                "slow_query_ms": self.slow_ms,
+                "slow_queries_total": self.slow_total,
+                "by_db": {db_key: h.to_dict() for db_key, h in self.by_db.items()},
+                "statements": [
+                    dict(db_key=db_key, sql=sql, errors=stats.errors, cases=list(stats.cases),
+                         **stats.histogram.to_dict())
+                    for (db_key, sql), stats in statements[:top]
+                ],
+                "slow_queries": list(self.slow_queries),
+            }
+        if self.http_time is not None:
+            result["http_time_s"] = round(self.http_time, 3)
+            total = result["sql_time_s"] + result["http_time_s"]
+            result["sql_share"] = round(result["sql_time_s"] / total, 4) if total else 0.0
+        return result
+
+    def log(self) -> None:
+        summary = self.summary(top=5)
+        LOGGER.info(
+            f"SQL 耗时统计: 调用 {summary['calls']} 次, 共 {summary['sql_time_s']}s, "
+            f"慢查询 {summary['slow_queries_total']} 条, HTTP {summary.get('http_time_s', '-')}s"
+        )
+
+    def dump(self, path: str = None) -> Optional[Path]:
+        """把汇总写入 JSON 文件，返回文件路径；没有任何记录或未配置路径时不写"""
+        path = path or self.report_file
+        if not path or not self.by_db:
+            return None
+        try:
+            target = Path(path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(json.dumps(self.summary(), ensure_ascii=False, indent=2), encoding="utf-8")
+            LOGGER.info(f"SQL 耗时汇总已写入: {target}")
+            return target
+        except OSError as e:
+            ERROR_LOGGER.error(f"SQL 耗时汇总写入失败 {path}: {e}")
+            return None
+
+    # ---------------------------------------------------
+    # pytest-xdist：各 worker 的原始统计经 workeroutput 传回 controller 合并，由 controller 统一写汇总文件
+    # ---------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """可序列化的原始统计（不是汇总），用于跨进程合并"""
+        with self._lock:
+            return {
+                "by_db": {db_key: h.state() for db_key, h in self.by_db.items()},
+                "by_statement": [[db_key, sql, stats.histogram.state(), stats.errors, list(stats.cases)]
+                                 for (db_key, sql), stats in self.by_statement.items()],
+                "slow_queries": list(self.slow_queries),
+                "slow_total": self.slow_total,
+                "http_time": self.http_time,
+            }
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        """合并其他进程的 snapshot；http_time 累加"""
+        if not snapshot:
+            return
+        with self._lock:
+            for db_key, state in snapshot["by_db"].items():
+                self.by_db.setdefault(db_key, Histogram()).merge(state)
+            for db_key, sql, state, errors, cases in snapshot["by_statement"]:
+                stats = self.by_statement.get((db_key, sql))
+                if stats is None:
+                    stats = self.by_statement[(db_key, sql)] = _StatementStats()
+                stats.histogram.merge(state)
+                stats.errors += errors
+                stats.cases.extend(case for case in cases if case not in stats.cases)
+                del stats.cases[5:]
+            self.slow_queries.extend(snapshot["slow_queries"][:max(self.max_slow - len(self.slow_queries), 0)])
+            self.slow_total += snapshot["slow_total"]
+            if snapshot["http_time"] is not None:
+                self.http_time = (self.http_time or 0.0) + snapshot["http_time"]
+
+    def attach_allure(self) -> None:
+        """把汇总作为 JSON 附件加入 Allure 报告（在会话级 fixture 的清理阶段调用）"""
+        if not self.by_db:
+            return
+        import allure
+        from src.utils.allure_utils import add_allure_attachment
+        add_allure_attachment("SQL 耗时统计", json.dumps(self.summary(), ensure_ascii=False, indent=2),
+                              allure.attachment_type.JSON)
+
+
+SQL_METRICS = SQLMetrics()
+
+
+if __name__ == "__main__":
+    import random
+
+    metrics = SQLMetrics(slow_ms=50)
+    token = CURRENT_CASE.set("0001_查询余额")
+    for i in range(200):
+        metrics.record("mysql_db", f"SELECT balance FROM account WHERE uid = {i} AND coin IN ('USDT', 'BTC')",
+                       "fetchone", random.expovariate(1 / 8))
+    metrics.record("mysql_db_balance", "SELECT * FROM ledger", "aggregate", 120.0)
+    CURRENT_CASE.reset(token)
+    metrics.http_time = 3.2
+    print(json.dumps(metrics.summary(top=3), ensure_ascii=False, indent=2))
@@ -0,0 +1,86 @@
+# coding: utf-8
+import pytest
+from src.core.api.factory import ApiClientRegistry
+from src.utils.allure_utils import configure_allure_attachments, BufferedAttachmentWriter
+from src.utils.read_test_cases import read_conf, CASE_CACHE
+from src.utils.sql_metrics import SQL_METRICS
+from src.utils.data_driven import expand_items, run_records
+from src.utils.case_catalog import CaseCatalog
+from src.utils.case_index import select_cases
+from config.settings import ProjectPaths
+
+ALLURE_CONF = read_conf.get_dict("allure") if read_conf.config.has_section("allure") else {}
+SQL_CONF = read_conf.get_dict("sql") if read_conf.config.has_section("sql") else {}
+_attachment_writer = BufferedAttachmentWriter()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--select", action="append", default=[], dest="case_select",
+        help="只加载匹配的用例（可多次指定）：模块/子模块/用例名/标题（支持通配）、@标签、file:工作簿"
+    )
+
+
+def pytest_configure(config):
+    # 未安装 pytest-xdist 时也能识别用例依赖分组标记
+    config.addinivalue_line("markers", "xdist_group(name): 用例依赖分组，同组用例在同一 worker 中按顺序执行")
+    configure_allure_attachments(ALLURE_CONF)
+    SQL_METRICS.configure(SQL_CONF)
+    SQL_METRICS.report_file = SQL_METRICS.report_file or ProjectPaths.REPORT_DIR / "sql_metrics.json"
+    # --select：测试模块导入（构建用例目录）前按索引确定要解析的工作簿与行
+    if config.getoption("case_select"):
+        CaseCatalog.selection = select_cases(config.getoption("case_select"), order=ProjectPaths.API_MODULES)
+
+
+def pytest_sessionstart(session):
+    # allure 的 file logger 在 pytest_configure 阶段注册，这里再接管附件写入
+    if str(ALLURE_CONF.get("background_writer", "")).strip().lower() in ("true", "1", "yes", "on"):
+        _attachment_writer.install()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(session, config, items):
+    # 数据驱动用例按数据文件逐条（或按批）生成测试项（不经过 parametrize，变体只保存 (用例, 序号)，执行时才读取记录）
+    items[:] = expand_items(items)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    # 记录数超过 [data_driven] max_items 时合并的一批记录，在一个测试项中逐条执行
+    __tracebackhide__ = True
+    if run_records(pyfuncitem):
+        return True
+
+
+def pytest_collection_finish(session):
+    # 用例在测试模块导入（收集）阶段读取，此时输出缓存命中率与节省的解析时间
+    CASE_CACHE.log()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    _attachment_writer.close()
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        # xdist worker：统计交给 controller 合并后统一写文件，避免各 worker 覆盖同一个汇总文件
+        workeroutput["sql_metrics"] = SQL_METRICS.snapshot()
+        return
+    if SQL_METRICS.calls:
+        SQL_METRICS.log()
+        SQL_METRICS.dump()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # xdist controller：worker 结束时合并其 SQL 统计（未安装 pytest-xdist 时不会调用）
+    SQL_METRICS.merge(getattr(node, "workeroutput", {}).get("sql_metrics"))
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """整个测试会话共用一个预热好的 ApiClient"""
+    client = ApiClientRegistry.get()
+    yield client
+    # 会话级 fixture 清理阶段的附件会出现在报告的 tearDown 中
+    SQL_METRICS.http_time = client.retry_stats.request_time
+    SQL_METRICS.attach_allure()
+    ApiClientRegistry.close()
@@ -1,9 +1,12 @@
 # coding: utf-8
 import pytest
-from src.utils.read_test_cases import GenericCaseReader, process_api_row
-from src.core.api.factory import create_api_client
+from src.core.api.case_dependency import CaseDependencyGraph
 from config.settings import ProjectPaths
 
+API_MODULES = ProjectPaths.API_MODULES
+# 按生产/消费依赖分组，`pytest -n auto --dist loadgroup` 时互不依赖的分组可并行；只加载本文件执行的工作簿
+CASE_GRAPH = CaseDependencyGraph.build(files=API_MODULES)
+
 
 class TestApi(object):
 
@@ -14,54 +17,54 @@ class TestApi(object):
         pass
 
     @pytest.mark.run(order=1)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.register, process_api_row).read())
-    def test_uu_apitest_register_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.register))
+    def test_uu_apitest_register_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=2)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.login, process_api_row).read())
-    def test_uu_apitest_login_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.login))
+    def test_uu_apitest_login_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=3)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.userinfo, process_api_row).read())
-    def test_uu_apitest_userinfo_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.userinfo))
+    def test_uu_apitest_userinfo_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=4)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.security, process_api_row).read())
-    def test_uu_apitest_security_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.security))
+    def test_uu_apitest_security_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=5)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.deposit, process_api_row).read())
-    def test_uu_apitest_deposit_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.deposit))
+    def test_uu_apitest_deposit_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=6)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.withdraw, process_api_row).read())
-    def test_uu_apitest_withdraw_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.withdraw))
+    def test_uu_apitest_withdraw_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=7)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.converter, process_api_row).read())
-    def test_uu_apitest_converter_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.converter))
+    def test_uu_apitest_converter_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=8)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.card, process_api_row).read())
-    def test_uu_apitest_card_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.card))
+    def test_uu_apitest_card_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=9)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.agent, process_api_row).read())
-    def test_uu_apitest_agent_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.agent))
+    def test_uu_apitest_agent_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     @pytest.mark.run(order=10)
-    @pytest.mark.parametrize('case', GenericCaseReader(ProjectPaths.corporate, process_api_row).read())
-    def test_uu_apitest_corporate_case(self, case):
-        create_api_client().send_case(case=case)
+    @pytest.mark.parametrize('case', CASE_GRAPH.xdist_params(ProjectPaths.corporate))
+    def test_uu_apitest_corporate_case(self, case, api_client):
+        api_client.send_case(case=case)
 
     def teardown_method(self):
         pass
@@ -0,0 +1,140 @@
+# coding: utf-8
+import asyncio
+import sqlite3
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.sql_handler import Aggregation
+from src.utils.async_sql_handler import AsyncSQLHandlerFactory, AsyncBaseSQLHandler, _LoopThread
+
+pytest.importorskip("aiosqlite")
+
+ROWS = 50
+
+
+@pytest.fixture
+def db_conf(tmp_path):
+    """临时 SQLite 库：ledger 表 ROWS 行，amount 为 id 的 1.5 倍"""
+    path = str(tmp_path / "ledger.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE ledger (id INTEGER PRIMARY KEY, account TEXT, amount REAL)")
+    conn.executemany("INSERT INTO ledger VALUES (?, ?, ?)",
+                     [(i, f"A{i % 3}", i * 1.5) for i in range(1, ROWS + 1)])
+    conn.commit()
+    conn.close()
+    return {"type": "sqlite", "path": path, "pool_size": 2, "pool_checkout_timeout": 2}
+
+
+class TestAsyncSQLHandler(object):
+
+    def test_fetchone_binds_params(self, db_conf):
+        handler = AsyncSQLHandlerFactory.create(db_conf)
+
+        async def run():
+            sql, params = handler.prepare("SELECT account, amount FROM ledger WHERE id = ${id}", {"id": 7})
+            try:
+                return sql, params, await handler.fetchone(sql, params)
+            finally:
+                await handler.close()
+
+        sql, params, row = asyncio.run(run())
+        assert sql == "SELECT account, amount FROM ledger WHERE id = ?"
+        assert params == (7,)
+        assert tuple(row) == ("A1", 10.5)
+
+    def test_execute_batch_keeps_statement_order(self, db_conf):
+        handler = AsyncSQLHandlerFactory.create(db_conf)
+
+        async def run():
+            try:
+                return await handler.execute_batch(
+                    ["SELECT COUNT(*) FROM ledger", "SELECT amount FROM ledger WHERE id = ?"],
+                    [None, (2,)],
+                )
+            finally:
+                await handler.close()
+
+        results = asyncio.run(run())
+        assert [list(map(tuple, rows)) for rows in results] == [[(ROWS,)], [(3.0,)]]
+
+    def test_aggregate_streams_in_chunks(self, db_conf):
+        handler = AsyncSQLHandlerFactory.create(db_conf)
+
+        async def run():
+            try:
+                count = await handler.aggregate("SELECT id FROM ledger", Aggregation("count"), chunk_size=7)
+                total = await handler.aggregate("SELECT id, amount FROM ledger", Aggregation("sum", 1), chunk_size=7)
+                head = await handler.aggregate("SELECT id FROM ledger ORDER BY id", Aggregation("limit", 3))
+                return count, total, head
+            finally:
+                await handler.close()
+
+        count, total, head = asyncio.run(run())
+        assert count == [(ROWS,)]
+        assert total == [(sum(i * 1.5 for i in range(1, ROWS + 1)),)]
+        assert [tuple(row) for row in head] == [(1,), (2,), (3,)]
+
+    def test_pool_reuses_connections(self, db_conf):
+        handler = AsyncSQLHandlerFactory.create(db_conf)
+
+        async def run():
+            for i in range(1, 6):
+                await handler.fetchone("SELECT amount FROM ledger WHERE id = ?", (i,))
+            sequential = handler._pool().stats()
+            rows = await asyncio.gather(*(
+                handler.fetchone("SELECT amount FROM ledger WHERE id = ?", (i,)) for i in range(1, 21)
+            ))
+            concurrent = handler._pool().stats()
+            await handler.close()
+            return sequential, concurrent, rows
+
+        sequential, concurrent, rows = asyncio.run(run())
+        # 顺序执行始终复用同一个连接
+        assert sequential["created"] == 1
+        assert sequential["checkouts"] == 5
+        # 并发执行最多创建 pool_size 个连接，全部归还
+        assert concurrent["created"] <= db_conf["pool_size"]
+        assert concurrent["checkouts"] == 25
+        assert concurrent["in_use"] == 0
+        assert [row[0] for row in rows] == [i * 1.5 for i in range(1, 21)]
+
+    def test_close_releases_pool(self, db_conf):
+        handler = AsyncSQLHandlerFactory.create(db_conf)
+
+        async def run():
+            await handler.fetchone("SELECT 1")
+            loop = asyncio.get_running_loop()
+            pool = handler._pool()
+            await handler.close()
+            return pool.stats(), handler.name in AsyncBaseSQLHandler._pools.get(loop, {})
+
+        stats, still_registered = asyncio.run(run())
+        assert stats["size"] == 0
+        assert stats["idle"] == 0
+        assert not still_registered
+
+
+class TestSyncSQLHandler(object):
+
+    def test_sync_facade(self, db_conf):
+        handler = AsyncSQLHandlerFactory.create_sync(db_conf, db_key="ledger_db")
+        try:
+            assert handler.db_key == "ledger_db"
+            sql, params = handler.prepare("SELECT amount FROM ledger WHERE id = ${id}", {"id": 4})
+            assert tuple(handler.fetchone(sql, params)) == (6.0,)
+            assert [list(map(tuple, rows)) for rows in handler.execute_batch(
+                ["SELECT COUNT(*) FROM ledger", "SELECT MAX(id) FROM ledger"])] == [[(ROWS,)], [(ROWS,)]]
+            # BaseSQLHandler.aggregate 经由门面的 iter_chunks 流式读取
+            assert handler.aggregate("SELECT id FROM ledger", Aggregation("count"), chunk_size=8) == [(ROWS,)]
+            # 多线程调用在后台事件循环中执行，共用同一个连接池
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                rows = list(executor.map(
+                    lambda i: handler.fetchone("SELECT amount FROM ledger WHERE id = ?", (i,)), range(1, 9)))
+            assert [row[0] for row in rows] == [i * 1.5 for i in range(1, 9)]
+            stats = AsyncBaseSQLHandler._pools[_LoopThread.loop()][handler.name].stats()
+            assert stats["created"] <= db_conf["pool_size"]
+            assert stats["checkouts"] == 11
+        finally:
+            handler.shutdown()
+        # shutdown 后连接全部关闭，再次调用时重新创建连接池
+        assert tuple(handler.fetchone("SELECT COUNT(*) FROM ledger")) == (ROWS,)
+        handler.shutdown()
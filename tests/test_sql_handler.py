@@ -0,0 +1,90 @@
+# coding: utf-8
+import sqlite3
+import pytest
+from decimal import Decimal
+from src.utils.sql_handler import SQLHandlerFactory, compile_sql
+
+BIG = "12345678901234567.123456789"
+
+
+@pytest.fixture
+def handler(tmp_path):
+    """临时 SQLite 库：user 表 3 行，ledger_2024 为按后缀分表的表"""
+    path = str(tmp_path / "prepare.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE user (id INTEGER PRIMARY KEY, name TEXT, amount REAL, memo TEXT)")
+    conn.executemany("INSERT INTO user VALUES (?, ?, ?, ?)", [
+        (1, "alice", 1.5, BIG),
+        (2, "bob", 2.25, "100%"),
+        (3, "o'hara", 3.0, "bob-vip"),
+    ])
+    conn.execute("CREATE TABLE ledger_2024 (id INTEGER PRIMARY KEY)")
+    conn.execute("INSERT INTO ledger_2024 VALUES (7)")
+    conn.commit()
+    conn.close()
+    yield SQLHandlerFactory.create({"type": "sqlite", "path": path})
+    SQLHandlerFactory.close_pools()
+
+
+class TestCompileSQL(object):
+
+    @pytest.mark.parametrize("template", [
+        "SELECT id FROM user WHERE name = '${name}'",
+        'SELECT id FROM user WHERE name = "${name}"',
+    ])
+    def test_quoted_var_becomes_string_param(self, handler, template):
+        sql, params = handler.prepare(template, {"name": "o'hara"})
+        assert sql == "SELECT id FROM user WHERE name = ?"
+        assert params == ("o'hara",)
+        assert handler.fetchone(sql, params) == (3,)
+
+    def test_quoted_var_format_placeholder(self):
+        compiled = compile_sql('SELECT id FROM user WHERE name = "${name}" AND memo LIKE \'100%\'', "format")
+        assert compiled.sql == "SELECT id FROM user WHERE name = %s AND memo LIKE '100%%'"
+        assert compiled.params == [("name", True)]
+
+    def test_bare_numeric_var(self, handler):
+        sql, params = handler.prepare("SELECT name FROM user WHERE id = ${id} AND amount = ${amount}",
+                                      {"id": "2", "amount": "2.25"})
+        assert sql == "SELECT name FROM user WHERE id = ? AND amount = ?"
+        assert params == (2, Decimal("2.25"))
+        assert handler.fetchone(sql, params) == ("bob",)
+
+    def test_high_precision_decimal_keeps_digits(self, handler):
+        sql, params = handler.prepare("SELECT id FROM user WHERE memo = ${amount}", {"amount": BIG})
+        assert params == (Decimal(BIG),)
+        assert str(params[0]) == BIG
+        assert handler.fetchone(sql, params) == (1,)
+
+    def test_bare_non_numeric_falls_back(self, handler):
+        # 裸变量取值不是数字时退回文本替换，与原有行为一致
+        sql, params = handler.prepare("SELECT id FROM user WHERE ${column} = 'bob'", {"column": "name"})
+        assert params is None
+        assert sql == "SELECT id FROM user WHERE name = 'bob'"
+        assert handler.fetchone(sql, params) == (2,)
+
+    @pytest.mark.parametrize("template", [
+        "SELECT id FROM user WHERE memo LIKE '%${kw}%'",
+        'SELECT id FROM user WHERE memo LIKE "%${kw}%"',
+    ])
+    def test_var_inside_literal_falls_back(self, handler, template):
+        assert not compile_sql(template, "qmark").parameterizable
+        sql, params = handler.prepare(template, {"kw": "vip"})
+        assert params is None
+        assert "%vip%" in sql
+        assert handler.fetchone(sql, params) == (3,)
+
+    def test_var_in_identifier_falls_back(self, handler):
+        assert not compile_sql("SELECT id FROM ledger_${suffix}", "qmark").parameterizable
+        sql, params = handler.prepare("SELECT id FROM ledger_${suffix}", {"suffix": "2024"})
+        assert (sql, params) == ("SELECT id FROM ledger_2024", None)
+        assert handler.fetchone(sql, params) == (7,)
+
+    def test_missing_var_falls_back(self, handler):
+        sql, params = handler.prepare("SELECT id FROM user WHERE name = '${name}'", {})
+        assert params is None
+
+    def test_same_template_compiled_once(self):
+        template = "SELECT id FROM user WHERE id = ${id}"
+        assert compile_sql(template, "qmark") is compile_sql(template, "qmark")
+        assert compile_sql(template, "qmark") is not compile_sql(template, "format")